@@ -46,4 +46,11 @@ def create_app():
     register_blueprints(app)
     logger.debug("All module blueprints registered at /api/v1")
 
+    # Register CLI commands (flask recommender train, flask ratings recompute-stats)
+    from app.recommendation.cli import recommender_cli
+    from app.modules.rating.cli import rating_cli
+
+    app.cli.add_command(recommender_cli)
+    app.cli.add_command(rating_cli)
+
     return app
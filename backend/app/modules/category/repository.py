@@ -1,6 +1,38 @@
+import threading
+import time
 from app.extensions import db
 from .models import Category, UserFavoriteCategory
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, desc, event
+from sqlalchemy.orm import Session
+
+# In-process cache of every category's to_dict, keyed by ID. The table is small
+# and rarely written: commits touching a Category clear it in this process,
+# other processes see changes after CATEGORY_CACHE_TTL at the latest
+CATEGORY_CACHE_TTL = 300  # seconds
+_category_cache = {"categories": None, "loaded_at": 0.0}
+_category_cache_lock = threading.Lock()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_categories_changed(session, flush_context):
+    """Remember that a transaction wrote categories"""
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, Category):
+            session.info["categories_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_category_cache(session):
+    """Drop the category cache once category writes are committed"""
+    if session.info.pop("categories_changed", False):
+        CategoryRepository.invalidate_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_category_changes(session):
+    """Rolled back category writes leave the cache valid"""
+    session.info.pop("categories_changed", None)
 
 
 class CategoryRepository:
@@ -20,6 +52,48 @@ class CategoryRepository:
         """Get category by ID"""
         return Category.query.filter_by(id=category_id, is_active=True).first()
 
+    @staticmethod
+    def get_cached_by_ids(category_ids):
+        """
+        Get serialized categories from the in-process cache, reloading the whole
+        table (one query) when the cache is empty, expired or misses an ID
+
+        Args:
+            category_ids: Category IDs, active or not
+
+        Returns:
+            dict: category_id -> copy of Category.to_dict() for the IDs found
+        """
+        with _category_cache_lock:
+            categories = _category_cache["categories"]
+            expired = time.time() - _category_cache["loaded_at"] > CATEGORY_CACHE_TTL
+
+        if (
+            categories is None
+            or expired
+            or any(category_id not in categories for category_id in category_ids)
+        ):
+            categories = {
+                category.id: category.to_dict() for category in Category.query.all()
+            }
+            with _category_cache_lock:
+                _category_cache["categories"] = categories
+                _category_cache["loaded_at"] = time.time()
+
+        # Copies, so callers adding fields do not change the cached entries
+        return {
+            category_id: dict(categories[category_id])
+            for category_id in category_ids
+            if category_id in categories
+        }
+
+    @staticmethod
+    def invalidate_cache():
+        """Drop the in-process category cache"""
+        with _category_cache_lock:
+            _category_cache["categories"] = None
+            _category_cache["loaded_at"] = 0.0
+
     @staticmethod
     def get_by_name(name):
         """Get category by name"""
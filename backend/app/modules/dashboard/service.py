@@ -2,8 +2,8 @@ from app.extensions import db
 from app.modules.user.models import User
 from app.modules.restaurant.models import Restaurant
 from app.modules.food.models import Food
-from app.modules.rating.models import FoodRating
-from sqlalchemy import func
+from app.modules.rating.models import FoodRatingStats
+from app.modules.rating.repository import FoodRatingStatsRepository
 from app.utils import get_logger
 logger = get_logger(__name__)
 
@@ -26,12 +26,17 @@ class DashboardService:
             user_count = User.query.count()
             restaurant_count = Restaurant.query.count()
             food_count = Food.query.count()
-            total_ratings = FoodRating.query.count()
+
+            # Rating totals from the materialized per-food stats
+            total_ratings, total_rating_sum = FoodRatingStatsRepository.get_totals()
 
             # Get average rating across all foods
-            avg_rating_result = db.session.query(func.avg(FoodRating.rating)).scalar()
             avg_rating = (
-                round(float(avg_rating_result), 2) if avg_rating_result else 0.0
+                round(total_rating_sum / total_ratings, 2) if total_ratings else 0.0
+            )
+
+            avg_rating_column = (
+                FoodRatingStats.rating_sum / FoodRatingStats.rating_count
             )
 
             # Get popular foods by rating count (top 10)
@@ -41,12 +46,12 @@ class DashboardService:
                     Food.name,
                     Food.description,
                     Food.price,
-                    func.count(FoodRating.id).label("rating_count"),
-                    func.avg(FoodRating.rating).label("avg_rating"),
+                    FoodRatingStats.rating_count.label("rating_count"),
+                    avg_rating_column.label("avg_rating"),
                 )
-                .join(FoodRating, Food.id == FoodRating.food_id)
-                .group_by(Food.id, Food.name, Food.description, Food.price)
-                .order_by(func.count(FoodRating.id).desc())
+                .join(FoodRatingStats, Food.id == FoodRatingStats.food_id)
+                .filter(FoodRatingStats.rating_count > 0)
+                .order_by(FoodRatingStats.rating_count.desc())
                 .limit(10)
                 .all()
             )
@@ -74,13 +79,12 @@ class DashboardService:
                     Food.name,
                     Food.description,
                     Food.price,
-                    func.count(FoodRating.id).label("rating_count"),
-                    func.avg(FoodRating.rating).label("avg_rating"),
+                    FoodRatingStats.rating_count.label("rating_count"),
+                    avg_rating_column.label("avg_rating"),
                 )
-                .join(FoodRating, Food.id == FoodRating.food_id)
-                .group_by(Food.id, Food.name, Food.description, Food.price)
-                .having(func.count(FoodRating.id) >= 5)
-                .order_by(func.avg(FoodRating.rating).desc())
+                .join(FoodRatingStats, Food.id == FoodRatingStats.food_id)
+                .filter(FoodRatingStats.rating_count >= 5)
+                .order_by(avg_rating_column.desc())
                 .limit(10)
                 .all()
             )
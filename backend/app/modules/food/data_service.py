@@ -6,6 +6,7 @@ This handles data aggregation and business logic related to food data presentati
 from .models import Food, FoodImage
 from .repository import FoodRepository
 from app.extensions import db
+from sqlalchemy.orm import selectinload
 import logging
 from typing import Dict, Any, List, Optional
 
@@ -64,6 +65,9 @@ class FoodDataService:
         """
         logger.debug(f"Processing {len(foods)} foods with aggregated data")
 
+        # Images of all foods in one query instead of one per food
+        FoodRepository.preload_images(foods)
+
         result = []
         for food in foods:
             try:
@@ -132,27 +136,16 @@ class FoodDataService:
 
     @staticmethod
     def _get_food_ratings_summary(food: Food) -> Dict[str, Any]:
-        """Get summary ratings data (lighter version)"""
+        """Get summary ratings data (lighter version) from the materialized stats"""
         try:
-            ratings = getattr(food, "ratings", None)
-            if not ratings:
+            rating_stats = getattr(food, "rating_stats", None)
+            if not rating_stats or not rating_stats.rating_count:
                 return {"average": 0.0, "count": 0}
 
-            rating_values = []
-            try:
-                for r in ratings:
-                    if hasattr(r, "rating"):
-                        rating_values.append(r.rating)
-            except Exception as e:
-                logger.warning(f"Error iterating ratings for food {food.id}: {str(e)}")
-                return {"average": 0.0, "count": 0}
-
-            if rating_values:
-                average = round(sum(rating_values) / len(rating_values), 2)
-            else:
-                average = 0.0
-
-            return {"average": average, "count": len(rating_values)}
+            return {
+                "average": round(rating_stats.average, 2),
+                "count": rating_stats.rating_count,
+            }
 
         except Exception as e:
             logger.error(f"Error getting ratings summary for food {food.id}: {str(e)}")
@@ -351,8 +344,8 @@ class FoodDataService:
             if max_price is not None:
                 query = query.filter(Food.price <= max_price)
 
-            # Execute query
-            foods = query.all()
+            # Execute query (rating stats of all matches in one extra query)
+            foods = query.options(selectinload(Food.rating_stats)).all()
 
             # Process results with aggregated data
             result = FoodDataService.get_foods_with_aggregated_data(foods)
@@ -43,6 +43,15 @@ class Food(db.Model):
     images = db.relationship(
         "FoodImage", backref="food", lazy=True, cascade="all, delete-orphan"
     )
+    # Materialized rating aggregates; the database cascades unloaded rows
+    rating_stats = db.relationship(
+        "FoodRatingStats",
+        backref="food",
+        uselist=False,
+        lazy=True,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
     def __init__(self, **kwargs):
         # Generate UUID if not provided
@@ -59,11 +68,10 @@ class Food(db.Model):
         main_image = None
         all_images = []
 
-        # Query images directly to avoid relationship loading issues
+        # Images relationship: lists preload it for all foods in one query
+        # (FoodRepository.preload_images / selectinload), single foods lazy load
         try:
-            food_images = db.session.query(FoodImage).filter_by(food_id=self.id).all()
-
-            for image in food_images:
+            for image in self.images:
                 image_dict = image.to_dict()
                 all_images.append(image_dict)
                 if image.is_main and main_image is None:
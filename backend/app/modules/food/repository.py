@@ -1,4 +1,7 @@
 from app.extensions import db
+from sqlalchemy import inspect
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from app.modules.food.models import Food, FoodImage
 from app.utils import get_logger
 logger = get_logger(__name__)
@@ -73,9 +76,16 @@ class FoodRepository:
         # Get total count for pagination
         total_count = query.count()
 
-        # Apply pagination with proper ordering
-        foods = query.order_by(Food.created_at.desc()).paginate(
-            page=page, per_page=limit, error_out=False
+        # Apply pagination with proper ordering; related rows of the page are
+        # loaded with one query per relationship
+        foods = (
+            query.options(
+                selectinload(Food.rating_stats),
+                selectinload(Food.images),
+                selectinload(Food.restaurant),
+            )
+            .order_by(Food.created_at.desc())
+            .paginate(page=page, per_page=limit, error_out=False)
         )
         total_foods_count = Food.query.count()
 
@@ -91,6 +101,32 @@ class FoodRepository:
             "total_foods": total_foods_count,
         }
 
+    @staticmethod
+    def preload_images(foods):
+        """
+        Load the images of many foods in one IN query into their images
+        collections, so serializing them issues no further image queries
+        """
+        pending = {}
+        for food in foods:
+            if food is not None and "images" in inspect(food).unloaded:
+                pending[food.id] = food
+        if not pending:
+            return foods
+
+        logger.debug(f"Memuat gambar untuk {len(pending)} makanan sekaligus")
+        images = {food_id: [] for food_id in pending}
+        for image in (
+            FoodImage.query.filter(FoodImage.food_id.in_(list(pending)))
+            .order_by(FoodImage.created_at.asc())
+            .all()
+        ):
+            images[image.food_id].append(image)
+
+        for food_id, food in pending.items():
+            set_committed_value(food, "images", images[food_id])
+        return foods
+
     @staticmethod
     def get_by_id(food_id):
         logger.debug(f"Mencari makanan dengan ID: {food_id}")
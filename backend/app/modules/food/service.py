@@ -9,6 +9,7 @@ from typing import List, Dict, Optional, Any, Union, Text
 from werkzeug.utils import secure_filename
 from werkzeug.datastructures import FileStorage
 from flask import current_app
+from sqlalchemy.orm import selectinload
 
 
 class FoodService:
@@ -38,24 +39,25 @@ class FoodService:
         else:
             base_data["restaurant"] = {}
 
-        # ratings - calculate from the ratings list
-        if hasattr(food, "ratings") and food.ratings:
-            # Calculate average rating from the list of ratings
-            ratings_list = food.ratings
-            if ratings_list:
-                total_rating = sum(rating.rating for rating in ratings_list)
-                average_rating = total_rating / len(ratings_list)
-                base_data["ratings"] = {
-                    "average": round(average_rating, 1),
-                    "count": len(ratings_list),
-                }
-            else:
-                base_data["ratings"] = {"average": 0, "count": 0}
+        # ratings - from the materialized stats (preloaded on list pages)
+        rating_stats = getattr(food, "rating_stats", None)
+        if rating_stats and rating_stats.rating_count:
+            base_data["ratings"] = {
+                "average": round(rating_stats.average, 1),
+                "count": rating_stats.rating_count,
+            }
         else:
             base_data["ratings"] = {"average": 0, "count": 0}
 
         return base_data
 
+    @staticmethod
+    def to_dict_list_with_main_image(foods: List[Food]) -> List[Dict[str, Any]]:
+        """Convert a list of foods with to_dict_with_main_image, loading the
+        images of all of them in one query first"""
+        FoodRepository.preload_images(foods)
+        return [FoodService.to_dict_with_main_image(food) for food in foods]
+
     @staticmethod
     def get_all_foods() -> List[Food]:
         """Get all foods - returns ORM objects"""
@@ -90,10 +92,7 @@ class FoodService:
         logger.info(f"result: {result['total_foods']} foods found")
 
         # Use service method that includes main image
-        foods_dict = []
-        for food in result["items"]:
-            base_data = FoodService.to_dict_with_main_image(food)
-            foods_dict.append(base_data)
+        foods_dict = FoodService.to_dict_list_with_main_image(result["items"])
 
         return {
             "items": foods_dict,
@@ -252,6 +251,7 @@ class FoodService:
             # Use proper query without complex joinedload for now
             foods_query = (
                 Food.query.filter(Food.restaurant_id == restaurant_id)
+                .options(selectinload(Food.rating_stats))
                 .order_by(Food.created_at.desc())
                 .limit(limit)
                 .all()
@@ -269,10 +269,7 @@ class FoodService:
             result = FoodRepository.get_all_with_limit(page=page, limit=limit)
 
         # Use service method that includes main image and restaurant name
-        foods_dict = []
-        for food in result["items"]:
-            base_data = FoodService.to_dict_with_main_image(food)
-            foods_dict.append(base_data)
+        foods_dict = FoodService.to_dict_list_with_main_image(result["items"])
 
         return {
             "items": foods_dict,
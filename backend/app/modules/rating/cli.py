@@ -0,0 +1,17 @@
+"""
+Rating CLI Module
+`flask ratings ...` maintenance commands
+"""
+
+import click
+from flask.cli import AppGroup
+from app.modules.rating.repository import FoodRatingStatsRepository
+
+rating_cli = AppGroup("ratings", help="Rating maintenance commands")
+
+
+@rating_cli.command("recompute-stats")
+def recompute_stats_command():
+    """Rebuild food_rating_stats from food_ratings (e.g. after bulk imports)"""
+    n_foods = FoodRatingStatsRepository.recompute_all()
+    click.echo(f"Recomputed rating stats of {n_foods} foods")
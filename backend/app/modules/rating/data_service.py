@@ -3,8 +3,12 @@ Rating data service for handling complex rating data operations
 This handles data aggregation and business logic related to rating data presentation
 """
 
-from .models import FoodRating, RestaurantRating
-from .repository import FoodRatingRepository, RestaurantRatingRepository
+from .models import FoodRating, RestaurantRating, FoodRatingStats
+from .repository import (
+    FoodRatingRepository,
+    FoodRatingStatsRepository,
+    RestaurantRatingRepository,
+)
 from app.extensions import db
 import logging
 from typing import Dict, Any, List, Optional
@@ -29,12 +33,15 @@ class RatingDataService:
         logger.debug(f"Getting rating statistics for food: {food_id}")
 
         try:
-            # Get basic stats
-            average_rating = FoodRatingRepository.get_food_average_rating(food_id)
-            rating_count = FoodRatingRepository.get_food_rating_count(food_id)
+            # Average, count and distribution from the materialized stats row
+            stats = FoodRatingStatsRepository.get_by_food_id(food_id)
+            average_rating = stats.average if stats else 0.0
+            rating_count = stats.rating_count if stats else 0
 
             # Get rating distribution
-            distribution = RatingDataService._get_food_rating_distribution(food_id)
+            distribution = RatingDataService._get_food_rating_distribution(
+                food_id, stats
+            )
 
             return {
                 "food_id": food_id,
@@ -280,29 +287,17 @@ class RatingDataService:
 
     # Private helper methods
     @staticmethod
-    def _get_food_rating_distribution(food_id: str) -> Dict[int, int]:
-        """Get rating distribution (count per rating value) for a food"""
+    def _get_food_rating_distribution(
+        food_id: str, stats: Optional[FoodRatingStats] = None
+    ) -> Dict[int, int]:
+        """Get rating distribution (count per rounded rating value) for a food"""
         try:
-            # Initialize distribution
-            distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-
-            # Query database for rating counts
-            from sqlalchemy import func
-
-            results = (
-                db.session.query(FoodRating.rating, func.count(FoodRating.rating))
-                .filter_by(food_id=food_id)
-                .group_by(FoodRating.rating)
-                .all()
-            )
+            if stats is None:
+                stats = FoodRatingStatsRepository.get_by_food_id(food_id)
+            if stats is None:
+                return {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
 
-            # Populate distribution
-            for rating_value, count in results:
-                rating_int = int(round(rating_value))
-                if 1 <= rating_int <= 5:
-                    distribution[rating_int] = count
-
-            return distribution
+            return stats.distribution()
 
         except Exception as e:
             logger.error(
@@ -1,6 +1,8 @@
 from app.extensions import db
 from datetime import datetime, timezone
-from sqlalchemy import text
+from sqlalchemy import event, inspect, text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
 import uuid
 import json
 
@@ -12,10 +14,20 @@ class FoodRating(db.Model):
     user_id = db.Column(
         db.String(36), db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
-    food_id = db.Column(
-        db.String(36), db.ForeignKey("foods.id", ondelete="CASCADE"), nullable=False
+    # active_history: changing an expired instance still loads the old value,
+    # which the food_rating_stats listener subtracts
+    food_id = db.column_property(
+        db.Column(
+            db.String(36),
+            db.ForeignKey("foods.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        active_history=True,
+    )
+    rating = db.column_property(
+        db.Column(db.Float, nullable=False),  # Final average rating from 1-5
+        active_history=True,
     )
-    rating = db.Column(db.Float, nullable=False)  # Final average rating from 1-5
     rating_details = db.Column(
         db.JSON, nullable=False
     )  # Detailed ratings for each criteria
@@ -30,6 +42,7 @@ class FoodRating(db.Model):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
         server_default=text("UTC_TIMESTAMP()"),
+        index=True,  # Incremental loading of changed ratings by recommender
     )
 
     # Enforce unique constraint to prevent duplicate ratings
@@ -132,6 +145,7 @@ class RestaurantRating(db.Model):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
         server_default=text("UTC_TIMESTAMP()"),
+        index=True,  # Incremental loading of changed ratings by recommender
     )
 
     # Enforce unique constraint to prevent duplicate ratings
@@ -164,3 +178,186 @@ class RestaurantRating(db.Model):
                 self.updated_at.isoformat() + "Z" if self.updated_at else None
             ),
         }
+
+
+class FoodRatingStats(db.Model):
+    """
+    Materialized rating aggregates of a food, kept in step with food_ratings by
+    the flush listener below (same transaction as the rating write)
+    """
+
+    __tablename__ = "food_rating_stats"
+
+    RATING_BUCKETS = (1, 2, 3, 4, 5)
+
+    food_id = db.Column(
+        db.String(36), db.ForeignKey("foods.id", ondelete="CASCADE"), primary_key=True
+    )
+    rating_sum = db.Column(db.Double, nullable=False, default=0.0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Distribution: ratings per rounded value
+    count_1 = db.Column(db.Integer, nullable=False, default=0)
+    count_2 = db.Column(db.Integer, nullable=False, default=0)
+    count_3 = db.Column(db.Integer, nullable=False, default=0)
+    count_4 = db.Column(db.Integer, nullable=False, default=0)
+    count_5 = db.Column(db.Integer, nullable=False, default=0)
+
+    updated_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=text("UTC_TIMESTAMP()"),
+    )
+
+    # Note: food relationship is defined via backref in Food model
+
+    @staticmethod
+    def bucket(rating):
+        """Distribution bucket of a rating value (nearest whole star)"""
+        return min(5, max(1, int(round(rating))))
+
+    @property
+    def average(self):
+        return self.rating_sum / self.rating_count if self.rating_count else 0.0
+
+    def distribution(self):
+        """Ratings per bucket as {1: n, ..., 5: n}"""
+        return {
+            bucket: getattr(self, f"count_{bucket}") or 0
+            for bucket in self.RATING_BUCKETS
+        }
+
+    def __repr__(self):
+        return f"<FoodRatingStats Food:{self.food_id} Count:{self.rating_count}>"
+
+    def to_dict(self):
+        return {
+            "food_id": self.food_id,
+            "average": self.average,
+            "count": self.rating_count,
+            "distribution": self.distribution(),
+        }
+
+
+def _committed_value(state, key):
+    """Value of an attribute as last loaded from or written to the database"""
+    history = state.attrs[key].history
+    values = history.deleted or history.unchanged
+    return values[0] if values else None
+
+
+def _add_rating_delta(deltas, food_id, rating, sign):
+    """Accumulate one added (+1) or removed (-1) rating of a food"""
+    if food_id is None or rating is None:
+        return
+    delta = deltas.setdefault(
+        food_id, {"rating_sum": 0.0, "rating_count": 0, "buckets": {}}
+    )
+    delta["rating_sum"] += sign * rating
+    delta["rating_count"] += sign
+    bucket = FoodRatingStats.bucket(rating)
+    delta["buckets"][bucket] = delta["buckets"].get(bucket, 0) + sign
+
+
+def _upsert_statement(dialect_name, initial, increments):
+    """INSERT .. ON CONFLICT/DUPLICATE KEY UPDATE, or None if unsupported"""
+    table = FoodRatingStats.__table__
+    if dialect_name == "mysql":
+        return mysql.insert(table).values(**initial).on_duplicate_key_update(
+            **increments
+        )
+    if dialect_name in ("sqlite", "postgresql"):
+        dialect = sqlite if dialect_name == "sqlite" else postgresql
+        return (
+            dialect.insert(table)
+            .values(**initial)
+            .on_conflict_do_update(index_elements=[table.c.food_id], set_=increments)
+        )
+    return None
+
+
+def _apply_rating_deltas(connection, deltas):
+    """
+    Apply accumulated rating deltas to food_rating_stats
+
+    Counters are incremented in SQL, so concurrent writers never lose updates.
+    Foods gaining ratings are upserted; the others are only updated, so the
+    ratings of a deleted food do not recreate its row.
+    """
+    table = FoodRatingStats.__table__
+    now = datetime.now(timezone.utc)
+
+    for food_id, delta in deltas.items():
+        increments = {
+            "rating_sum": table.c.rating_sum + delta["rating_sum"],
+            "rating_count": table.c.rating_count + delta["rating_count"],
+            "updated_at": now,
+        }
+        initial = {
+            "food_id": food_id,
+            "rating_sum": delta["rating_sum"],
+            "rating_count": delta["rating_count"],
+            "updated_at": now,
+        }
+        for bucket in FoodRatingStats.RATING_BUCKETS:
+            column = f"count_{bucket}"
+            bucket_delta = delta["buckets"].get(bucket, 0)
+            increments[column] = table.c[column] + bucket_delta
+            initial[column] = bucket_delta
+
+        upsert = (
+            _upsert_statement(connection.dialect.name, initial, increments)
+            if delta["rating_count"] > 0
+            else None
+        )
+        if upsert is not None:
+            connection.execute(upsert)
+            continue
+
+        result = connection.execute(
+            table.update().where(table.c.food_id == food_id).values(**increments)
+        )
+        if result.rowcount == 0 and delta["rating_count"] > 0:
+            connection.execute(table.insert().values(**initial))
+
+
+@event.listens_for(Session, "after_flush")
+def _update_food_rating_stats(session, flush_context):
+    """Fold the food ratings created, changed or deleted by a flush into
+    food_rating_stats, including deletes cascaded from users and foods"""
+    deltas = {}
+
+    for instance in session.new:
+        if isinstance(instance, FoodRating):
+            _add_rating_delta(deltas, instance.food_id, instance.rating, 1)
+
+    for instance in session.deleted:
+        if isinstance(instance, FoodRating):
+            state = inspect(instance)
+            _add_rating_delta(
+                deltas,
+                _committed_value(state, "food_id"),
+                _committed_value(state, "rating"),
+                -1,
+            )
+
+    for instance in session.dirty:
+        if not isinstance(instance, FoodRating):
+            continue
+        state = inspect(instance)
+        if not (
+            state.attrs.rating.history.has_changes()
+            or state.attrs.food_id.history.has_changes()
+        ):
+            continue
+        _add_rating_delta(
+            deltas,
+            _committed_value(state, "food_id"),
+            _committed_value(state, "rating"),
+            -1,
+        )
+        _add_rating_delta(deltas, instance.food_id, instance.rating, 1)
+
+    if deltas:
+        _apply_rating_deltas(session.connection(), deltas)
@@ -1,10 +1,20 @@
 from app.extensions import db
-from app.modules.rating.models import FoodRating, RestaurantRating
+from datetime import datetime, timezone
+from app.modules.rating.models import FoodRating, RestaurantRating, FoodRatingStats
+from app.modules.recommendation.models import UserRecommendation
 from app.utils import get_logger
 logger = get_logger(__name__)
 from sqlalchemy import func
 
 
+def _discard_precomputed_recommendations(user_id):
+    """Drop a user's precomputed recommendations in the current transaction; a
+    deleted rating leaves no newer timestamp for the staleness check to see"""
+    db.session.query(UserRecommendation).filter(
+        UserRecommendation.user_id == user_id
+    ).delete(synchronize_session=False)
+
+
 class FoodRatingRepository:
     @staticmethod
     def get_by_food_id(food_id, page=1, limit=10):
@@ -57,22 +67,19 @@ class FoodRatingRepository:
 
     @staticmethod
     def get_food_average_rating(food_id):
-        """Calculate average rating for a food"""
-        logger.info(f"Menghitung rata-rata rating untuk makanan {food_id}")
-        result = (
-            db.session.query(func.avg(FoodRating.rating))
-            .filter_by(food_id=food_id)
-            .scalar()
-        )
-        avg_rating = round(float(result), 2) if result else 0.0
+        """Get average rating for a food from its materialized stats"""
+        logger.info(f"Mengambil rata-rata rating untuk makanan {food_id}")
+        stats = FoodRatingStatsRepository.get_by_food_id(food_id)
+        avg_rating = round(stats.average, 2) if stats else 0.0
         logger.info(f"Rata-rata rating untuk makanan {food_id}: {avg_rating}")
         return avg_rating
 
     @staticmethod
     def get_food_rating_count(food_id):
-        """Get total number of ratings for a food"""
-        logger.debug(f"Menghitung jumlah rating untuk makanan {food_id}")
-        count = FoodRating.query.filter_by(food_id=food_id).count()
+        """Get total number of ratings for a food from its materialized stats"""
+        logger.debug(f"Mengambil jumlah rating untuk makanan {food_id}")
+        stats = FoodRatingStatsRepository.get_by_food_id(food_id)
+        count = stats.rating_count if stats else 0
         logger.info(f"Jumlah rating untuk makanan {food_id}: {count}")
         return count
 
@@ -125,6 +132,7 @@ class FoodRatingRepository:
         """Delete rating"""
         try:
             db.session.delete(rating)
+            _discard_precomputed_recommendations(rating.user_id)
             db.session.commit()
             logger.info(f"Rating dengan ID {rating.id} berhasil dihapus")
             return True
@@ -143,6 +151,86 @@ class FoodRatingRepository:
 RatingRepository = FoodRatingRepository
 
 
+class FoodRatingStatsRepository:
+    @staticmethod
+    def get_by_food_id(food_id):
+        """Get materialized rating stats of a food (None if never rated)"""
+        return db.session.get(FoodRatingStats, food_id)
+
+    @staticmethod
+    def get_by_food_ids(food_ids):
+        """Get materialized rating stats of many foods in one query"""
+        if not food_ids:
+            return {}
+        stats = FoodRatingStats.query.filter(
+            FoodRatingStats.food_id.in_(list(food_ids))
+        ).all()
+        return {row.food_id: row for row in stats}
+
+    @staticmethod
+    def get_totals():
+        """Get total rating count and rating sum over all foods"""
+        total_count, total_sum = db.session.query(
+            func.coalesce(func.sum(FoodRatingStats.rating_count), 0),
+            func.coalesce(func.sum(FoodRatingStats.rating_sum), 0.0),
+        ).one()
+        return int(total_count), float(total_sum)
+
+    @staticmethod
+    def recompute_all():
+        """
+        Rebuild food_rating_stats from food_ratings in one transaction
+
+        Ratings are grouped by (food, value) in SQL and bucketed with the same
+        rule as the write path. Ratings written while this runs can be missed,
+        so run it while writes are quiet (after migrations or bulk imports).
+
+        Returns:
+            int: Number of foods with ratings
+        """
+        logger.info("Menghitung ulang statistik rating makanan")
+        try:
+            rows = (
+                db.session.query(
+                    FoodRating.food_id, FoodRating.rating, func.count(FoodRating.id)
+                )
+                .group_by(FoodRating.food_id, FoodRating.rating)
+                .all()
+            )
+
+            now = datetime.now(timezone.utc)
+            stats = {}
+            for food_id, rating, count in rows:
+                entry = stats.get(food_id)
+                if entry is None:
+                    entry = stats[food_id] = {
+                        "food_id": food_id,
+                        "rating_sum": 0.0,
+                        "rating_count": 0,
+                        "updated_at": now,
+                    }
+                    for bucket in FoodRatingStats.RATING_BUCKETS:
+                        entry[f"count_{bucket}"] = 0
+                entry["rating_sum"] += rating * count
+                entry["rating_count"] += count
+                entry[f"count_{FoodRatingStats.bucket(rating)}"] += count
+
+            db.session.query(FoodRatingStats).delete(synchronize_session=False)
+            if stats:
+                db.session.execute(
+                    FoodRatingStats.__table__.insert(), list(stats.values())
+                )
+            db.session.commit()
+
+            logger.info(f"Statistik rating dihitung ulang untuk {len(stats)} makanan")
+            return len(stats)
+
+        except Exception as e:
+            logger.error(f"Gagal menghitung ulang statistik rating: {str(e)}")
+            db.session.rollback()
+            raise
+
+
 class RestaurantRatingRepository:
     @staticmethod
     def get_by_restaurant_id(restaurant_id, page=1, limit=10):
@@ -247,6 +335,7 @@ class RestaurantRatingRepository:
     def delete(rating):
         try:
             db.session.delete(rating)
+            _discard_precomputed_recommendations(rating.user_id)
             db.session.commit()
             logger.info(f"Rating restaurant dengan ID {rating.id} berhasil dihapus")
             return True
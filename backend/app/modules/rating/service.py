@@ -10,6 +10,20 @@ logger = get_logger(__name__)
 from typing import Dict, Any, List, Optional
 
 
+def _notify_recommender(user_id: str) -> None:
+    """Tell the recommender that a user's ratings changed (cache + snapshot)"""
+    try:
+        from app.modules.recommendation.controller import get_existing_recommender
+
+        # Without a recommender there is no snapshot or cache to update yet;
+        # creating one here would start a training scheduler as a side effect
+        recommender = get_existing_recommender()
+        if recommender is not None:
+            recommender.on_user_ratings_changed(user_id)
+    except Exception as e:
+        logger.warning(f"Could not notify recommender for user {user_id}: {e}")
+
+
 class FoodRatingService:
     """Service for food rating business logic"""
 
@@ -96,6 +110,7 @@ class FoodRatingService:
             existing_rating.update_rating_details(validated_data["rating_details"])
             updated_rating = FoodRatingRepository.update(existing_rating, {})
             logger.info(f"Rating updated for food {food_id} by user {user_id}")
+            _notify_recommender(user_id)
             return updated_rating.to_dict()
         else:
             # Create new rating
@@ -106,6 +121,7 @@ class FoodRatingService:
             )
             created_rating = FoodRatingRepository.create_instance(new_rating)
             logger.info(f"New rating created for food {food_id} by user {user_id}")
+            _notify_recommender(user_id)
             return created_rating.to_dict()
 
     @staticmethod
@@ -127,6 +143,7 @@ class FoodRatingService:
         success = FoodRatingRepository.delete(rating)
         if success:
             logger.info(f"Rating deleted for food {food_id} by user {user_id}")
+            _notify_recommender(user_id)
         return success
 
     @staticmethod
@@ -266,6 +283,7 @@ class RestaurantRatingService:
             logger.info(
                 f"Restaurant rating updated for {restaurant_id} by user {user_id}"
             )
+            _notify_recommender(user_id)
             return updated_rating.to_dict()
         else:
             # Create new rating
@@ -279,6 +297,7 @@ class RestaurantRatingService:
             logger.info(
                 f"New restaurant rating created for {restaurant_id} by user {user_id}"
             )
+            _notify_recommender(user_id)
             return created_rating.to_dict()
 
     @staticmethod
@@ -306,5 +325,6 @@ class RestaurantRatingService:
             logger.info(
                 f"Restaurant rating deleted for {restaurant_id} by user {user_id}"
             )
+            _notify_recommender(user_id)
 
         return success
@@ -1,2 +1,3 @@
-# Import all controllers to make them available
+# Import all models and controllers to make them available
+from app.modules.recommendation.models import UserRecommendation
 from app.modules.recommendation.controller import recommendation_blueprint
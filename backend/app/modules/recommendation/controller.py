@@ -1,23 +1,43 @@
-from flask import Blueprint, request, g
+import threading
+from flask import Blueprint, request, g, current_app
 from app.recommendation.recommender import Recommendations
 from app.recommendation.config import RecommendationConfig
+from app.recommendation.scheduler import TrainingScheduler
 from app.utils import get_logger
 logger = get_logger(__name__)
-from app.utils.auth import token_required
+from app.utils.auth import token_required, admin_required
 from app.utils.response import ResponseHelper
 
 recommendation_blueprint = Blueprint("recommendation", __name__)
 
-# Initialize recommendation system singleton
+# Initialize recommendation system singleton (shared by all request threads)
 _recommender = None
+_recommender_lock = threading.Lock()
 
 
 def get_recommender():
     """Get or create recommender instance"""
     global _recommender
     if _recommender is None:
-        _recommender = Recommendations()
-        RecommendationConfig.initialize()
+        with _recommender_lock:
+            if _recommender is None:
+                RecommendationConfig.initialize()
+                recommender = Recommendations()
+
+                # Keep data and model fresh in the background, off the request path
+                if RecommendationConfig.TRAINING_MODE in ("thread", "worker"):
+                    TrainingScheduler(
+                        current_app._get_current_object(),
+                        recommender,
+                        train=RecommendationConfig.TRAINING_MODE == "thread",
+                    ).start()
+
+                _recommender = recommender
+    return _recommender
+
+
+def get_existing_recommender():
+    """Get the recommender instance if one was created, without creating it"""
     return _recommender
 
 
@@ -56,12 +76,22 @@ def get_recommendations():
         recommender = get_recommender()
 
         # Import utility functions
-        from .utils import get_food_details_batch, format_foods_response
+        from .utils import (
+            get_food_details_batch,
+            format_foods_response,
+            get_precomputed_recommendations,
+        )
+
+        # Nightly precomputed rows first; compute online on a miss or stale rows
+        precomputed_recommendations = get_precomputed_recommendations(user_id, limit)
+        if precomputed_recommendations is not None:
+            logger.debug(f"Rekomendasi precomputed ditemukan untuk user {user_id}")
 
         if include_scores:
             # Get recommendations with predicted ratings
-            detailed_recommendations = recommender.recommend_with_scores(
-                user_id=user_id, top_n=limit
+            detailed_recommendations = (
+                precomputed_recommendations
+                or recommender.recommend_with_scores(user_id=user_id, top_n=limit)
             )
 
             if not detailed_recommendations:
@@ -116,7 +146,14 @@ def get_recommendations():
 
         else:
             # Legacy mode: only food IDs without scores
-            recommended_food_ids = recommender.recommend(user_id=user_id, top_n=limit)
+            if precomputed_recommendations is not None:
+                recommended_food_ids = [
+                    rec["food_id"] for rec in precomputed_recommendations
+                ]
+            else:
+                recommended_food_ids = recommender.recommend(
+                    user_id=user_id, top_n=limit
+                )
 
             if not recommended_food_ids:
                 logger.warning(f"No recommendations found for user {user_id}")
@@ -157,6 +194,163 @@ def get_recommendations():
         return ResponseHelper.internal_server_error("Failed to get recommendations")
 
 
+@recommendation_blueprint.route("/recommendation/batch", methods=["POST"])
+@admin_required
+def get_batch_recommendations():
+    """Get food recommendations with predicted ratings for many users in one call"""
+    data = request.get_json(silent=True) or {}
+    user_ids = data.get("user_ids")
+    limit = data.get("limit", RecommendationConfig.DEFAULT_RECOMMENDATIONS)
+
+    if not isinstance(user_ids, list) or not user_ids:
+        return ResponseHelper.validation_error("user_ids must be a non-empty list")
+
+    if len(user_ids) > RecommendationConfig.MAX_BATCH_USERS:
+        return ResponseHelper.validation_error(
+            f"At most {RecommendationConfig.MAX_BATCH_USERS} user_ids per request"
+        )
+
+    if (
+        not isinstance(limit, int)
+        or limit < RecommendationConfig.MIN_RECOMMENDATIONS
+        or limit > RecommendationConfig.MAX_RECOMMENDATIONS
+    ):
+        return ResponseHelper.validation_error(
+            f"Limit must be between {RecommendationConfig.MIN_RECOMMENDATIONS} and {RecommendationConfig.MAX_RECOMMENDATIONS}"
+        )
+
+    logger.info(
+        f"POST /recommendation/batch - Permintaan rekomendasi untuk {len(user_ids)} user"
+    )
+
+    try:
+        recommender = get_recommender()
+
+        from .utils import get_food_details_batch, format_foods_response
+
+        batch_recommendations = recommender.recommend_many(
+            user_ids=[str(user_id) for user_id in user_ids], top_n=limit
+        )
+
+        # Fetch details of every recommended food in one round trip
+        recommended_food_ids = list(
+            {
+                rec["food_id"]
+                for recommendations in batch_recommendations.values()
+                for rec in recommendations
+            }
+        )
+        foods_data = get_food_details_batch(recommended_food_ids)
+        food_id_map = {food["id"]: food for food in format_foods_response(foods_data)}
+
+        # Enrich with predicted ratings per user
+        enriched_batch = {}
+        for user_id, recommendations in batch_recommendations.items():
+            enriched_recommendations = []
+            for rec in recommendations:
+                food_id = rec["food_id"]
+                if food_id in food_id_map:
+                    food_data = food_id_map[food_id].copy()
+                    food_data["predicted_rating"] = rec["predicted_rating"]
+                    food_data["rank"] = rec["rank"]
+                    enriched_recommendations.append(food_data)
+            enriched_batch[user_id] = enriched_recommendations
+
+        logger.info(
+            f"Mengembalikan rekomendasi untuk {len(enriched_batch)} user "
+            f"({len(food_id_map)} makanan unik)"
+        )
+
+        return ResponseHelper.success(
+            data={
+                "recommendations": enriched_batch,
+                "count": len(enriched_batch),
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error getting batch recommendations: {str(e)}")
+        return ResponseHelper.internal_server_error(
+            "Failed to get batch recommendations"
+        )
+
+
+@recommendation_blueprint.route("/recommendation/stats", methods=["GET"])
+@admin_required
+def get_recommendation_stats():
+    """Get recommender statistics, including per-stage latency percentiles"""
+    logger.info("GET /recommendation/stats - Mengambil statistik sistem rekomendasi")
+
+    try:
+        system_stats = get_recommender().get_system_stats()
+        if "error" in system_stats:
+            return ResponseHelper.internal_server_error(
+                "Failed to get recommendation stats"
+            )
+
+        return ResponseHelper.success(data=system_stats)
+
+    except Exception as e:
+        logger.error(f"Error getting recommendation stats: {str(e)}")
+        return ResponseHelper.internal_server_error(
+            "Failed to get recommendation stats"
+        )
+
+
+@recommendation_blueprint.route("/foods/<string:food_id>/similar", methods=["GET"])
+def get_similar_foods(food_id):
+    """Get foods similar to a food from the precomputed item neighbor table"""
+    limit = request.args.get(
+        "limit", default=RecommendationConfig.DEFAULT_RECOMMENDATIONS, type=int
+    )
+
+    if limit < 1 or limit > RecommendationConfig.ITEM_NEIGHBORS_TOP_K:
+        return ResponseHelper.validation_error(
+            f"Limit must be between 1 and {RecommendationConfig.ITEM_NEIGHBORS_TOP_K}"
+        )
+
+    logger.info(f"GET /foods/{food_id}/similar - Mencari makanan serupa, limit={limit}")
+
+    try:
+        recommender = get_recommender()
+
+        from .utils import get_food_details_batch, format_foods_response
+
+        similar_foods = recommender.get_similar_foods(food_id, top_n=limit)
+        if not similar_foods:
+            return ResponseHelper.success(
+                data={
+                    "food_id": food_id,
+                    "similar_foods": [],
+                    "count": 0,
+                }
+            )
+
+        foods_data = get_food_details_batch([food["food_id"] for food in similar_foods])
+        food_id_map = {food["id"]: food for food in format_foods_response(foods_data)}
+
+        # Keep neighbor order and add the similarity score
+        enriched_foods = []
+        for similar in similar_foods:
+            if similar["food_id"] in food_id_map:
+                food_data = food_id_map[similar["food_id"]].copy()
+                food_data["similarity"] = similar["similarity"]
+                food_data["rank"] = similar["rank"]
+                enriched_foods.append(food_data)
+
+        return ResponseHelper.success(
+            data={
+                "food_id": food_id,
+                "similar_foods": enriched_foods,
+                "count": len(enriched_foods),
+            }
+        )
+
+    except Exception as e:
+        logger.error(f"Error getting similar foods for {food_id}: {str(e)}")
+        return ResponseHelper.internal_server_error("Failed to get similar foods")
+
+
 @recommendation_blueprint.route("/popular", methods=["GET"])
 def get_popular_foods():
     """Get popular foods based on rating count and total ratings"""
@@ -0,0 +1,44 @@
+from app.extensions import db
+from datetime import datetime, timezone
+from sqlalchemy import text
+
+
+class UserRecommendation(db.Model):
+    """Precomputed top-N recommendation of a user, written by the nightly job"""
+
+    __tablename__ = "user_recommendations"
+
+    # (user_id, rank) keeps a user's list contiguous for the serving lookup
+    user_id = db.Column(
+        db.String(36),
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    rank = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    food_id = db.Column(
+        db.String(36), db.ForeignKey("foods.id", ondelete="CASCADE"), nullable=False
+    )
+    score = db.Column(db.Float, nullable=False)  # Predicted rating
+    model_version = db.Column(db.String(32), nullable=False)
+
+    computed_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=text("UTC_TIMESTAMP()"),
+        index=True,  # Pruning of rows the latest run did not rewrite
+    )
+
+    def __repr__(self):
+        return f"<UserRecommendation User:{self.user_id} Rank:{self.rank} Food:{self.food_id}>"
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "food_id": self.food_id,
+            "score": self.score,
+            "rank": self.rank,
+            "model_version": self.model_version,
+            "computed_at": (
+                self.computed_at.isoformat() + "Z" if self.computed_at else None
+            ),
+        }
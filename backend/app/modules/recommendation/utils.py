@@ -2,17 +2,23 @@
 Utility functions for recommendation module
 """
 
+from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
-from app.modules.food.models import Food, FoodImage
+from app.modules.food.models import Food
 from app.modules.restaurant.models import Restaurant
-from app.modules.rating.models import FoodRating
+from app.modules.rating.models import FoodRating, FoodRatingStats, RestaurantRating
+from app.modules.recommendation.models import UserRecommendation
 from app.extensions import db
 from sqlalchemy import func
+from sqlalchemy.orm import selectinload
 from app.utils.logger import get_logger
+from app.recommendation.config import RecommendationConfig
+from app.recommendation.latency import latency_recorder
 
 logger = get_logger(__name__)
 
 
+@latency_recorder.timed("enrichment")
 def get_food_details_batch(food_ids: List[str]) -> List[Dict[str, Any]]:
     """
     Get complete food details for a batch of food IDs
@@ -27,11 +33,12 @@ def get_food_details_batch(food_ids: List[str]) -> List[Dict[str, Any]]:
         if not food_ids:
             return []
 
-        # Query foods with their restaurants in one go
+        # Query foods with their restaurants in one go, images in one more query
         foods_query = (
             db.session.query(Food, Restaurant)
             .outerjoin(Restaurant, Food.restaurant_id == Restaurant.id)
             .filter(Food.id.in_(food_ids))
+            .options(selectinload(Food.images))
         )
 
         foods_data = foods_query.all()
@@ -39,38 +46,23 @@ def get_food_details_batch(food_ids: List[str]) -> List[Dict[str, Any]]:
         if not foods_data:
             return []
 
-        # Get all food ratings for calculating averages
-        ratings_query = (
-            db.session.query(
-                FoodRating.food_id,
-                func.avg(FoodRating.rating).label("avg_rating"),
-                func.count(FoodRating.id).label("rating_count"),
-            )
-            .filter(FoodRating.food_id.in_(food_ids))
-            .group_by(FoodRating.food_id)
+        # Rating averages from the materialized stats (no scan of food_ratings)
+        stats_query = db.session.query(
+            FoodRatingStats.food_id,
+            FoodRatingStats.rating_sum,
+            FoodRatingStats.rating_count,
+        ).filter(
+            FoodRatingStats.food_id.in_(food_ids), FoodRatingStats.rating_count > 0
         )
 
         ratings_data = {
-            rating.food_id: {
-                "average": float(rating.avg_rating) if rating.avg_rating else 0,
-                "count": int(rating.rating_count),
+            stats.food_id: {
+                "average": float(stats.rating_sum) / stats.rating_count,
+                "count": int(stats.rating_count),
             }
-            for rating in ratings_query.all()
+            for stats in stats_query.all()
         }
 
-        # Get all images for these foods
-        images_query = (
-            db.session.query(FoodImage)
-            .filter(FoodImage.food_id.in_(food_ids))
-            .order_by(FoodImage.is_main.desc(), FoodImage.created_at.asc())
-        )
-
-        images_data = {}
-        for image in images_query.all():
-            if image.food_id not in images_data:
-                images_data[image.food_id] = []
-            images_data[image.food_id].append(image.to_dict())
-
         # Build complete food data
         result = []
         for food, restaurant in foods_data:
@@ -86,8 +78,17 @@ def get_food_details_batch(food_ids: List[str]) -> List[Dict[str, Any]]:
             food_id = food.id
             food_dict["ratings"] = ratings_data.get(food_id, {"average": 0, "count": 0})
 
-            # Add images information
-            food_images = images_data.get(food_id, [])
+            # Add images information (main images first, then oldest first)
+            food_images = [
+                image.to_dict()
+                for image in sorted(
+                    food.images,
+                    key=lambda image: (
+                        not image.is_main,
+                        image.created_at or datetime.min,
+                    ),
+                )
+            ]
             food_dict["images"] = food_images
 
             # Find main image
@@ -126,6 +127,71 @@ def get_food_details_batch(food_ids: List[str]) -> List[Dict[str, Any]]:
         return []
 
 
+@latency_recorder.timed("precomputed_lookup")
+def get_precomputed_recommendations(
+    user_id: str, top_n: int
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get a user's recommendations from the nightly precomputed table
+
+    Args:
+        user_id: User ID
+        top_n: Number of recommendations requested
+
+    Returns:
+        Optional[List[Dict]]: Recommendation dicts (food_id, predicted_rating,
+            rank) as returned by recommend_with_scores, or None on a miss: fewer
+            rows than requested, rows older than PRECOMPUTE_MAX_AGE, or a food
+            or restaurant rating written by the user since the snapshot the
+            rows were computed from was loaded
+    """
+    try:
+        rows = (
+            db.session.query(UserRecommendation)
+            .filter(UserRecommendation.user_id == user_id)
+            .order_by(UserRecommendation.rank)
+            .limit(top_n)
+            .all()
+        )
+        if len(rows) < top_n:
+            return None
+
+        # Stored as naive UTC; every row of a user comes from the same run
+        computed_at = rows[0].computed_at.replace(tzinfo=None)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        age = (now - computed_at).total_seconds()
+        if age > RecommendationConfig.PRECOMPUTE_MAX_AGE:
+            return None
+
+        # A newer food or restaurant rating (both feed hybrid scoring) could be
+        # recommended back or shift the whole list; deleting a rating drops the
+        # user's rows outright (see FoodRatingRepository.delete)
+        for model in (FoodRating, RestaurantRating):
+            last_rated_at = (
+                db.session.query(func.max(model.updated_at))
+                .filter(model.user_id == user_id)
+                .scalar()
+            )
+            if (
+                last_rated_at is not None
+                and last_rated_at.replace(tzinfo=None) > computed_at
+            ):
+                return None
+
+        return [
+            {
+                "food_id": row.food_id,
+                "predicted_rating": round(float(row.score), 3),
+                "rank": row.rank,
+            }
+            for row in rows
+        ]
+
+    except Exception as e:
+        logger.error(f"Error fetching precomputed recommendations: {e}")
+        return None
+
+
 def get_popular_foods_data(
     limit: int = 10, min_ratings: int = 5
 ) -> List[Dict[str, Any]]:
@@ -140,7 +206,10 @@ def get_popular_foods_data(
         List of food dictionaries with popularity metrics
     """
     try:
-        # Query foods with their rating statistics
+        # Query foods with their materialized rating statistics
+        rating_count = func.coalesce(FoodRatingStats.rating_count, 0)
+        total_rating_score = func.coalesce(FoodRatingStats.rating_sum, 0.0)
+        average_rating = total_rating_score / func.nullif(rating_count, 0)
         popular_query = (
             db.session.query(
                 Food.id,
@@ -148,21 +217,16 @@ def get_popular_foods_data(
                 Food.description,
                 Food.price,
                 Food.restaurant_id,
-                func.avg(FoodRating.rating).label("average_rating"),
-                func.count(FoodRating.id).label("rating_count"),
-                (func.avg(FoodRating.rating) * func.count(FoodRating.id)).label(
-                    "total_rating_score"
-                ),
+                average_rating.label("average_rating"),
+                rating_count.label("rating_count"),
+                total_rating_score.label("total_rating_score"),
             )
-            .outerjoin(FoodRating, Food.id == FoodRating.food_id)
-            .group_by(Food.id)
-            .having(func.count(FoodRating.id) >= min_ratings)
+            .outerjoin(FoodRatingStats, Food.id == FoodRatingStats.food_id)
+            .filter(rating_count >= min_ratings)
             .order_by(
-                (
-                    func.avg(FoodRating.rating) * func.count(FoodRating.id)
-                ).desc(),  # Total rating score
-                func.count(FoodRating.id).desc(),  # Rating count as secondary sort
-                func.avg(FoodRating.rating).desc(),  # Average rating as tertiary sort
+                total_rating_score.desc(),  # Total rating score
+                rating_count.desc(),  # Rating count as secondary sort
+                average_rating.desc(),  # Average rating as tertiary sort
             )
             .limit(limit)
         )
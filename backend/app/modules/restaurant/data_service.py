@@ -14,6 +14,27 @@ logger = get_logger(__name__)
 class RestaurantDataService:
     """Service for complex restaurant data operations and aggregation"""
 
+    @staticmethod
+    def to_dict_list(restaurants):
+        """
+        Serialize a list of restaurants, loading the categories of all of them
+        in one query instead of per restaurant.
+
+        Args:
+            restaurants (list): Restaurant objects (None entries are skipped)
+
+        Returns:
+            list: Restaurant dicts in input order
+        """
+        restaurants = [restaurant for restaurant in restaurants if restaurant]
+        categories = RestaurantRepository.get_categories_by_restaurant_ids(
+            {restaurant.id for restaurant in restaurants}
+        )
+        return [
+            restaurant.to_dict(categories=categories[restaurant.id])
+            for restaurant in restaurants
+        ]
+
     @staticmethod
     def get_enriched_restaurant_list(page=1, limit=20, search=None):
         """
@@ -32,11 +53,9 @@ class RestaurantDataService:
             result = RestaurantRepository.get_all(page=page, limit=limit, search=search)
 
             # Enrich the data with additional information
-            enriched_restaurants = []
-            for restaurant in result["items"]:
-                enriched_data = restaurant.to_dict()
-                # Add any additional computed fields here if needed
-                enriched_restaurants.append(enriched_data)
+            enriched_restaurants = RestaurantDataService.to_dict_list(
+                result["items"]
+            )
 
             # Add metadata
             return {
@@ -74,7 +93,7 @@ class RestaurantDataService:
             # Group by additional criteria if needed
             summary = {
                 "total_active_restaurants": total_count,
-                "restaurants": [restaurant.to_dict() for restaurant in restaurants],
+                "restaurants": RestaurantDataService.to_dict_list(restaurants),
             }
 
             return summary
@@ -102,9 +121,9 @@ class RestaurantDataService:
 
             # Enrich with distance calculations and additional data
             enriched_restaurants = []
-            for restaurant in restaurants:
-                restaurant_data = restaurant.to_dict()
-
+            for restaurant, restaurant_data in zip(
+                restaurants, RestaurantDataService.to_dict_list(restaurants)
+            ):
                 # Calculate approximate distance using Haversine formula
                 distance = RestaurantDataService._calculate_distance(
                     latitude, longitude, restaurant.latitude, restaurant.longitude
@@ -205,11 +224,7 @@ class RestaurantDataService:
             restaurants = RestaurantRepository.search_by_name(search_term)
 
             # Enrich search results
-            enriched_results = []
-            for restaurant in restaurants:
-                restaurant_data = restaurant.to_dict()
-                # Add search relevance or other computed fields if needed
-                enriched_results.append(restaurant_data)
+            enriched_results = RestaurantDataService.to_dict_list(restaurants)
 
             return {
                 "restaurants": enriched_results,
@@ -274,10 +289,9 @@ class RestaurantDataService:
                 if hasattr(restaurant, "foods") and restaurant.foods:
                     from app.modules.food.service import FoodService
 
-                    foods = [
-                        FoodService.to_dict_with_main_image(food)
-                        for food in restaurant.foods
-                    ]
+                    foods = FoodService.to_dict_list_with_main_image(
+                        restaurant.foods
+                    )
 
                 context["related_data"] = {
                     "categories": categories,
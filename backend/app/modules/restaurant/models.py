@@ -54,28 +54,24 @@ class Restaurant(db.Model):
         kwargs.pop("updated_at", None)
         super(Restaurant, self).__init__(**kwargs)
 
-    def to_dict(self):
-        """Simple serialization of restaurant model"""
-        # Get categories from many-to-many relationship
-        categories_data = []
-        try:
-            # Query categories directly using the association table
-            from app.modules.category.models import restaurant_categories, Category
+    def to_dict(self, categories=None):
+        """Simple serialization of restaurant model
 
-            category_ids = db.session.execute(
-                db.select(restaurant_categories.c.category_id).where(
-                    restaurant_categories.c.restaurant_id == self.id
-                )
-            ).fetchall()
+        Args:
+            categories: Serialized categories of this restaurant, when loaded for
+                a whole list (RestaurantDataService.to_dict_list); looked up here
+                otherwise
+        """
+        if categories is None:
+            try:
+                from app.modules.restaurant.repository import RestaurantRepository
 
-            if category_ids:
-                categories = Category.query.filter(
-                    Category.id.in_([cat_id[0] for cat_id in category_ids])
-                ).all()
-                categories_data = [cat.to_dict() for cat in categories]
-        except Exception:
-            # If there's any error, just return empty categories
-            categories_data = []
+                categories = RestaurantRepository.get_categories_by_restaurant_ids(
+                    [self.id]
+                )[self.id]
+            except Exception:
+                # If there's any error, just return empty categories
+                categories = []
 
         return {
             "id": self.id,
@@ -88,7 +84,7 @@ class Restaurant(db.Model):
             "longitude": self.longitude,
             "rating_average": self.rating_average,
             "is_active": self.is_active,
-            "categories": categories_data,
+            "categories": categories,
             "created_at": (
                 self.created_at.isoformat() + "Z" if self.created_at else None
             ),
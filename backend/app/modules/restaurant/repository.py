@@ -145,6 +145,42 @@ class RestaurantRepository:
             )
             raise e
 
+    @staticmethod
+    def get_categories_by_restaurant_ids(restaurant_ids):
+        """
+        Get the serialized categories of many restaurants with one query on
+        restaurant_categories; the categories come from the in-process cache
+
+        Args:
+            restaurant_ids: Restaurant IDs
+
+        Returns:
+            dict: restaurant_id -> list of Category.to_dict(), in category ID order
+        """
+        from app.modules.category.models import restaurant_categories
+        from app.modules.category.repository import CategoryRepository
+
+        categories = {restaurant_id: [] for restaurant_id in restaurant_ids}
+        if not categories:
+            return categories
+
+        rows = db.session.execute(
+            db.select(
+                restaurant_categories.c.restaurant_id,
+                restaurant_categories.c.category_id,
+            )
+            .where(restaurant_categories.c.restaurant_id.in_(list(categories)))
+            .order_by(restaurant_categories.c.category_id)
+        ).fetchall()
+
+        cached = CategoryRepository.get_cached_by_ids(
+            {category_id for _, category_id in rows}
+        )
+        for restaurant_id, category_id in rows:
+            if category_id in cached:
+                categories[restaurant_id].append(cached[category_id])
+        return categories
+
     @staticmethod
     def get_active():
         """Get all active restaurants"""
@@ -5,6 +5,8 @@ This handles data aggregation and business logic related to user data presentati
 
 from app.modules.user.models import User
 from app.modules.user.repository import UserRepository
+from app.modules.food.repository import FoodRepository
+from app.modules.restaurant.data_service import RestaurantDataService
 from app.utils import get_logger
 logger = get_logger(__name__)
 from typing import Dict, Any, List, Optional
@@ -29,6 +31,35 @@ class UserDataService:
         user_data = user.to_dict()
 
         try:
+            # Images of every reviewed and rated food in one query
+            FoodRepository.preload_images(
+                [review.food for review in user.reviews]
+                + [rating.food for rating in user.food_ratings]
+            )
+
+            # Every restaurant shown in the profile, serialized once with the
+            # categories of all of them loaded in one query
+            profile_restaurants = {
+                restaurant.id: restaurant
+                for restaurant in (
+                    [review.food.restaurant for review in user.reviews if review.food]
+                    + [getattr(review, "restaurant", None) for review in user.reviews]
+                    + [
+                        rating.food.restaurant
+                        for rating in user.food_ratings
+                        if rating.food
+                    ]
+                    + [rating.restaurant for rating in user.restaurant_ratings]
+                )
+                if restaurant
+            }
+            restaurant_dicts = {
+                restaurant["id"]: restaurant
+                for restaurant in RestaurantDataService.to_dict_list(
+                    profile_restaurants.values()
+                )
+            }
+
             # Safely get and process reviews with detailed information
             reviews = []
             if hasattr(user, "reviews") and user.reviews:
@@ -42,11 +73,15 @@ class UserDataService:
                             hasattr(review.food, "restaurant")
                             and review.food.restaurant
                         ):
-                            food_data["restaurant"] = review.food.restaurant.to_dict()
+                            food_data["restaurant"] = dict(
+                                restaurant_dicts[review.food.restaurant.id]
+                            )
                         review_dict["food"] = food_data
                     # Add restaurant details if available (for direct restaurant reviews)
                     if hasattr(review, "restaurant") and review.restaurant:
-                        review_dict["restaurant"] = review.restaurant.to_dict()
+                        review_dict["restaurant"] = dict(
+                            restaurant_dicts[review.restaurant.id]
+                        )
                     reviews.append(review_dict)
 
                 # Sort reviews by created_at (most recent first)
@@ -69,7 +104,9 @@ class UserDataService:
                             hasattr(rating.food, "restaurant")
                             and rating.food.restaurant
                         ):
-                            food_data["restaurant"] = rating.food.restaurant.to_dict()
+                            food_data["restaurant"] = dict(
+                                restaurant_dicts[rating.food.restaurant.id]
+                            )
                         rating_dict["food"] = food_data
                     food_ratings.append(rating_dict)
 
@@ -78,7 +115,9 @@ class UserDataService:
                     rating_dict = rating.to_dict()
                     # Add restaurant details
                     if hasattr(rating, "restaurant") and rating.restaurant:
-                        rating_dict["restaurant"] = rating.restaurant.to_dict()
+                        rating_dict["restaurant"] = dict(
+                            restaurant_dicts[rating.restaurant.id]
+                        )
                     restaurant_ratings.append(rating_dict)
 
             # Combine all ratings and sort (keep detailed information)
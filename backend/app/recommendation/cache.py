@@ -0,0 +1,140 @@
+"""
+Recommendation Result Cache Module
+Bounded LRU cache with TTL for per-user recommendation results
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from app.utils.logger import get_logger
+from .config import RecommendationConfig
+
+logger = get_logger(__name__)
+
+
+class RecommendationCache:
+    """
+    LRU/TTL cache of recommendation results keyed by (user_id, ...) tuples
+    """
+
+    def __init__(self, max_size: int = None, ttl: float = None):
+        """
+        Initialize result cache
+
+        Args:
+            max_size: Maximum number of cached results (default from config)
+            ttl: Time to live of a cached result in seconds (default from config)
+        """
+        self.max_size = max_size or RecommendationConfig.RESULT_CACHE_MAX_SIZE
+        self.ttl = ttl or RecommendationConfig.RESULT_CACHE_TTL
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._user_keys = {}  # user_id -> set of keys, for per-user eviction
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        """
+        Get a cached result
+
+        Args:
+            key: Cache key; the first element must be the user ID
+
+        Returns:
+            Optional[Any]: Cached value, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(value)
+
+    def set(self, key: Tuple[Hashable, ...], value: Any) -> None:
+        """
+        Store a result, evicting the least recently used entries when full
+
+        Args:
+            key: Cache key; the first element must be the user ID
+            value: Result list to cache
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.time() + self.ttl, list(value))
+            self._user_keys.setdefault(key[0], set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: str) -> int:
+        """
+        Drop every cached result of a user
+
+        Args:
+            user_id: User whose results should be evicted
+
+        Returns:
+            int: Number of evicted entries
+        """
+        with self._lock:
+            keys = self._user_keys.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += len(keys)
+
+        if keys:
+            logger.info(f"Evicted {len(keys)} cached recommendation(s) for {user_id}")
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+    def _remove(self, key: Tuple[Hashable, ...]) -> None:
+        """Remove one entry (caller holds the lock)"""
+        self._entries.pop(key, None)
+        user_keys = self._user_keys.get(key[0])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._user_keys[key[0]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict[str, Any]: Size, limits and hit/miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups > 0 else 0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,105 @@
+"""
+Recommendation CLI Module
+`flask recommender ...` commands for training and precomputing outside the
+serving processes
+"""
+
+import time
+import click
+from flask.cli import AppGroup
+from app.utils.logger import get_logger
+from .config import RecommendationConfig
+
+logger = get_logger(__name__)
+
+recommender_cli = AppGroup("recommender", help="Recommendation model commands")
+
+
+@recommender_cli.command("train")
+@click.option(
+    "--loop",
+    is_flag=True,
+    help="Keep running and retrain every RecommendationConfig.TRAINING_INTERVAL",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Retrain even if the newest artifact is within the training interval",
+)
+def train_command(loop: bool, force: bool):
+    """Train the global SVD model and publish it as a new versioned artifact"""
+    from .recommender import Recommendations
+
+    RecommendationConfig.initialize()
+    recommender = Recommendations()
+
+    while True:
+        if not recommender.refresh_data():
+            logger.error("No ratings data available, global model not trained")
+        else:
+            # Start from the newest artifact so a fresh one is not retrained
+            recommender.load_latest_global_model()
+            if recommender.train_global_model(force=force):
+                click.echo(
+                    f"Global model ready: {recommender.global_model.artifact_file}"
+                )
+            else:
+                click.echo("Global model training failed", err=True)
+
+        if not loop:
+            break
+
+        force = False
+        time.sleep(RecommendationConfig.TRAINING_INTERVAL)
+
+
+@recommender_cli.command("precompute")
+@click.option(
+    "--workers",
+    type=int,
+    default=None,
+    help="Worker processes (default: RecommendationConfig.PRECOMPUTE_WORKERS or CPU count)",
+)
+@click.option(
+    "--top-n",
+    type=int,
+    default=None,
+    help="Recommendations stored per user (default: RecommendationConfig.PRECOMPUTE_TOP_N)",
+)
+@click.option(
+    "--active-days",
+    type=int,
+    default=None,
+    help="Only users with a rating in this many days (default: RecommendationConfig.PRECOMPUTE_ACTIVE_DAYS)",
+)
+def precompute_command(workers: int, top_n: int, active_days: int):
+    """Precompute recommendations of active users into user_recommendations"""
+    from flask import current_app
+    from .recommender import Recommendations
+    from .precompute import precompute_recommendations
+
+    RecommendationConfig.initialize()
+    recommender = Recommendations()
+
+    if not recommender.refresh_data():
+        click.echo("No ratings data available, nothing precomputed", err=True)
+        return
+
+    # Newest artifact first, training only if it is missing or stale
+    recommender.load_latest_global_model()
+    if not recommender.train_global_model():
+        logger.warning("No global model, precomputing from the fallback models")
+    recommender.refresh_cold_start_ranking(force=True)
+
+    summary = precompute_recommendations(
+        current_app._get_current_object(),
+        recommender,
+        top_n=top_n,
+        workers=workers,
+        active_days=active_days,
+    )
+    click.echo(
+        f"Precomputed {summary['rows_written']} recommendations for "
+        f"{summary['users_written']}/{summary['active_users']} active users "
+        f"in {summary['elapsed']}s (model {summary['model_version']})"
+    )
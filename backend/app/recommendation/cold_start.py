@@ -0,0 +1,207 @@
+"""
+Cold Start Ranking Module
+Precomputed popularity/quality ranking of foods, overall and per category, for
+users with too few ratings for collaborative filtering
+"""
+
+import heapq
+import time
+import numpy as np
+import pandas as pd
+from typing import List, Tuple, Dict, Iterable, Optional
+from app.utils.logger import get_logger
+from .config import RecommendationConfig
+from .ratings_store import RatingsStore
+
+logger = get_logger(__name__)
+
+
+class ColdStartRanking:
+    """
+    Read-only ranking of foods by Bayesian average rating, built once per
+    ratings snapshot; serving a user only walks the heads of a few lists
+    """
+
+    def __init__(self, top_k: int = None, prior_weight: float = None):
+        """
+        Initialize ranking
+
+        Args:
+            top_k: Number of foods kept per list (default from config)
+            prior_weight: Number of global-mean ratings every food starts with
+                (default from config)
+        """
+        self.top_k = top_k or RecommendationConfig.COLD_START_TOP_K
+        self.prior_weight = (
+            prior_weight
+            if prior_weight is not None
+            else RecommendationConfig.COLD_START_PRIOR_WEIGHT
+        )
+
+        self.food_ids = np.empty(0, dtype=object)
+        self.scores = np.empty(0, dtype=np.float32)  # Per food code
+        self.ranks = np.empty(0, dtype=np.int32)  # Position in the overall ranking
+
+        # Food codes sorted by rank: overall and per category ID
+        self.overall = np.empty(0, dtype=np.int32)
+        self.by_category = {}
+
+        self.built_at = 0.0
+        self.source_version = None  # Snapshot version the ranking was built from
+
+    @property
+    def is_built(self) -> bool:
+        return self.built_at > 0
+
+    def build(
+        self,
+        ratings_store: RatingsStore,
+        food_categories: pd.DataFrame,
+        source_version: Optional[int] = None,
+    ) -> bool:
+        """
+        Build the ranking from a ratings snapshot
+
+        Args:
+            ratings_store: Encoded ratings snapshot
+            food_categories: DataFrame with columns [food_id, category_id]
+            source_version: Version of the snapshot
+
+        Returns:
+            bool: True if the ranking was built
+        """
+        try:
+            if len(ratings_store) == 0:
+                logger.warning("Empty ratings data, cold start ranking not built")
+                return False
+
+            n_items = len(ratings_store.item_encoder)
+            counts = np.bincount(ratings_store.item_codes, minlength=n_items)
+            sums = np.bincount(
+                ratings_store.item_codes,
+                weights=ratings_store.ratings.astype(np.float64),
+                minlength=n_items,
+            )
+            global_mean = sums.sum() / counts.sum()
+
+            # Bayesian average: few ratings pull a food towards the global mean
+            scores = (self.prior_weight * global_mean + sums) / (
+                self.prior_weight + counts
+            )
+
+            # Best score first, more ratings first among equal scores
+            rated = np.flatnonzero(counts > 0)
+            order = rated[np.lexsort((-counts[rated], -scores[rated]))]
+            ranks = np.full(n_items, np.iinfo(np.int32).max, dtype=np.int32)
+            ranks[order] = np.arange(len(order), dtype=np.int32)
+
+            by_category = {}
+            if len(food_categories) > 0:
+                food_codes = ratings_store.item_encoder.encode(food_categories["food_id"])
+                known = food_codes >= 0
+                food_codes = food_codes[known]
+                category_ids = food_categories["category_id"].to_numpy()[known]
+
+                pairs = pd.DataFrame(
+                    {
+                        "category_id": category_ids,
+                        "food_code": food_codes,
+                        "rank": ranks[food_codes],
+                    }
+                )
+                pairs = pairs[counts[pairs["food_code"]] > 0].drop_duplicates(
+                    ["category_id", "food_code"]
+                )
+                for category_id, group in pairs.sort_values("rank").groupby(
+                    "category_id", sort=False
+                ):
+                    by_category[category_id] = group["food_code"].to_numpy(
+                        dtype=np.int32
+                    )[: self.top_k]
+
+            self.food_ids = ratings_store.item_encoder.ids
+            self.scores = scores.astype(np.float32)
+            self.ranks = ranks
+            self.overall = order[: self.top_k].astype(np.int32)
+            self.by_category = by_category
+            self.built_at = time.time()
+            self.source_version = source_version
+
+            logger.info(
+                f"Cold start ranking built: {len(order)} foods, "
+                f"{len(by_category)} categories"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error building cold start ranking: {e}")
+            return False
+
+    def recommend(
+        self,
+        top_n: int = 10,
+        category_ids: Iterable[str] = (),
+        exclude_foods: Iterable[str] = (),
+    ) -> List[Tuple[str, float]]:
+        """
+        Get the best foods of the user's favorite categories, topped up with the
+        best foods overall
+
+        Args:
+            top_n: Number of foods to return
+            category_ids: Favorite category IDs of the user
+            exclude_foods: Food IDs to exclude (typically already rated)
+
+        Returns:
+            List[Tuple[str, float]]: (food_id, bayesian_average) in rank order
+        """
+        if not self.is_built:
+            return []
+
+        exclude_foods = set(exclude_foods)
+        favorites = [
+            self.by_category[category_id]
+            for category_id in dict.fromkeys(category_ids)
+            if category_id in self.by_category
+        ]
+
+        # Lists are sorted by overall rank, so a k-way merge keeps that order
+        ranks = self.ranks
+        favorite_codes = heapq.merge(
+            *[iter(codes) for codes in favorites], key=ranks.__getitem__
+        )
+
+        recommendations = []
+        seen = set()
+        for codes in (favorite_codes, iter(self.overall)):
+            for code in codes:
+                if code in seen:
+                    continue
+                seen.add(code)
+                food_id = self.food_ids[code]
+                if food_id in exclude_foods:
+                    continue
+                recommendations.append((food_id, float(self.scores[code])))
+                if len(recommendations) >= top_n:
+                    return recommendations
+
+        return recommendations
+
+    def get_info(self) -> Dict[str, any]:
+        """
+        Get information about the ranking
+
+        Returns:
+            Dict[str, any]: Ranking information
+        """
+        if not self.is_built:
+            return {"built": False}
+
+        return {
+            "built": True,
+            "n_ranked": len(self.overall),
+            "n_categories": len(self.by_category),
+            "built_at": self.built_at,
+            "age": time.time() - self.built_at,
+            "source_version": self.source_version,
+        }
@@ -18,6 +18,20 @@ class RecommendationConfig:
     # Training interval (24 hours in seconds)
     TRAINING_INTERVAL = 24 * 60 * 60
 
+    # Versioned global model artifacts: svd_model_<trained_at ms>.pkl, with the
+    # current one named in LATEST_MODEL_FILE
+    LATEST_MODEL_FILE = os.path.join(MODEL_PATH, "latest_model.txt")
+    MODEL_KEEP_VERSIONS = 3
+
+    # Background training: "worker" (default) only hot-swaps artifacts written
+    # by `flask recommender train --loop`, which runs as the single trainer
+    # next to any number of serving processes; "thread" trains inside the
+    # serving process and is only safe with one of them (each one writes and
+    # prunes the same artifact directory); "off" trains inside the request that
+    # finds the model missing or stale
+    TRAINING_MODE = os.getenv("RECOMMENDER_TRAINING_MODE", "worker")
+    SCHEDULER_POLL_INTERVAL = 60  # seconds between data refreshes/artifact checks
+
     # PERBAIKAN: Hapus DEFAULT_ALPHA duplikat, gunakan ini saja
     DEFAULT_FOOD_RESTAURANT_ALPHA = 0.7  # Weight for food rating vs restaurant rating
     # score = (alpha * food_rating) + ((1 - alpha) * restaurant_rating)
@@ -36,9 +50,79 @@ class RecommendationConfig:
     SVD_N_EPOCHS = 20
     SVD_RANDOM_STATE = 42
 
+    # Global model engine: "svd" (TruncatedSVD on the mean-centered matrix) or
+    # "mf" (biased matrix factorization fitted on observed ratings only)
+    MODEL_ENGINE = os.getenv("RECOMMENDER_MODEL_ENGINE", "svd")
+
+    # Biased MF parameters (ALS epochs capped by SVD_N_EPOCHS, factors by
+    # SVD_N_FACTORS)
+    MF_ALGORITHM = "als"  # "als" or "sgd"
+    MF_REGULARIZATION = 0.1  # ALS: scaled by ratings per user/item (ALS-WR)
+    MF_VALIDATION_FRACTION = 0.05  # held-out ratings for early stopping
+    MF_EARLY_STOPPING_PATIENCE = 3  # epochs without improvement before stopping
+    # SGD converges far slower per epoch than ALS, so it gets its own schedule
+    MF_LEARNING_RATE = 0.05  # SGD only
+    MF_SGD_REGULARIZATION = 0.02
+    # Ratings per vectorized SGD step; updates to one user/item within a step
+    # add up, so large steps diverge on small or dense datasets
+    MF_SGD_BATCH_SIZE = 256
+    MF_SGD_N_EPOCHS = 100
+    MF_SGD_MIN_EPOCHS = 5  # epochs trained before early stopping may trigger
+    MF_SGD_EARLY_STOPPING_PATIENCE = 5
+    MF_EARLY_STOPPING_TOLERANCE = 1e-4  # minimum validation RMSE improvement
+
+    # Approximate item retrieval for large catalogs: IVF over the item factors,
+    # with the candidates re-ranked exactly
+    ANN_MIN_ITEMS = 5000  # smaller catalogs score every food
+    ANN_N_LISTS = None  # coarse clusters (default: sqrt(n_items))
+    ANN_N_PROBE = 32  # clusters searched per request: higher = better recall, slower
+    ANN_MIN_CANDIDATES = 200  # candidates re-ranked per request (plus excluded foods)
+    ANN_KMEANS_ITERATIONS = 10
+
+    # Neighbor index: number of precomputed similar users kept per user
+    NEIGHBOR_INDEX_TOP_K = 50
+
+    # Item-item neighbor table ("similar foods"), rebuilt in the background when
+    # the data changed and the table is older than the refresh interval
+    ITEM_NEIGHBORS_TOP_K = 20
+    ITEM_NEIGHBORS_MIN_COMMON_USERS = 2
+    ITEM_NEIGHBORS_REFRESH_INTERVAL = 3600  # seconds
+
+    # Cold start: users with fewer ratings than the local data processor's
+    # min_user_ratings get the precomputed popularity/quality ranking
+    COLD_START_TOP_K = 200  # foods kept overall and per category
+    COLD_START_PRIOR_WEIGHT = 5  # global-mean ratings added to every food's average
+    COLD_START_REFRESH_INTERVAL = 600  # seconds
+
+    # Ratings snapshot freshness: incremental refresh of changed ratings and a
+    # periodic full reload that also reconciles deleted ratings
+    DELTA_REFRESH_INTERVAL = 30  # seconds
+    RECONCILE_INTERVAL = 3600  # seconds
+    DELTA_MAX_NEIGHBOR_UPDATES = 100  # above this, rebuild neighbor index instead
+
+    # Per-user recommendation result cache
+    RESULT_CACHE_MAX_SIZE = 10000
+    RESULT_CACHE_TTL = 10 * 60  # seconds
+
+    # Batch recommendations: users scored per matrix block, users per API call
+    BATCH_BLOCK_SIZE = 256
+    MAX_BATCH_USERS = 5000
+
+    # Nightly precompute (`flask recommender precompute`) into user_recommendations;
+    # /recommendation reads a user's rows first and computes online on a miss
+    PRECOMPUTE_TOP_N = MAX_RECOMMENDATIONS  # stored per user, so any limit can hit
+    PRECOMPUTE_ACTIVE_DAYS = 90  # users with a rating written in this window
+    PRECOMPUTE_CHUNK_SIZE = 1000  # users per worker task and per write transaction
+    PRECOMPUTE_WORKERS = None  # worker processes (default: CPU count)
+    PRECOMPUTE_MAX_AGE = 36 * 60 * 60  # seconds before stored rows count as stale
+
     # Recommendation threshold
     MIN_RATING_THRESHOLD = 3.0  # Minimum predicted rating threshold
 
+    # Offline evaluation: rank cutoff and minimum held-out rating of a relevant food
+    EVALUATION_K = 10
+    EVALUATION_RELEVANCE_THRESHOLD = 4.0
+
     # Create model directory if it doesn't exist
 
     @staticmethod
@@ -0,0 +1,497 @@
+"""
+Global SVD Model Module
+Trains one SVD model on the full rating matrix, persists it to disk and serves
+requests by folding the user's rating vector onto the stored item factors
+"""
+
+import os
+import pickle
+import time
+import numpy as np
+import pandas as pd
+from typing import List, Tuple, Dict, Optional, Union
+from app.utils.logger import get_logger
+from .config import RecommendationConfig
+from .item_index import ItemFactorIndex
+from .local_model import LocalSVDModel
+from .mf_model import BiasedMFModel
+from .ratings_store import RatingMatrix, as_rating_matrix
+
+logger = get_logger(__name__)
+
+
+MODEL_ENGINES = {
+    LocalSVDModel.engine: LocalSVDModel,
+    BiasedMFModel.engine: BiasedMFModel,
+}
+
+
+class GlobalSVDModel:
+    """
+    Global SVD model artifact served by fold-in instead of per-request fitting
+    """
+
+    def __init__(
+        self, n_components: int = None, random_state: int = None, engine: str = None
+    ):
+        """
+        Initialize global model
+
+        Args:
+            n_components: Number of latent factors (default from config)
+            random_state: Random state for reproducibility (default from config)
+            engine: Model engine, a key of MODEL_ENGINES (default from config)
+        """
+        self.n_components = n_components
+        self.random_state = random_state
+        self.engine = engine or RecommendationConfig.MODEL_ENGINE
+        self.model = None
+        self.food_mapping = {}
+        self.reverse_food_mapping = {}
+        self.trained_at = 0.0
+        self.artifact_file = None  # Artifact the model was saved to or loaded from
+        self.item_index = None  # ANN index over item factors (large catalogs only)
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.model is not None and self.model.is_fitted
+
+    def needs_training(self) -> bool:
+        """
+        Check whether the model is missing or older than the training interval
+
+        Returns:
+            bool: True if the model should be (re)trained
+        """
+        if not self.is_fitted:
+            return True
+        return (time.time() - self.trained_at) >= RecommendationConfig.TRAINING_INTERVAL
+
+    def train(self, ratings: Union[pd.DataFrame, RatingMatrix]) -> bool:
+        """
+        Train the SVD model on the full (filtered) ratings data
+
+        Args:
+            ratings: DataFrame with columns [user_id, food_id, rating] or a
+                RatingMatrix
+
+        Returns:
+            bool: True if training successful
+        """
+        try:
+            if len(ratings) == 0:
+                logger.error("Empty ratings data provided for global SVD training")
+                return False
+
+            model_class = MODEL_ENGINES.get(self.engine)
+            if model_class is None:
+                logger.error(f"Unknown recommendation model engine: {self.engine}")
+                return False
+
+            pivot_matrix = as_rating_matrix(ratings)
+
+            model = model_class(
+                n_components=self.n_components, random_state=self.random_state
+            )
+            if not model.fit(pivot_matrix):
+                logger.error(f"Global {self.engine.upper()} training failed")
+                return False
+
+            # Only item-side state is needed for fold-in; drop the dense copies
+            model.rating_matrix = None
+            model.user_factors = None
+
+            self.model = model
+            # The artifact decides the engine, whatever this process is set to
+            self.engine = model.engine
+            self.food_mapping = {
+                food_id: idx for idx, food_id in enumerate(pivot_matrix.columns)
+            }
+            self.reverse_food_mapping = {
+                idx: food_id for food_id, idx in self.food_mapping.items()
+            }
+            self.trained_at = time.time()
+            self._build_item_index()
+
+            logger.info(
+                f"Global {self.engine.upper()} model trained: {pivot_matrix.shape[0]} users x "
+                f"{pivot_matrix.shape[1]} foods"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error training global SVD model: {e}")
+            return False
+
+    def _build_item_index(self) -> None:
+        """Build the item index when the catalog is large enough to need one"""
+        self.item_index = None
+        if len(self.food_mapping) < RecommendationConfig.ANN_MIN_ITEMS:
+            return
+
+        item_index = ItemFactorIndex(random_state=self.random_state)
+        if item_index.build(self.model.item_scoring_vectors()):
+            self.item_index = item_index
+
+    @staticmethod
+    def versioned_model_file(trained_at: float) -> str:
+        """
+        Get the artifact path of a model version
+
+        Args:
+            trained_at: Training timestamp of the model
+
+        Returns:
+            str: Path under RecommendationConfig.MODEL_PATH
+        """
+        return os.path.join(
+            RecommendationConfig.MODEL_PATH, f"svd_model_{int(trained_at * 1000)}.pkl"
+        )
+
+    @staticmethod
+    def latest_model_file() -> Optional[str]:
+        """
+        Get the path of the newest model artifact
+
+        Returns:
+            Optional[str]: Artifact named by LATEST_MODEL_FILE, or None if there
+                is none yet
+        """
+        try:
+            with open(RecommendationConfig.LATEST_MODEL_FILE) as f:
+                file_name = f.read().strip()
+            model_file = os.path.join(RecommendationConfig.MODEL_PATH, file_name)
+            if file_name and os.path.exists(model_file):
+                return model_file
+        except OSError:
+            pass
+        return None
+
+    def save(self, model_file: Optional[str] = None) -> bool:
+        """
+        Persist the model artifact and the training timestamp
+
+        Without model_file the artifact is written as a new version, published
+        through LATEST_MODEL_FILE and older versions beyond
+        MODEL_KEEP_VERSIONS are removed.
+
+        Args:
+            model_file: Target path (default: a new versioned artifact)
+
+        Returns:
+            bool: True if saved successfully
+        """
+        publish = model_file is None
+        model_file = model_file or self.versioned_model_file(self.trained_at)
+        try:
+            if not self.is_fitted:
+                logger.error("Cannot save unfitted global SVD model")
+                return False
+
+            os.makedirs(os.path.dirname(model_file), exist_ok=True)
+
+            artifact = {
+                "model": self.model,
+                "food_ids": [
+                    self.reverse_food_mapping[idx]
+                    for idx in range(len(self.reverse_food_mapping))
+                ],
+                "trained_at": self.trained_at,
+            }
+
+            # Write to a temporary file first so readers never see a partial pickle
+            tmp_file = f"{model_file}.tmp"
+            with open(tmp_file, "wb") as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, model_file)
+            self.artifact_file = model_file
+
+            if publish:
+                # Serving processes poll this pointer to hot-swap the new version
+                tmp_file = f"{RecommendationConfig.LATEST_MODEL_FILE}.tmp"
+                with open(tmp_file, "w") as f:
+                    f.write(os.path.basename(model_file))
+                os.replace(tmp_file, RecommendationConfig.LATEST_MODEL_FILE)
+                self._prune_versions(keep=model_file)
+
+            with open(RecommendationConfig.LAST_TRAINING_FILE, "w") as f:
+                f.write(str(self.trained_at))
+
+            logger.info(f"Global SVD model saved to {model_file}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error saving global SVD model: {e}")
+            return False
+
+    def _prune_versions(self, keep: str) -> None:
+        """
+        Remove versioned artifacts beyond the newest MODEL_KEEP_VERSIONS
+
+        Args:
+            keep: Artifact that is never removed
+        """
+        versions = []
+        for file_name in os.listdir(RecommendationConfig.MODEL_PATH):
+            stem, ext = os.path.splitext(file_name)
+            if ext == ".pkl" and stem.startswith("svd_model_"):
+                version = stem[len("svd_model_") :]
+                if version.isdigit():
+                    versions.append((int(version), file_name))
+
+        versions.sort(reverse=True)
+        for _, file_name in versions[RecommendationConfig.MODEL_KEEP_VERSIONS :]:
+            model_file = os.path.join(RecommendationConfig.MODEL_PATH, file_name)
+            if model_file == keep:
+                continue
+            try:
+                os.remove(model_file)
+            except OSError as e:
+                logger.warning(f"Could not remove old model artifact {model_file}: {e}")
+
+    def load(self, model_file: Optional[str] = None) -> bool:
+        """
+        Load a previously saved model artifact
+
+        Args:
+            model_file: Source path (default: the newest artifact)
+
+        Returns:
+            bool: True if loaded successfully
+        """
+        model_file = model_file or self.latest_model_file()
+        try:
+            if model_file is None or not os.path.exists(model_file):
+                logger.info(f"No global SVD model found at {model_file}")
+                return False
+
+            with open(model_file, "rb") as f:
+                artifact = pickle.load(f)
+
+            model = artifact["model"]
+            if not isinstance(model, LocalSVDModel) or not model.is_fitted:
+                logger.warning(f"Invalid global SVD model artifact at {model_file}")
+                return False
+
+            self.model = model
+            # The artifact decides the engine, whatever this process is set to
+            self.engine = model.engine
+            self.food_mapping = {
+                food_id: idx for idx, food_id in enumerate(artifact["food_ids"])
+            }
+            self.reverse_food_mapping = dict(enumerate(artifact["food_ids"]))
+            self.trained_at = float(artifact["trained_at"])
+            self.artifact_file = model_file
+            self._build_item_index()
+
+            logger.info(
+                f"Global SVD model loaded from {model_file} "
+                f"({len(self.food_mapping)} foods)"
+            )
+            return True
+
+        except Exception as e:
+            logger.warning(f"Could not load global SVD model from {model_file}: {e}")
+            return False
+
+    def recommend(
+        self,
+        user_ratings: Dict[str, float],
+        top_n: int = 10,
+        exclude_foods: List[str] = None,
+        min_rating: float = 3.0,
+    ) -> List[Tuple[str, float]]:
+        """
+        Get top-N recommendations for a user by fold-in
+
+        Args:
+            user_ratings: Mapping of food_id -> rating for the user
+            top_n: Number of recommendations to return
+            exclude_foods: Food IDs to exclude (typically already rated)
+            min_rating: Minimum predicted rating threshold
+
+        Returns:
+            List[Tuple[str, float]]: (food_id, predicted_rating) sorted descending
+        """
+        try:
+            if not self.is_fitted:
+                logger.error("Global SVD model not fitted")
+                return []
+
+            n_items = len(self.food_mapping)
+            rating_vector = np.zeros(n_items, dtype=np.float32)
+            for food_id, rating in user_ratings.items():
+                item_idx = self.food_mapping.get(food_id)
+                if item_idx is not None:
+                    rating_vector[item_idx] = rating
+
+            if not rating_vector.any():
+                logger.info("User has no ratings on foods known to the global model")
+                return []
+
+            user_vector, user_mean = self.model.fold_in_user(rating_vector)
+
+            exclude_items = [
+                self.food_mapping[food_id]
+                for food_id in exclude_foods or []
+                if food_id in self.food_mapping
+            ]
+
+            recommendations = None
+            if self.item_index is not None:
+                recommendations = self._recommend_candidates(
+                    user_vector, user_mean, top_n, exclude_items, min_rating
+                )
+            if recommendations is None:
+                predictions = self.model.predict_from_factors(user_vector, user_mean)
+                recommendations = self.model.select_top_n(
+                    predictions,
+                    top_n=top_n,
+                    exclude_items=exclude_items,
+                    min_rating=min_rating,
+                )
+            if not recommendations:
+                logger.warning(f"No global predictions above min_rating={min_rating}")
+                return []
+
+            return [
+                (self.reverse_food_mapping[item_idx], predicted_rating)
+                for item_idx, predicted_rating in recommendations
+            ]
+
+        except Exception as e:
+            logger.error(f"Error generating global SVD recommendations: {e}")
+            return []
+
+    def _recommend_candidates(
+        self,
+        user_vector: np.ndarray,
+        user_mean: float,
+        top_n: int,
+        exclude_items: List[int],
+        min_rating: float,
+    ) -> Optional[List[Tuple[int, float]]]:
+        """
+        Score only the item index's candidates for a folded-in user
+
+        Args:
+            user_vector: Folded-in user factor vector
+            user_mean: User mean from fold-in
+            top_n: Number of recommendations to return
+            exclude_items: Item indices to exclude
+            min_rating: Minimum predicted rating threshold
+
+        Returns:
+            Optional[List[Tuple[int, float]]]: (item_idx, predicted_rating) sorted
+                descending, or None if the candidates cannot fill top_n and
+                every item has to be scored
+        """
+        n_candidates = (
+            max(RecommendationConfig.ANN_MIN_CANDIDATES, top_n) + len(exclude_items)
+        )
+        candidates = self.item_index.search(np.append(user_vector, 1.0), n_candidates)
+
+        predictions = self.model.predict_from_factors(
+            user_vector, user_mean, item_indices=candidates
+        )
+        recommendations = self.model.select_top_n(
+            predictions,
+            top_n=top_n,
+            exclude_items=np.flatnonzero(np.isin(candidates, exclude_items)),
+            min_rating=min_rating,
+        )
+
+        if len(recommendations) < top_n and len(candidates) < self.item_index.n_items:
+            return None
+
+        return [
+            (int(candidates[position]), predicted_rating)
+            for position, predicted_rating in recommendations
+        ]
+
+    def recommend_many(
+        self,
+        users_ratings: Dict[str, Dict[str, float]],
+        top_n: int = 10,
+        min_rating: float = 3.0,
+        block_size: int = None,
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Get top-N recommendations for many users, folding them in per matrix block
+
+        Foods already rated by a user are excluded from their recommendations.
+
+        Args:
+            users_ratings: Mapping of user_id -> {food_id: rating}
+            top_n: Number of recommendations per user
+            min_rating: Minimum predicted rating threshold
+            block_size: Users scored per block (default from config)
+
+        Returns:
+            Dict[str, List[Tuple[str, float]]]: user_id -> (food_id, predicted_rating)
+                sorted descending; empty list for users without known ratings
+        """
+        try:
+            if not self.is_fitted:
+                logger.error("Global SVD model not fitted")
+                return {}
+
+            block_size = block_size or RecommendationConfig.BATCH_BLOCK_SIZE
+            user_ids = list(users_ratings)
+            n_items = len(self.food_mapping)
+            results = {}
+
+            for block_start in range(0, len(user_ids), block_size):
+                block_user_ids = user_ids[block_start : block_start + block_size]
+
+                rating_block = np.zeros((len(block_user_ids), n_items), dtype=np.float32)
+                for row, user_id in enumerate(block_user_ids):
+                    for food_id, rating in users_ratings[user_id].items():
+                        item_idx = self.food_mapping.get(food_id)
+                        if item_idx is not None:
+                            rating_block[row, item_idx] = rating
+
+                user_vectors, user_means = self.model.fold_in_users(rating_block)
+                predictions = self.model.predict_from_factors(user_vectors, user_means)
+
+                for row, user_id in enumerate(block_user_ids):
+                    rated_items = np.flatnonzero(rating_block[row])
+                    if len(rated_items) == 0:
+                        results[user_id] = []
+                        continue
+
+                    recommendations = self.model.select_top_n(
+                        predictions[row],
+                        top_n=top_n,
+                        exclude_items=rated_items,
+                        min_rating=min_rating,
+                    )
+                    results[user_id] = [
+                        (self.reverse_food_mapping[item_idx], predicted_rating)
+                        for item_idx, predicted_rating in recommendations
+                    ]
+
+            logger.info(f"Global SVD batch recommendations for {len(user_ids)} users")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error generating global SVD batch recommendations: {e}")
+            return {}
+
+    def get_model_info(self) -> Dict[str, any]:
+        """
+        Get information about the global model
+
+        Returns:
+            Dict[str, any]: Model information
+        """
+        if not self.is_fitted:
+            return {"fitted": False}
+
+        info = self.model.get_model_info()
+        info["n_foods"] = len(self.food_mapping)
+        info["trained_at"] = self.trained_at
+        info["model_age"] = time.time() - self.trained_at
+        if self.item_index is not None:
+            info["item_index"] = self.item_index.get_info()
+        return info
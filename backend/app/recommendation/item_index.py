@@ -0,0 +1,202 @@
+"""
+Item Factor Index Module
+Approximate maximum inner product search over item factor vectors (IVF: a
+k-means coarse quantizer with inverted lists) for large food catalogs
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from typing import Dict, Optional
+from app.utils.logger import get_logger
+from .config import RecommendationConfig
+
+logger = get_logger(__name__)
+
+
+class ItemFactorIndex:
+    """
+    IVF index returning candidate items for a user vector without scoring the
+    whole catalog; candidates are re-ranked exactly by the caller
+    """
+
+    # Upper bound on item x centroid distances held per assignment block
+    ASSIGN_BLOCK_ENTRIES = 4_000_000
+
+    def __init__(
+        self, n_lists: int = None, n_probe: int = None, random_state: int = None
+    ):
+        """
+        Initialize item index
+
+        Args:
+            n_lists: Number of coarse clusters (default: sqrt(n_items))
+            n_probe: Clusters searched per query, the recall/latency knob
+                (default from config)
+            random_state: Random state for k-means (default from config)
+        """
+        self.n_lists = n_lists or RecommendationConfig.ANN_N_LISTS
+        self.n_probe = n_probe or RecommendationConfig.ANN_N_PROBE
+        self.random_state = random_state or RecommendationConfig.SVD_RANDOM_STATE
+
+        self.n_items = 0
+        self.centroids = None
+        self._centroid_norms = None
+
+        # Items of list c are _list_items[_list_offsets[c]:_list_offsets[c + 1]]
+        self._list_items = None
+        self._list_offsets = None
+
+    @property
+    def is_built(self) -> bool:
+        return self.centroids is not None
+
+    @staticmethod
+    def _to_euclidean(item_vectors: np.ndarray) -> np.ndarray:
+        """
+        Append sqrt(M^2 - |x|^2) to every item vector, so the largest inner
+        product with [query, 0] is the nearest neighbor in L2
+
+        Args:
+            item_vectors: Item vectors with shape (n_items, dim)
+
+        Returns:
+            np.ndarray: Vectors with shape (n_items, dim + 1)
+        """
+        norms = np.einsum("ij,ij->i", item_vectors, item_vectors)
+        extra = np.sqrt(np.maximum(norms.max(initial=0.0) - norms, 0.0))
+        return np.hstack([item_vectors, extra[:, None]]).astype(np.float32)
+
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """
+        Get the nearest centroid of every vector, in blocks
+
+        Args:
+            vectors: Vectors to assign
+            centroids: Cluster centroids
+
+        Returns:
+            np.ndarray: Centroid index per vector
+        """
+        centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+        block_size = max(1, self.ASSIGN_BLOCK_ENTRIES // max(len(centroids), 1))
+
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), block_size):
+            block = vectors[start : start + block_size]
+            # |x - c|^2 without the |x|^2 term, which does not change the argmin
+            distances = centroid_norms[None, :] - 2.0 * (block @ centroids.T)
+            assignment[start : start + block_size] = np.argmin(distances, axis=1)
+        return assignment
+
+    def build(self, item_vectors: np.ndarray) -> bool:
+        """
+        Cluster the item vectors and build the inverted lists
+
+        Args:
+            item_vectors: Item vectors with shape (n_items, dim); the score of
+                an item for a query is their inner product
+
+        Returns:
+            bool: True if the index was built
+        """
+        try:
+            item_vectors = np.asarray(item_vectors, dtype=np.float32)
+            n_items = len(item_vectors)
+            if n_items == 0:
+                logger.warning("No item vectors, item index not built")
+                return False
+
+            vectors = self._to_euclidean(item_vectors)
+            n_lists = min(self.n_lists or max(int(np.sqrt(n_items)), 1), n_items)
+
+            # k-means on a sample of the items
+            rng = np.random.default_rng(self.random_state)
+            sample_size = min(n_items, n_lists * 32)
+            sample = vectors[rng.choice(n_items, sample_size, replace=False)]
+            centroids = sample[rng.choice(sample_size, n_lists, replace=False)]
+
+            for _ in range(RecommendationConfig.ANN_KMEANS_ITERATIONS):
+                assignment = self._assign(sample, centroids)
+                members = csr_matrix(
+                    (
+                        np.ones(sample_size, dtype=np.float32),
+                        (assignment, np.arange(sample_size)),
+                    ),
+                    shape=(n_lists, sample_size),
+                )
+                counts = np.diff(members.indptr)
+                sums = members @ sample
+                # Empty clusters keep their previous centroid
+                filled = counts > 0
+                centroids[filled] = (sums[filled] / counts[filled, None]).astype(
+                    np.float32
+                )
+
+            assignment = self._assign(vectors, centroids)
+
+            self.n_items = n_items
+            self.centroids = centroids
+            self._centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+            self._list_items = np.argsort(assignment, kind="stable").astype(np.int32)
+            self._list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+            np.cumsum(
+                np.bincount(assignment, minlength=n_lists),
+                out=self._list_offsets[1:],
+            )
+
+            logger.info(f"Item index built: {n_items} items in {n_lists} lists")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error building item index: {e}")
+            return False
+
+    def search(
+        self, query: np.ndarray, n_candidates: int, n_probe: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Get candidate items for a query vector from the nearest lists
+
+        More lists than n_probe are searched when they hold fewer than
+        n_candidates items.
+
+        Args:
+            query: Query vector with the dimension of the item vectors
+            n_candidates: Minimum number of candidates to return
+            n_probe: Lists to search (default: the index's n_probe)
+
+        Returns:
+            np.ndarray: Candidate item indices in ascending order
+        """
+        query = np.append(np.asarray(query, dtype=np.float32), 0.0)
+        distances = self._centroid_norms - 2.0 * (self.centroids @ query)
+        order = np.argsort(distances)
+
+        list_sizes = np.diff(self._list_offsets)[order]
+        enough = int(np.searchsorted(np.cumsum(list_sizes), n_candidates)) + 1
+        n_lists = min(max(n_probe or self.n_probe, enough), len(order))
+
+        candidates = np.concatenate(
+            [
+                self._list_items[self._list_offsets[c] : self._list_offsets[c + 1]]
+                for c in order[:n_lists]
+            ]
+        )
+        return np.sort(candidates)
+
+    def get_info(self) -> Dict[str, int]:
+        """
+        Get information about the index
+
+        Returns:
+            Dict[str, int]: Index information
+        """
+        if not self.is_built:
+            return {"built": False}
+
+        return {
+            "built": True,
+            "n_items": self.n_items,
+            "n_lists": len(self.centroids),
+            "n_probe": self.n_probe,
+        }
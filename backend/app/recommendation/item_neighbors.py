@@ -0,0 +1,180 @@
+"""
+Item Neighbor Table Module
+Precomputed top-K co-rating cosine neighbors for every food of a ratings
+snapshot ("you may also like" lists)
+"""
+
+import time
+import numpy as np
+from scipy.sparse import diags
+from typing import List, Tuple, Dict, Optional
+from app.utils.logger import get_logger
+from .config import RecommendationConfig
+from .ratings_store import IdEncoder, RatingMatrix
+
+logger = get_logger(__name__)
+
+
+class ItemNeighborTable:
+    """
+    Read-only top-K item-item neighbor table, built once per ratings snapshot
+    """
+
+    # Upper bound on dense scores (foods x foods) held per block while building
+    BUILD_BLOCK_ENTRIES = 4_000_000
+
+    def __init__(self, top_k: int = None, min_common_users: int = None):
+        """
+        Initialize neighbor table
+
+        Args:
+            top_k: Number of neighbors kept per food (default from config)
+            min_common_users: Minimum number of users who rated both foods
+                (default from config)
+        """
+        self.top_k = top_k or RecommendationConfig.ITEM_NEIGHBORS_TOP_K
+        self.min_common_users = (
+            min_common_users or RecommendationConfig.ITEM_NEIGHBORS_MIN_COMMON_USERS
+        )
+
+        self.food_encoder = IdEncoder()
+
+        # Neighbor table: row = food code, -1 marks an empty slot
+        self.neighbor_idx = None
+        self.neighbor_scores = None
+
+        self.built_at = 0.0
+        self.source_version = None  # Snapshot version the table was built from
+
+    @property
+    def is_built(self) -> bool:
+        return self.neighbor_idx is not None
+
+    def build(
+        self, rating_matrix: RatingMatrix, source_version: Optional[int] = None
+    ) -> bool:
+        """
+        Build the table from the user x food matrix of a snapshot
+
+        Args:
+            rating_matrix: Sparse ratings
+            source_version: Version of the snapshot the matrix comes from
+
+        Returns:
+            bool: True if the table was built
+        """
+        try:
+            if rating_matrix.nnz == 0:
+                logger.warning("Empty ratings data, item neighbor table not built")
+                return False
+
+            start_time = time.time()
+
+            # One row per food over the users who rated it
+            food_vectors = rating_matrix.matrix.T.tocsr().astype(np.float32)
+            norms = np.sqrt(np.asarray(food_vectors.multiply(food_vectors).sum(axis=1)))
+            norms = norms.ravel()
+            normalized = (
+                diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0))
+                @ food_vectors
+            ).tocsr()
+            rated = food_vectors.copy()
+            rated.data = np.ones_like(rated.data)
+
+            n_foods = food_vectors.shape[0]
+            top_k = min(self.top_k, max(n_foods - 1, 1))
+            neighbor_idx = np.full((n_foods, top_k), -1, dtype=np.int32)
+            neighbor_scores = np.zeros((n_foods, top_k), dtype=np.float32)
+
+            block_size = max(1, self.BUILD_BLOCK_ENTRIES // n_foods)
+            for block_start in range(0, n_foods, block_size):
+                block_stop = min(block_start + block_size, n_foods)
+                rows = np.arange(block_stop - block_start)
+
+                scores = (normalized[block_start:block_stop] @ normalized.T).toarray()
+                if self.min_common_users > 1:
+                    common = (rated[block_start:block_stop] @ rated.T).toarray()
+                    scores[common < self.min_common_users] = 0.0
+                scores[rows, rows + block_start] = 0.0
+
+                if top_k < n_foods:
+                    top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+                else:
+                    top = np.broadcast_to(np.arange(n_foods), scores.shape)[:, :top_k]
+                top_scores = np.take_along_axis(scores, top, axis=1)
+                order = np.argsort(-top_scores, axis=1, kind="stable")
+                top = np.take_along_axis(top, order, axis=1)
+                top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+                neighbor_idx[block_start:block_stop] = np.where(top_scores > 0, top, -1)
+                neighbor_scores[block_start:block_stop] = np.where(
+                    top_scores > 0, top_scores, 0.0
+                )
+
+            self.food_encoder = IdEncoder(rating_matrix.columns)
+            self.neighbor_idx = neighbor_idx
+            self.neighbor_scores = neighbor_scores
+            self.built_at = time.time()
+            self.source_version = source_version
+
+            for array in (self.neighbor_idx, self.neighbor_scores):
+                array.flags.writeable = False
+
+            logger.info(
+                f"Item neighbor table built: {n_foods} foods, top {top_k}, "
+                f"{time.time() - start_time:.2f}s"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error building item neighbor table: {e}")
+            return False
+
+    def get_similar_foods(
+        self, food_id: str, top_n: int = 10
+    ) -> List[Tuple[str, float]]:
+        """
+        Get the most similar foods of a food
+
+        Args:
+            food_id: Food ID
+            top_n: Number of foods to return (at most top_k)
+
+        Returns:
+            List[Tuple[str, float]]: (food_id, similarity) sorted descending;
+                empty for unknown foods or foods without co-rated neighbors
+        """
+        if not self.is_built:
+            return []
+        food_code = self.food_encoder.get(food_id)
+        if food_code is None:
+            return []
+
+        neighbors = self.neighbor_idx[food_code, :top_n]
+        valid = neighbors >= 0
+        return list(
+            zip(
+                self.food_encoder.decode(neighbors[valid]).tolist(),
+                self.neighbor_scores[food_code, :top_n][valid].tolist(),
+            )
+        )
+
+    def get_info(self) -> Dict[str, any]:
+        """
+        Get information about the table
+
+        Returns:
+            Dict[str, any]: Table information
+        """
+        if not self.is_built:
+            return {"built": False}
+
+        return {
+            "built": True,
+            "n_foods": len(self.food_encoder),
+            "top_k": self.neighbor_idx.shape[1],
+            "built_at": self.built_at,
+            "age": time.time() - self.built_at,
+            "source_version": self.source_version,
+            "memory_bytes": self.neighbor_idx.nbytes + self.neighbor_scores.nbytes,
+        }
@@ -0,0 +1,174 @@
+"""
+Latency Instrumentation Module
+Bounded per-stage latency histograms (p50/p95/p99) for the recommendation path
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator
+
+
+class LatencyHistogram:
+    """
+    Latency histogram with fixed log-spaced buckets: constant memory however
+    many samples are recorded, percentiles accurate to one bucket width
+    """
+
+    MIN_LATENCY = 1e-4  # seconds; faster samples land in the first bucket
+    MAX_LATENCY = 100.0  # seconds; slower samples land in the last bucket
+    BUCKETS_PER_DECADE = 20  # ~12% relative bucket width
+
+    def __init__(self):
+        """Initialize empty histogram"""
+        n_decades = math.log10(self.MAX_LATENCY / self.MIN_LATENCY)
+        self.n_buckets = int(round(n_decades * self.BUCKETS_PER_DECADE)) + 2
+
+        self.counts = [0] * self.n_buckets
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _bucket(self, seconds: float) -> int:
+        """Bucket index of a latency: 0 underflow, n_buckets - 1 overflow"""
+        if seconds < self.MIN_LATENCY:
+            return 0
+        index = (
+            int(math.log10(seconds / self.MIN_LATENCY) * self.BUCKETS_PER_DECADE) + 1
+        )
+        return min(index, self.n_buckets - 1)
+
+    def _upper_bound(self, index: int) -> float:
+        """Upper edge of a bucket in seconds"""
+        return self.MIN_LATENCY * 10 ** (index / self.BUCKETS_PER_DECADE)
+
+    def record(self, seconds: float) -> None:
+        """
+        Record one latency sample
+
+        Args:
+            seconds: Latency in seconds
+        """
+        self.counts[self._bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """
+        Get a latency percentile
+
+        Args:
+            q: Percentile between 0 and 100
+
+        Returns:
+            float: Upper edge of the bucket holding the percentile (capped at the
+                largest sample), in seconds; 0.0 without samples
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = max(1, math.ceil(q / 100.0 * self.count))
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Get summary statistics in milliseconds
+
+        Returns:
+            Dict[str, float]: count, mean, p50, p95, p99 and max
+        """
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class LatencyRecorder:
+    """
+    Thread-safe set of latency histograms, one per named stage
+    """
+
+    def __init__(self):
+        """Initialize recorder without stages"""
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        """
+        Record a latency sample of a stage
+
+        Args:
+            stage: Stage name
+            seconds: Latency in seconds
+        """
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.record(seconds)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """
+        Time a block of code as one sample of a stage (also when it raises)
+
+        Args:
+            stage: Stage name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def timed(self, stage: str) -> Callable:
+        """
+        Decorator timing every call of a function as a stage
+
+        Args:
+            stage: Stage name
+        """
+
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(stage):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get summary statistics of every stage
+
+        Returns:
+            Dict[str, Dict[str, float]]: stage -> count, mean, p50, p95, p99, max
+        """
+        with self._lock:
+            return {
+                stage: histogram.get_stats()
+                for stage, histogram in sorted(self._histograms.items())
+            }
+
+    def reset(self) -> None:
+        """Drop all recorded samples"""
+        with self._lock:
+            self._histograms = {}
+
+
+# Shared by the recommender, the data processor and the response enrichment
+latency_recorder = LatencyRecorder()
@@ -3,19 +3,40 @@ Local Data Preparation Module
 Handles pivot matrix creation, user filtering, and sub-dataset preparation for SVD
 """
 
+import threading
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Union
+from scipy.sparse import csr_matrix
+from sqlalchemy import func
 from app.utils.logger import get_logger
 from app.modules.rating.models import FoodRating, RestaurantRating
 from app.modules.food.models import Food
+from app.modules.category.models import (
+    Category,
+    UserFavoriteCategory,
+    restaurant_categories,
+)
 from app.extensions import db
 from .similarity import get_similar_users
+from .neighbor_index import UserNeighborIndex
+from .ratings_store import IdEncoder, RatingsStore, RatingMatrix, as_rating_matrix
 from .config import RecommendationConfig
+from .latency import latency_recorder
 
 logger = get_logger(__name__)
 
 
+def _empty_matrix() -> RatingMatrix:
+    """Rating matrix without users or foods"""
+    return RatingMatrix(csr_matrix((0, 0), dtype=np.float32), [], [])
+
+
+def _empty_dataset() -> Tuple[pd.DataFrame, RatingMatrix]:
+    """Empty (sub_ratings_df, sub_pivot_matrix) pair"""
+    return pd.DataFrame(columns=["user_id", "food_id", "rating"]), _empty_matrix()
+
+
 class LocalDataProcessor:
     """
     Handles data preprocessing and sub-dataset creation for local SVD training
@@ -43,13 +64,46 @@ class LocalDataProcessor:
             if alpha is not None
             else RecommendationConfig.DEFAULT_FOOD_RESTAURANT_ALPHA
         )
-        self.ratings_df = None
+        self.ratings_store = None  # Encoded ratings snapshot (see ratings_df)
         self.user_item_matrix = None
-        self.user_mapping = {}
-        self.food_mapping = {}
-        self.reverse_user_mapping = {}
-        self.reverse_food_mapping = {}
+        self.user_encoder = IdEncoder()  # Local dataset row index <-> user_id
+        self.food_encoder = IdEncoder()  # Local dataset column index <-> food_id
         self.use_hybrid_scoring = True  # Flag to enable/disable hybrid scoring
+        # Neighbor index, rebuilt off the request path after every full reload;
+        # requests keep using the previous index (or no index) until it is ready
+        self.neighbor_index = None
+        self._neighbor_lock = threading.Lock()  # Guards the index swap
+        self._neighbor_generation = 0  # Bumped whenever a rebuild is requested
+        self._neighbor_thread = None  # Background build thread, if running
+        self._neighbor_updated_users = set()  # Users patched since a build began
+        self.watermark = None  # Latest rating updated_at merged into the snapshot
+        # (table, row id, updated_at) of the rows merged at exactly the watermark,
+        # which the next refresh's >= filter selects again
+        self.watermark_rows = set()
+
+    @property
+    def ratings_df(self) -> Optional[pd.DataFrame]:
+        """
+        Ratings snapshot as a DataFrame, materialized from the ratings store on
+        every access; hot paths should use ratings_store directly
+        """
+        if self.ratings_store is None:
+            return None
+        return self.ratings_store.to_dataframe()
+
+    @ratings_df.setter
+    def ratings_df(self, df: Optional[pd.DataFrame]) -> None:
+        if df is None:
+            self.ratings_store = None
+            return
+
+        self.ratings_store = RatingsStore.from_dataframe(df)
+        store_memory = self.ratings_store.memory_usage()
+        logger.info(
+            f"Ratings store: {store_memory['total_bytes'] / 1024 ** 2:.2f} MB for "
+            f"{len(df)} ratings (DataFrame: "
+            f"{df.memory_usage(deep=True).sum() / 1024 ** 2:.2f} MB)"
+        )
 
     def load_ratings_from_db(self) -> pd.DataFrame:
         """
@@ -59,22 +113,13 @@ class LocalDataProcessor:
             pd.DataFrame: DataFrame with columns [user_id, food_id, rating]
         """
         try:
-            # Query FoodRating table
+            # Query FoodRating table straight into columns
             ratings_query = db.session.query(
                 FoodRating.user_id, FoodRating.food_id, FoodRating.rating
             ).all()
-
-            # Convert to DataFrame
-            ratings_data = [
-                {
-                    "user_id": rating.user_id,
-                    "food_id": rating.food_id,
-                    "rating": rating.rating,
-                }
-                for rating in ratings_query
-            ]
-
-            df = pd.DataFrame(ratings_data)
+            df = pd.DataFrame.from_records(
+                ratings_query, columns=["user_id", "food_id", "rating"]
+            )
 
             if len(df) > 0:
                 logger.info(f"Raw ratings data sample:\n{df.head()}")
@@ -82,22 +127,89 @@ class LocalDataProcessor:
 
             logger.info(f"Loaded {len(df)} ratings from database")
             self.ratings_df = df
+            self.request_neighbor_index_build()
+            self.watermark = None  # Incremental refresh only for hybrid ratings
+            self.watermark_rows = set()
             return df
 
         except Exception as e:
             logger.error(f"Error loading ratings from database: {e}")
             return pd.DataFrame(columns=["user_id", "food_id", "rating"])
 
-    def filter_sparse_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def load_food_categories_from_db(self) -> pd.DataFrame:
+        """
+        Load the categories of every food (through its restaurant)
+
+        Returns:
+            pd.DataFrame: DataFrame with columns [food_id, category_id]
+        """
+        try:
+            rows = (
+                db.session.query(Food.id, restaurant_categories.c.category_id)
+                .join(
+                    restaurant_categories,
+                    Food.restaurant_id == restaurant_categories.c.restaurant_id,
+                )
+                .join(Category, Category.id == restaurant_categories.c.category_id)
+                .filter(Category.is_active == True)
+                .all()
+            )
+            return pd.DataFrame.from_records(rows, columns=["food_id", "category_id"])
+
+        except Exception as e:
+            logger.error(f"Error loading food categories from database: {e}")
+            return pd.DataFrame(columns=["food_id", "category_id"])
+
+    def load_favorite_categories_from_db(
+        self, user_ids: List[str]
+    ) -> Dict[str, List[str]]:
+        """
+        Load the favorite category IDs of some users in one query
+
+        Args:
+            user_ids: User IDs
+
+        Returns:
+            Dict[str, List[str]]: user_id -> category IDs, newest favorite first;
+                users without favorites are missing
+        """
+        try:
+            if not user_ids:
+                return {}
+
+            rows = (
+                db.session.query(
+                    UserFavoriteCategory.user_id, UserFavoriteCategory.category_id
+                )
+                .filter(UserFavoriteCategory.user_id.in_(user_ids))
+                .order_by(UserFavoriteCategory.created_at.desc())
+                .all()
+            )
+
+            favorites = {}
+            for user_id, category_id in rows:
+                favorites.setdefault(user_id, []).append(category_id)
+            return favorites
+
+        except Exception as e:
+            logger.error(f"Error loading favorite categories from database: {e}")
+            return {}
+
+    def filter_sparse_data(
+        self, df: Union[pd.DataFrame, RatingMatrix]
+    ) -> Union[pd.DataFrame, RatingMatrix]:
         """
         Filter out users and foods with too few ratings
 
         Args:
-            df: DataFrame with ratings data
+            df: DataFrame with ratings data, or a RatingMatrix
 
         Returns:
-            pd.DataFrame: Filtered DataFrame
+            Union[pd.DataFrame, RatingMatrix]: Filtered data of the same type
         """
+        if isinstance(df, RatingMatrix):
+            return self._filter_sparse_matrix(df)
+
         try:
             initial_size = len(df)
 
@@ -151,40 +263,89 @@ class LocalDataProcessor:
             logger.error(f"Error filtering sparse data: {e}")
             return df
 
+    def _filter_sparse_matrix(self, rating_matrix: RatingMatrix) -> RatingMatrix:
+        """
+        filter_sparse_data on the sparse form: same passes, with counts read from
+        the CSR structure
+
+        Args:
+            rating_matrix: Sparse ratings
+
+        Returns:
+            RatingMatrix: Filtered matrix without empty rows or columns
+        """
+        try:
+            filtered = rating_matrix.select(
+                rating_matrix.user_counts() >= self.min_user_ratings,
+                rating_matrix.food_counts() >= self.min_food_ratings,
+            )
+
+            # Iteratively filter until stable (users/foods might drop below threshold after filtering)
+            prev_size = filtered.nnz
+            max_iterations = 5
+            for _ in range(max_iterations):
+                filtered = filtered.select(
+                    filtered.user_counts() >= self.min_user_ratings,
+                    filtered.food_counts() >= self.min_food_ratings,
+                )
+                if filtered.nnz == prev_size:
+                    break
+                prev_size = filtered.nnz
+
+            filtered = filtered.select(
+                filtered.user_counts() > 0, filtered.food_counts() > 0
+            )
+
+            logger.info(
+                f"Filtered data: {rating_matrix.nnz} -> {filtered.nnz} ratings"
+            )
+            logger.info(f"Users: {rating_matrix.shape[0]} -> {filtered.shape[0]}")
+            logger.info(f"Foods: {rating_matrix.shape[1]} -> {filtered.shape[1]}")
+
+            return filtered
+
+        except Exception as e:
+            logger.error(f"Error filtering sparse data: {e}")
+            return rating_matrix
+
     def create_pivot_matrix(
-        self, df: pd.DataFrame, binary: bool = False
-    ) -> pd.DataFrame:
+        self, df: Union[pd.DataFrame, RatingMatrix], binary: bool = False
+    ) -> RatingMatrix:
         """
-        Create user-item pivot matrix
+        Create user-item matrix
 
         Args:
-            df: DataFrame with ratings data
+            df: DataFrame with ratings data, or a RatingMatrix
             binary: If True, convert ratings to binary (0/1)
 
         Returns:
-            pd.DataFrame: Pivot matrix with users as rows and foods as columns
+            RatingMatrix: Sparse matrix with users as rows and foods as columns
         """
+        pivot_matrix = self._build_pivot_matrix(df, binary=binary)
+        if not pivot_matrix.empty:
+            self.user_item_matrix = pivot_matrix
+        return pivot_matrix
+
+    def _build_pivot_matrix(
+        self, df: Union[pd.DataFrame, RatingMatrix], binary: bool = False
+    ) -> RatingMatrix:
+        """Create a user-item matrix without storing it on the processor"""
         try:
+            pivot_matrix = as_rating_matrix(df)
             if binary:
                 # Convert to binary (rated/not rated)
-                df_binary = df.copy()
-                df_binary["rating"] = 1
-                pivot_matrix = df_binary.pivot_table(
-                    index="user_id", columns="food_id", values="rating", fill_value=0
-                )
-            else:
-                # Use actual ratings
-                pivot_matrix = df.pivot_table(
-                    index="user_id", columns="food_id", values="rating", fill_value=0
+                binary_matrix = pivot_matrix.matrix.copy()
+                binary_matrix.data = np.ones_like(binary_matrix.data)
+                pivot_matrix = RatingMatrix(
+                    binary_matrix, pivot_matrix.index, pivot_matrix.columns
                 )
 
             logger.info(f"Created pivot matrix: {pivot_matrix.shape}")
-            self.user_item_matrix = pivot_matrix
             return pivot_matrix
 
         except Exception as e:
             logger.error(f"Error creating pivot matrix: {e}")
-            return pd.DataFrame()
+            return _empty_matrix()
 
     def create_id_mappings(self, user_ids: List[str], food_ids: List[str]) -> None:
         """
@@ -194,17 +355,8 @@ class LocalDataProcessor:
             user_ids: List of user IDs
             food_ids: List of food IDs
         """
-        # Create user mappings
-        self.user_mapping = {user_id: idx for idx, user_id in enumerate(user_ids)}
-        self.reverse_user_mapping = {
-            idx: user_id for user_id, idx in self.user_mapping.items()
-        }
-
-        # Create food mappings
-        self.food_mapping = {food_id: idx for idx, food_id in enumerate(food_ids)}
-        self.reverse_food_mapping = {
-            idx: food_id for food_id, idx in self.food_mapping.items()
-        }
+        self.user_encoder = IdEncoder(user_ids)
+        self.food_encoder = IdEncoder(food_ids)
 
         logger.info(f"Created mappings: {len(user_ids)} users, {len(food_ids)} foods")
 
@@ -214,6 +366,7 @@ class LocalDataProcessor:
         top_k: int = 50,
         similarity_method: str = "cosine",  # PERBAIKAN: Default ke cosine
         similarity_threshold: float = 0.2,  # PERBAIKAN: Threshold default lebih ketat
+        rating_matrix: Optional[RatingMatrix] = None,
     ) -> List[str]:
         """
         Get subset of similar users for the target user
@@ -223,23 +376,37 @@ class LocalDataProcessor:
             top_k: Number of similar users to return
             similarity_method: Method for similarity calculation
             similarity_threshold: Minimum similarity threshold
+            rating_matrix: Ratings to compute similarities on when the neighbor
+                index cannot answer (default: the loaded snapshot)
 
         Returns:
             List[str]: List of similar user IDs
         """
         try:
-            if self.ratings_df is None:
+            if self.ratings_store is None:
                 logger.error("Ratings data not loaded")
                 return []
 
-            # Get similar users
-            similar_users = get_similar_users(
-                self.ratings_df,
-                target_user_id,
-                top_k=top_k,
-                similarity_threshold=similarity_threshold,
-                method=similarity_method,
-            )
+            # Read neighbors from the precomputed index when it can answer
+            similar_users = None
+            neighbor_index = self.get_neighbor_index()
+            if similarity_method == "cosine" and neighbor_index is not None:
+                similar_users = neighbor_index.get_neighbors(
+                    target_user_id,
+                    top_k=top_k,
+                    similarity_threshold=similarity_threshold,
+                )
+
+            if similar_users is None:
+                if rating_matrix is None:
+                    rating_matrix = self.ratings_store.to_matrix()
+                similar_users = get_similar_users(
+                    rating_matrix,
+                    target_user_id,
+                    top_k=top_k,
+                    similarity_threshold=similarity_threshold,
+                    method=similarity_method,
+                )
 
             # Extract user IDs
             similar_user_ids = [user_id for user_id, _ in similar_users]
@@ -257,118 +424,225 @@ class LocalDataProcessor:
             logger.error(f"Error getting similar users subset: {e}")
             return [target_user_id] if target_user_id else []
 
+    def get_neighbor_index(self) -> Optional[UserNeighborIndex]:
+        """
+        Get the latest built neighbor index; it may lag behind the snapshot while
+        a rebuild runs in the background
+
+        Returns:
+            Optional[UserNeighborIndex]: Neighbor index, or None if none is built yet
+        """
+        with self._neighbor_lock:
+            return self.neighbor_index
+
+    def request_neighbor_index_build(self) -> None:
+        """
+        Rebuild the neighbor index for the current snapshot in a background thread
+
+        A build already running is superseded: its result is dropped and the
+        thread builds again from the newer snapshot.
+        """
+        with self._neighbor_lock:
+            self._neighbor_generation += 1
+            if self._neighbor_thread is None:
+                self._neighbor_thread = threading.Thread(
+                    target=self._run_neighbor_index_builds,
+                    name="neighbor-index-build",
+                    daemon=True,
+                )
+                self._neighbor_thread.start()
+
+    def _run_neighbor_index_builds(self) -> None:
+        """Thread body: build until the latest requested generation is served"""
+        while True:
+            with self._neighbor_lock:
+                generation = self._neighbor_generation
+
+            try:
+                self.build_neighbor_index()
+            except Exception as e:
+                logger.error(f"Error in neighbor index build: {e}")
+
+            with self._neighbor_lock:
+                if generation == self._neighbor_generation:
+                    self._neighbor_thread = None
+                    return
+
+    def build_neighbor_index(self) -> bool:
+        """
+        Build a neighbor index from the current snapshot and swap it in
+
+        Users patched into the snapshot while the build ran are applied to the
+        new index before the swap.
+
+        Returns:
+            bool: True if the new index was swapped in; False if there is no data
+                or a full reload superseded the build
+        """
+        with self._neighbor_lock:
+            generation = self._neighbor_generation
+            ratings_store = self.ratings_store
+            self._neighbor_updated_users = set()
+
+        if ratings_store is None:
+            return False
+
+        neighbor_index = UserNeighborIndex()
+        if not neighbor_index.build(ratings_store.to_matrix()):
+            return False
+
+        with self._neighbor_lock:
+            if generation != self._neighbor_generation:
+                logger.info("Neighbor index build superseded by a newer snapshot")
+                return False
+
+            for user_id in self._neighbor_updated_users:
+                neighbor_index.update_user(
+                    user_id, self.ratings_store.get_user_ratings(user_id)
+                )
+            self._neighbor_updated_users = set()
+            self.neighbor_index = neighbor_index
+            return True
+
+    def _update_neighbor_index(self, user_id: str, user_df: pd.DataFrame) -> None:
+        """
+        Apply the fresh ratings of one user to the neighbor index
+
+        Args:
+            user_id: User whose ratings changed
+            user_df: Fresh ratings of that user
+        """
+        with self._neighbor_lock:
+            # A build in progress replays this user before it is swapped in
+            self._neighbor_updated_users.add(user_id)
+            neighbor_index = self.neighbor_index
+
+        if neighbor_index is not None and neighbor_index.is_built:
+            neighbor_index.update_user(
+                user_id, dict(zip(user_df["food_id"], user_df["rating"]))
+            )
+
     def create_local_dataset(
         self,
         target_user_id: str,
         top_k_users: int = 50,
         similarity_method: str = "cosine",  # PERBAIKAN: Default ke cosine
         similarity_threshold: float = 0.3,  # PERBAIKAN: Threshold default lebih ketat
-    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        ratings_store: Optional[RatingsStore] = None,
+    ) -> Tuple[pd.DataFrame, RatingMatrix]:
         """
         Create local sub-dataset for SVD training
 
+        The processor is not modified, so concurrent requests can build their
+        own datasets; row/column indices follow the matrix's index and columns.
+        The data stays sparse from the ratings store to the returned matrix.
+
         Args:
             target_user_id: ID of target user
             top_k_users: Number of similar users to include
             similarity_method: Method for similarity calculation
             similarity_threshold: Minimum similarity threshold
+            ratings_store: Ratings snapshot to use (default: the loaded one)
 
         Returns:
-            Tuple[pd.DataFrame, pd.DataFrame]: (sub_ratings_df, sub_pivot_matrix)
+            Tuple[pd.DataFrame, RatingMatrix]: (sub_ratings_df, sub_pivot_matrix)
         """
         try:
             # Load and filter data if not already done
-            if self.ratings_df is None:
-                self.load_ratings_from_db()
+            if ratings_store is None:
+                if self.ratings_store is None:
+                    self.load_ratings_from_db()
+                ratings_store = self.ratings_store
 
-            if len(self.ratings_df) == 0:
+            if ratings_store is None or len(ratings_store) == 0:
                 logger.error("No ratings data available")
-                return pd.DataFrame(), pd.DataFrame()
+                return _empty_dataset()
 
-            # Filter sparse data
-            filtered_df = self.filter_sparse_data(self.ratings_df)
+            # Filter sparse data (computed once per ratings snapshot)
+            rating_matrix = ratings_store.to_matrix()
+            filtered_matrix = ratings_store.filtered_matrix(
+                self.min_user_ratings, self.min_food_ratings
+            )
 
-            if len(filtered_df) == 0:
+            if filtered_matrix.nnz == 0:
                 logger.error("No data remaining after filtering")
-                return pd.DataFrame(), pd.DataFrame()
+                return _empty_dataset()
 
             # Check if target user exists in filtered data
-            if target_user_id not in filtered_df["user_id"].values:
+            if target_user_id not in filtered_matrix.index:
                 logger.warning(
                     f"Target user {target_user_id} not found in filtered data"
                 )
                 # Return popular items as fallback data
-                return self._get_fallback_data(filtered_df)
+                return self._get_fallback_data(filtered_matrix)
 
             # Get similar users
-            similar_user_ids = self.get_similar_users_subset(
-                target_user_id,
-                top_k=top_k_users,
-                similarity_method=similarity_method,
-                similarity_threshold=similarity_threshold,
-            )
+            with latency_recorder.time("similarity"):
+                similar_user_ids = self.get_similar_users_subset(
+                    target_user_id,
+                    top_k=top_k_users,
+                    similarity_method=similarity_method,
+                    similarity_threshold=similarity_threshold,
+                    rating_matrix=rating_matrix,
+                )
 
             if len(similar_user_ids) < 2:
                 logger.warning(f"Too few similar users found for {target_user_id}")
-                return self._get_fallback_data(filtered_df)
+                return self._get_fallback_data(filtered_matrix)
 
-            # Create sub-dataset with similar users
-            sub_ratings_df = filtered_df[
-                filtered_df["user_id"].isin(similar_user_ids)
-            ].copy()
+            # Create sub-dataset with similar users (foods they rated only)
+            with latency_recorder.time("pivot"):
+                sub_pivot_matrix = filtered_matrix.select_users(similar_user_ids)
 
-            if len(sub_ratings_df) == 0:
+            if sub_pivot_matrix.nnz == 0:
                 logger.error("Empty sub-dataset after filtering similar users")
-                return self._get_fallback_data(filtered_df)
-
-            # Create pivot matrix for sub-dataset
-            sub_pivot_matrix = self.create_pivot_matrix(sub_ratings_df)
-
-            # Create ID mappings
-            self.create_id_mappings(
-                list(sub_pivot_matrix.index), list(sub_pivot_matrix.columns)
-            )
+                return self._get_fallback_data(filtered_matrix)
 
             logger.info(
-                f"Created local dataset: {len(sub_ratings_df)} ratings, "
+                f"Created local dataset: {sub_pivot_matrix.nnz} ratings, "
                 f"{sub_pivot_matrix.shape[0]} users, {sub_pivot_matrix.shape[1]} foods "
                 f"(method: {similarity_method})"
             )
 
-            return sub_ratings_df, sub_pivot_matrix
+            return sub_pivot_matrix.to_dataframe(), sub_pivot_matrix
 
         except Exception as e:
             logger.error(f"Error creating local dataset: {e}")
-            return pd.DataFrame(), pd.DataFrame()
+            return _empty_dataset()
 
-    def _get_fallback_data(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    @latency_recorder.timed("pivot")
+    def _get_fallback_data(
+        self, rating_matrix: RatingMatrix
+    ) -> Tuple[pd.DataFrame, RatingMatrix]:
         """
         Get fallback data when similar users cannot be found
 
         Args:
-            df: Filtered ratings DataFrame
+            rating_matrix: Filtered sparse ratings
 
         Returns:
-            Tuple[pd.DataFrame, pd.DataFrame]: (fallback_ratings_df, fallback_pivot_matrix)
+            Tuple[pd.DataFrame, RatingMatrix]: (fallback_ratings_df, fallback_pivot_matrix)
         """
         try:
             # Take most active users as fallback
-            user_activity = df["user_id"].value_counts().head(50)
-            fallback_users = user_activity.index.tolist()
+            user_activity = rating_matrix.user_counts()
+            fallback_users = np.zeros(len(user_activity), dtype=bool)
+            fallback_users[np.argsort(-user_activity, kind="stable")[:50]] = True
 
-            fallback_df = df[df["user_id"].isin(fallback_users)].copy()
-            fallback_pivot = self.create_pivot_matrix(fallback_df)
+            fallback_pivot = rating_matrix.select(
+                fallback_users, drop_empty_foods=True
+            )
 
             logger.info(
-                f"Created fallback dataset: {len(fallback_df)} ratings, "
+                f"Created fallback dataset: {fallback_pivot.nnz} ratings, "
                 f"{fallback_pivot.shape[0]} users, {fallback_pivot.shape[1]} foods"
             )
 
-            return fallback_df, fallback_pivot
+            return fallback_pivot.to_dataframe(), fallback_pivot
 
         except Exception as e:
             logger.error(f"Error creating fallback data: {e}")
-            return pd.DataFrame(), pd.DataFrame()
+            return _empty_dataset()
 
     def get_user_rated_foods(self, user_id: str) -> List[str]:
         """
@@ -381,16 +655,35 @@ class LocalDataProcessor:
             List[str]: List of food IDs rated by user
         """
         try:
-            if self.ratings_df is None:
+            if self.ratings_store is None:
                 return []
 
-            user_ratings = self.ratings_df[self.ratings_df["user_id"] == user_id]
-            return user_ratings["food_id"].tolist()
+            return self.ratings_store.get_user_rated_foods(user_id)
 
         except Exception as e:
             logger.error(f"Error getting user rated foods: {e}")
             return []
 
+    def get_user_ratings(self, user_id: str) -> Dict[str, float]:
+        """
+        Get the ratings of a user from the current snapshot
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Dict[str, float]: Mapping of food_id -> rating
+        """
+        try:
+            if self.ratings_store is None:
+                return {}
+
+            return self.ratings_store.get_user_ratings(user_id)
+
+        except Exception as e:
+            logger.error(f"Error getting user ratings: {e}")
+            return {}
+
     def load_hybrid_ratings_from_db(self) -> pd.DataFrame:
         """
         Load hybrid ratings data combining food and restaurant ratings
@@ -401,79 +694,16 @@ class LocalDataProcessor:
             pd.DataFrame: DataFrame with columns [user_id, food_id, rating, has_restaurant_rating]
         """
         try:
-            # Load food ratings
-            food_ratings_query = (
-                db.session.query(
-                    FoodRating.user_id,
-                    FoodRating.food_id,
-                    FoodRating.rating,
-                    Food.restaurant_id,
-                )
-                .join(Food, FoodRating.food_id == Food.id)
-                .all()
-            )
+            # Take the watermark before reading so concurrent writes are picked
+            # up again by the next incremental refresh
+            watermark = self._query_ratings_watermark()
+            df = self._query_hybrid_ratings()
 
-            if not food_ratings_query:
+            if len(df) == 0:
                 logger.warning("No food ratings found in database")
-                return pd.DataFrame(
-                    columns=["user_id", "food_id", "rating", "has_restaurant_rating"]
-                )
-
-            # Load restaurant ratings
-            restaurant_ratings_query = db.session.query(
-                RestaurantRating.user_id,
-                RestaurantRating.restaurant_id,
-                RestaurantRating.rating,
-            ).all()
-
-            # Create restaurant ratings lookup
-            restaurant_ratings_dict = {}
-            for rating in restaurant_ratings_query:
-                key = (rating.user_id, rating.restaurant_id)
-                restaurant_ratings_dict[key] = rating.rating
-
-            # Process hybrid ratings
-            hybrid_ratings_data = []
-            restaurant_coverage_count = 0
-
-            for food_rating in food_ratings_query:
-                user_id = food_rating.user_id
-                food_id = food_rating.food_id
-                food_rating_value = food_rating.rating
-                restaurant_id = food_rating.restaurant_id
-
-                # Look for corresponding restaurant rating
-                restaurant_key = (user_id, restaurant_id)
-                restaurant_rating_value = restaurant_ratings_dict.get(restaurant_key)
-
-                if restaurant_rating_value is not None and self.use_hybrid_scoring:
-                    # Calculate hybrid score
-                    hybrid_score = (self.alpha * food_rating_value) + (
-                        (1 - self.alpha) * restaurant_rating_value
-                    )
-                    has_restaurant_rating = True
-                    restaurant_coverage_count += 1
-                else:
-                    # Fallback to food rating only
-                    hybrid_score = food_rating_value
-                    has_restaurant_rating = False
-
-                hybrid_ratings_data.append(
-                    {
-                        "user_id": user_id,
-                        "food_id": food_id,
-                        "rating": hybrid_score,
-                        "has_restaurant_rating": has_restaurant_rating,
-                    }
-                )
+                return df
 
-            df = pd.DataFrame(hybrid_ratings_data)
-
-            restaurant_coverage = (
-                (restaurant_coverage_count / len(hybrid_ratings_data)) * 100
-                if hybrid_ratings_data
-                else 0
-            )
+            restaurant_coverage = df["has_restaurant_rating"].mean() * 100
 
             if self.use_hybrid_scoring:
                 logger.info(
@@ -486,6 +716,9 @@ class LocalDataProcessor:
                 )
 
             self.ratings_df = df
+            self.request_neighbor_index_build()
+            self.watermark = watermark
+            self.watermark_rows = set()
             return df
 
         except Exception as e:
@@ -494,6 +727,256 @@ class LocalDataProcessor:
                 columns=["user_id", "food_id", "rating", "has_restaurant_rating"]
             )
 
+    def _query_hybrid_ratings(
+        self, user_ids: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Query food and restaurant ratings and combine them into hybrid scores
+
+        Args:
+            user_ids: Restrict the query to these users (default: all users)
+
+        Returns:
+            pd.DataFrame: DataFrame with columns [user_id, food_id, rating, has_restaurant_rating]
+        """
+        # Load food ratings
+        food_ratings_query = db.session.query(
+            FoodRating.user_id,
+            FoodRating.food_id,
+            FoodRating.rating,
+            Food.restaurant_id,
+        ).join(Food, FoodRating.food_id == Food.id)
+
+        # Load restaurant ratings
+        restaurant_ratings_query = db.session.query(
+            RestaurantRating.user_id,
+            RestaurantRating.restaurant_id,
+            RestaurantRating.rating,
+        )
+
+        if user_ids is not None:
+            food_ratings_query = food_ratings_query.filter(
+                FoodRating.user_id.in_(user_ids)
+            )
+            restaurant_ratings_query = restaurant_ratings_query.filter(
+                RestaurantRating.user_id.in_(user_ids)
+            )
+
+        food_ratings_df = pd.DataFrame.from_records(
+            food_ratings_query.all(),
+            columns=["user_id", "food_id", "rating", "restaurant_id"],
+        )
+        if len(food_ratings_df) == 0:
+            return pd.DataFrame(
+                columns=["user_id", "food_id", "rating", "has_restaurant_rating"]
+            )
+
+        restaurant_ratings_df = pd.DataFrame.from_records(
+            restaurant_ratings_query.all(),
+            columns=["user_id", "restaurant_id", "restaurant_rating"],
+        ).drop_duplicates(["user_id", "restaurant_id"], keep="last")
+
+        # Attach the user's rating of the food's restaurant (left join keeps the
+        # food rating order)
+        merged_df = food_ratings_df.merge(
+            restaurant_ratings_df, on=["user_id", "restaurant_id"], how="left"
+        )
+        food_rating_values = merged_df["rating"].to_numpy(dtype=np.float64)
+        restaurant_rating_values = merged_df["restaurant_rating"].to_numpy(
+            dtype=np.float64
+        )
+
+        # Hybrid score where a restaurant rating exists, food rating otherwise
+        has_restaurant_rating = ~np.isnan(restaurant_rating_values)
+        if not self.use_hybrid_scoring:
+            has_restaurant_rating[:] = False
+
+        hybrid_scores = np.where(
+            has_restaurant_rating,
+            (self.alpha * food_rating_values)
+            + ((1 - self.alpha) * restaurant_rating_values),
+            food_rating_values,
+        )
+
+        return pd.DataFrame(
+            {
+                "user_id": merged_df["user_id"].to_numpy(),
+                "food_id": merged_df["food_id"].to_numpy(),
+                "rating": hybrid_scores,
+                "has_restaurant_rating": has_restaurant_rating,
+            }
+        )
+
+    def _query_ratings_watermark(self):
+        """
+        Get the latest updated_at over food and restaurant ratings
+
+        Returns:
+            datetime: Latest update timestamp, or None if there are no ratings
+        """
+        food_latest = db.session.query(func.max(FoodRating.updated_at)).scalar()
+        restaurant_latest = db.session.query(
+            func.max(RestaurantRating.updated_at)
+        ).scalar()
+
+        timestamps = [ts for ts in (food_latest, restaurant_latest) if ts is not None]
+        return max(timestamps) if timestamps else None
+
+    def _replace_users_ratings(self, user_ids: List[str]) -> pd.DataFrame:
+        """
+        Re-query the ratings of some users and swap them into the current snapshot
+
+        Args:
+            user_ids: Users whose ratings are replaced
+
+        Returns:
+            pd.DataFrame: The fresh ratings of those users
+        """
+        users_df = self._query_hybrid_ratings(user_ids)
+        self.ratings_store = self.ratings_store.replace_users(user_ids, users_df)
+        return users_df
+
+    def refresh_user_ratings(self, user_id: str) -> bool:
+        """
+        Reload the ratings of a single user into the current snapshot and update
+        the neighbor index for that user
+
+        Args:
+            user_id: User whose ratings changed
+
+        Returns:
+            bool: True if the snapshot was updated
+        """
+        try:
+            if self.ratings_store is None:
+                return False
+
+            user_df = self._replace_users_ratings([user_id])
+
+            self._update_neighbor_index(user_id, user_df)
+
+            logger.info(
+                f"Refreshed {len(user_df)} ratings for user {user_id} in snapshot"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error refreshing ratings for user {user_id}: {e}")
+            return False
+
+    def _user_ratings_changed(self, user_id: str, user_df: pd.DataFrame) -> bool:
+        """
+        Check whether re-queried ratings of a user differ from the snapshot
+
+        Args:
+            user_id: User ID
+            user_df: Fresh ratings of that user
+
+        Returns:
+            bool: True if any food or rating value differs
+        """
+        # Compare in the store's dtype, as replace_users would store them
+        fresh_ratings = user_df["rating"].to_numpy(
+            dtype=self.ratings_store.ratings.dtype
+        )
+        return self.ratings_store.get_user_ratings(user_id) != dict(
+            zip(user_df["food_id"], fresh_ratings.tolist())
+        )
+
+    def refresh_changed_ratings(self) -> Optional[List[str]]:
+        """
+        Merge ratings updated since the last watermark into the current snapshot
+
+        Every user with a food or restaurant rating at or after the watermark gets
+        all their ratings re-queried, so a changed restaurant rating also updates
+        the hybrid scores of that user's foods. Rows already merged at the
+        watermark are skipped, and users whose re-queried ratings equal the
+        snapshot are left out, so an idle refresh changes nothing. Deleted rows
+        leave no trace here; they are picked up by the next full reload.
+
+        Returns:
+            Optional[List[str]]: IDs of users whose ratings changed, or None if an
+                incremental refresh is not possible
+        """
+        try:
+            if self.ratings_store is None or self.watermark is None:
+                return None
+
+            new_watermark = self._query_ratings_watermark()
+
+            # >= because updated_at has second resolution: rows written later in
+            # the watermark second must still be found
+            changed_rows = [
+                ("food", row.id, row.user_id, row.updated_at)
+                for row in db.session.query(
+                    FoodRating.id, FoodRating.user_id, FoodRating.updated_at
+                ).filter(FoodRating.updated_at >= self.watermark)
+            ] + [
+                ("restaurant", row.id, row.user_id, row.updated_at)
+                for row in db.session.query(
+                    RestaurantRating.id,
+                    RestaurantRating.user_id,
+                    RestaurantRating.updated_at,
+                ).filter(RestaurantRating.updated_at >= self.watermark)
+            ]
+            candidate_user_ids = sorted(
+                {
+                    user_id
+                    for table, row_id, user_id, updated_at in changed_rows
+                    if (table, row_id, updated_at) not in self.watermark_rows
+                }
+            )
+
+            changed_user_ids = []
+            if candidate_user_ids:
+                users_df = self._query_hybrid_ratings(candidate_user_ids)
+                fresh_by_user = dict(tuple(users_df.groupby("user_id")))
+                empty_df = users_df.iloc[0:0]
+                changed_user_ids = [
+                    user_id
+                    for user_id in candidate_user_ids
+                    if self._user_ratings_changed(
+                        user_id, fresh_by_user.get(user_id, empty_df)
+                    )
+                ]
+
+            if changed_user_ids:
+                users_df = users_df[users_df["user_id"].isin(changed_user_ids)]
+                self.ratings_store = self.ratings_store.replace_users(
+                    changed_user_ids, users_df
+                )
+
+                max_updates = RecommendationConfig.DELTA_MAX_NEIGHBOR_UPDATES
+                if len(changed_user_ids) > max_updates:
+                    # Cheaper to rebuild in the background than to patch many rows
+                    self.request_neighbor_index_build()
+                else:
+                    for user_id in changed_user_ids:
+                        self._update_neighbor_index(
+                            user_id, fresh_by_user.get(user_id, empty_df)
+                        )
+
+                logger.info(
+                    f"Merged {len(users_df)} ratings of {len(changed_user_ids)} "
+                    f"changed users into snapshot"
+                )
+
+            if new_watermark is not None:
+                merged_at_watermark = {
+                    (table, row_id, updated_at)
+                    for table, row_id, user_id, updated_at in changed_rows
+                    if updated_at == new_watermark
+                }
+                if new_watermark == self.watermark:
+                    merged_at_watermark |= self.watermark_rows
+                self.watermark = new_watermark
+                self.watermark_rows = merged_at_watermark
+            return changed_user_ids
+
+        except Exception as e:
+            logger.error(f"Error refreshing changed ratings: {e}")
+            return None
+
     def set_alpha(self, alpha: float) -> None:
         """
         Set alpha parameter for hybrid scoring
@@ -527,21 +1010,24 @@ class LocalDataProcessor:
         Returns:
             Dict with rating statistics
         """
-        if self.ratings_df is None or len(self.ratings_df) == 0:
+        if self.ratings_store is None or len(self.ratings_store) == 0:
             return {}
 
+        store = self.ratings_store
+        ratings = store.ratings.astype(np.float64)
         stats = {
-            "total_ratings": len(self.ratings_df),
-            "avg_rating": self.ratings_df["rating"].mean(),
-            "min_rating": self.ratings_df["rating"].min(),
-            "max_rating": self.ratings_df["rating"].max(),
-            "std_rating": self.ratings_df["rating"].std(),
-            "unique_users": self.ratings_df["user_id"].nunique(),
-            "unique_foods": self.ratings_df["food_id"].nunique(),
+            "total_ratings": len(store),
+            "avg_rating": ratings.mean(),
+            "min_rating": ratings.min(),
+            "max_rating": ratings.max(),
+            "std_rating": ratings.std(ddof=1),
+            "unique_users": store.n_users,
+            "unique_foods": store.n_items,
+            "memory_usage": store.memory_usage(),
         }
 
-        if "has_restaurant_rating" in self.ratings_df.columns:
-            restaurant_coverage = self.ratings_df["has_restaurant_rating"].mean() * 100
+        if store.has_restaurant_rating is not None:
+            restaurant_coverage = store.has_restaurant_rating.mean() * 100
             stats["restaurant_coverage_percent"] = restaurant_coverage
 
         return stats
@@ -5,14 +5,15 @@ Handles SVD training on sub-matrix and prediction of missing ratings
 
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Union
 from sklearn.decomposition import TruncatedSVD
-from sklearn.metrics import ndcg_score
 from sklearn.preprocessing import StandardScaler
 from scipy.sparse import csr_matrix
 import warnings
 from app.utils.logger import get_logger
 from .config import RecommendationConfig
+from .metrics import evaluate_predictions
+from .ratings_store import RatingMatrix
 
 logger = get_logger(__name__)
 
@@ -22,6 +23,11 @@ class LocalSVDModel:
     Local SVD model for collaborative filtering on user sub-datasets
     """
 
+    engine = "svd"
+
+    # Fraction of the user/item mean offsets kept in predictions
+    bias_shrinkage = 0.7
+
     def __init__(self, n_components: int = None, random_state: int = None):
         """
         Initialize SVD model
@@ -41,6 +47,7 @@ class LocalSVDModel:
         self.global_mean = 0.0
         self.user_means = None
         self.item_means = None
+        self.is_centered = True
 
         # Metadata
         self.n_users = 0
@@ -63,40 +70,35 @@ class LocalSVDModel:
             # Convert to numpy array
             matrix = pivot_matrix.values.astype(np.float32)
 
-            # Calculate means
-            self.global_mean = np.mean(matrix[matrix > 0])
-
-            # Calculate user means (excluding zeros)
-            user_means = []
-            for i in range(matrix.shape[0]):
-                user_ratings = matrix[i][matrix[i] > 0]
-                user_mean = (
-                    np.mean(user_ratings) if len(user_ratings) > 0 else self.global_mean
-                )
-                user_means.append(user_mean)
-            self.user_means = np.array(user_means)
-
-            # Calculate item means (excluding zeros)
-            item_means = []
-            for j in range(matrix.shape[1]):
-                item_ratings = matrix[:, j][matrix[:, j] > 0]
-                item_mean = (
-                    np.mean(item_ratings) if len(item_ratings) > 0 else self.global_mean
-                )
-                item_means.append(item_mean)
-            self.item_means = np.array(item_means)
-
-            # Center the matrix (subtract user and item biases)
-            centered_matrix = matrix.copy()
-            for i in range(matrix.shape[0]):
-                for j in range(matrix.shape[1]):
-                    if matrix[i, j] > 0:
-                        # Subtract global mean, user bias, and item bias
-                        user_bias = self.user_means[i] - self.global_mean
-                        item_bias = self.item_means[j] - self.global_mean
-                        centered_matrix[i, j] = (
-                            matrix[i, j] - self.global_mean - user_bias - item_bias
-                        )
+            # Observed ratings mask (zeros mean "not rated")
+            rated = matrix > 0
+            self.global_mean = np.mean(matrix[rated])
+
+            # Calculate user and item means over observed ratings only
+            masked = np.where(rated, matrix, 0.0)
+            user_counts = rated.sum(axis=1)
+            item_counts = rated.sum(axis=0)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self.user_means = np.where(
+                    user_counts > 0,
+                    masked.sum(axis=1, dtype=np.float64) / user_counts,
+                    self.global_mean,
+                ).astype(np.float32)
+                self.item_means = np.where(
+                    item_counts > 0,
+                    masked.sum(axis=0, dtype=np.float64) / item_counts,
+                    self.global_mean,
+                ).astype(np.float32)
+
+            # Center observed entries (subtract global mean, user bias and item bias)
+            user_bias = self.user_means - self.global_mean
+            item_bias = self.item_means - self.global_mean
+            centered_matrix = np.where(
+                rated,
+                matrix - self.global_mean - user_bias[:, None] - item_bias[None, :],
+                matrix,
+            ).astype(np.float32)
 
             return centered_matrix, matrix
 
@@ -104,12 +106,60 @@ class LocalSVDModel:
             logger.error(f"Error preparing matrix for SVD: {e}")
             return matrix, matrix
 
-    def fit(self, pivot_matrix: pd.DataFrame) -> bool:
+    def _prepare_sparse_matrix(
+        self, rating_matrix: RatingMatrix
+    ) -> Tuple[csr_matrix, csr_matrix]:
+        """
+        Sparse counterpart of _prepare_matrix: means over the stored ratings and
+        centering of the stored entries only, so no dense matrix is built
+
+        Args:
+            rating_matrix: Sparse user-item matrix
+
+        Returns:
+            Tuple[csr_matrix, csr_matrix]: (centered_matrix, original_matrix)
+        """
+        matrix = csr_matrix(rating_matrix.matrix, dtype=np.float32, copy=True)
+        matrix.data[matrix.data < 0] = 0.0
+        matrix.eliminate_zeros()
+
+        n_users, n_items = matrix.shape
+        rows = np.repeat(np.arange(n_users), np.diff(matrix.indptr))
+        cols = matrix.indices
+        values = matrix.data
+
+        self.global_mean = np.mean(values)
+
+        user_counts = np.diff(matrix.indptr)
+        item_counts = np.bincount(cols, minlength=n_items)
+        user_sums = np.bincount(rows, weights=values, minlength=n_users)
+        item_sums = np.bincount(cols, weights=values, minlength=n_items)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.user_means = np.where(
+                user_counts > 0, user_sums / user_counts, self.global_mean
+            ).astype(np.float32)
+            self.item_means = np.where(
+                item_counts > 0, item_sums / item_counts, self.global_mean
+            ).astype(np.float32)
+
+        # Center stored entries (subtract global mean, user bias and item bias)
+        user_bias = self.user_means - self.global_mean
+        item_bias = self.item_means - self.global_mean
+        centered_matrix = matrix.copy()
+        centered_matrix.data = (
+            values - self.global_mean - user_bias[rows] - item_bias[cols]
+        ).astype(np.float32)
+
+        return centered_matrix, matrix
+
+    def fit(self, pivot_matrix: Union[pd.DataFrame, RatingMatrix]) -> bool:
         """
         Train SVD model on pivot matrix with CSR optimization for sparse data
 
         Args:
-            pivot_matrix: User-item pivot matrix
+            pivot_matrix: User-item pivot matrix, or a RatingMatrix (trained
+                without densifying)
 
         Returns:
             bool: True if training successful
@@ -119,11 +169,15 @@ class LocalSVDModel:
                 logger.error("Empty pivot matrix provided for SVD training")
                 return False
 
+            is_sparse_input = isinstance(pivot_matrix, RatingMatrix)
             self.n_users, self.n_items = pivot_matrix.shape
 
             # Calculate sparsity
             total_possible = self.n_users * self.n_items
-            actual_ratings = (pivot_matrix.values > 0).sum()
+            if is_sparse_input:
+                actual_ratings = np.count_nonzero(pivot_matrix.matrix.data > 0)
+            else:
+                actual_ratings = (pivot_matrix.values > 0).sum()
             self.sparsity = 1 - (actual_ratings / total_possible)
 
             logger.info(
@@ -131,11 +185,15 @@ class LocalSVDModel:
                 f"sparsity: {self.sparsity:.3f}"
             )
 
-            # Store rating matrix untuk smart re-ranking
-            self.rating_matrix = pivot_matrix.values.astype(np.float32)
-
-            # Prepare matrix
-            centered_matrix, original_matrix = self._prepare_matrix(pivot_matrix)
+            # Prepare matrix; store rating matrix untuk smart re-ranking
+            if is_sparse_input:
+                centered_matrix, original_matrix = self._prepare_sparse_matrix(
+                    pivot_matrix
+                )
+                self.rating_matrix = original_matrix
+            else:
+                self.rating_matrix = pivot_matrix.values.astype(np.float32)
+                centered_matrix, original_matrix = self._prepare_matrix(pivot_matrix)
 
             # Auto-adjust n_components berdasarkan sparsity untuk akurasi lebih baik
             max_components = min(self.n_components, min(self.n_users, self.n_items) - 1)
@@ -162,20 +220,30 @@ class LocalSVDModel:
                 )
                 # For very sparse matrices, use original ratings without centering
                 training_matrix = original_matrix
+                self.is_centered = False
             else:
                 training_matrix = centered_matrix
+                self.is_centered = True
 
             # Fit SVD model
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore")
 
                 # Replace NaN and inf values
-                training_matrix = np.nan_to_num(
-                    training_matrix, nan=0.0, posinf=0.0, neginf=0.0
-                )
+                if is_sparse_input:
+                    training_matrix = training_matrix.copy()
+                    training_matrix.data = np.nan_to_num(
+                        training_matrix.data, nan=0.0, posinf=0.0, neginf=0.0
+                    )
+                else:
+                    training_matrix = np.nan_to_num(
+                        training_matrix, nan=0.0, posinf=0.0, neginf=0.0
+                    )
 
                 # OPTIMIZATION: Use CSR sparse matrix for very sparse data
-                if self.sparsity > 0.8:
+                if is_sparse_input:
+                    user_factors = self.svd_model.fit_transform(training_matrix)
+                elif self.sparsity > 0.8:
                     logger.info("Using CSR sparse matrix for efficiency")
                     sparse_matrix = csr_matrix(training_matrix)
                     user_factors = self.svd_model.fit_transform(sparse_matrix)
@@ -245,9 +313,8 @@ class LocalSVDModel:
 
             # PERBAIKAN: Dampen extreme biases to prevent clipping issues
             # Apply shrinkage: reduce bias magnitude by 30% for better generalization
-            bias_shrinkage = 0.7
-            user_bias *= bias_shrinkage
-            item_bias *= bias_shrinkage
+            user_bias *= self.bias_shrinkage
+            item_bias *= self.bias_shrinkage
 
             # Build prediction: global_mean + biases + interaction
             prediction = self.global_mean + user_bias + item_bias + interaction
@@ -270,6 +337,192 @@ class LocalSVDModel:
             logger.error(f"Error predicting user-item rating: {e}")
             return self.global_mean
 
+    def fold_in_user(self, user_ratings: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Project a rating vector onto the trained item factors (SVD fold-in)
+
+        Args:
+            user_ratings: Rating vector aligned with the item index (0 = not rated)
+
+        Returns:
+            Tuple[np.ndarray, float]: (user_factor_vector, user_mean)
+        """
+        user_vectors, user_means = self.fold_in_users(np.asarray(user_ratings)[None, :])
+        return user_vectors[0], float(user_means[0])
+
+    def fold_in_users(self, rating_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Project a block of rating vectors onto the trained item factors
+
+        Args:
+            rating_matrix: Ratings with shape (n_users, n_items), 0 = not rated
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (user_factor_vectors, user_means)
+        """
+        rated = rating_matrix > 0
+        rating_counts = rated.sum(axis=1)
+        rating_sums = np.where(rated, rating_matrix, 0).sum(axis=1, dtype=np.float64)
+        user_means = np.where(
+            rating_counts > 0,
+            rating_sums / np.maximum(rating_counts, 1),
+            float(self.global_mean),
+        )
+
+        # Center the same way the training matrix was centered
+        if self.is_centered:
+            user_vectors = np.where(
+                rated,
+                rating_matrix
+                - user_means[:, None].astype(rating_matrix.dtype)
+                - self.item_means
+                + self.global_mean,
+                0.0,
+            )
+        else:
+            user_vectors = rating_matrix
+
+        return user_vectors @ self.item_factors, user_means
+
+    def predict_from_factors(
+        self,
+        user_vector: np.ndarray,
+        user_mean: Union[float, np.ndarray],
+        item_indices: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Predict ratings for all items from (folded-in) user factor vectors
+
+        Args:
+            user_vector: User latent factor vector, or a block of vectors with
+                shape (n_users, n_factors)
+            user_mean: Mean rating of the user, or one mean per user of the block
+            item_indices: Only score these items (default: all items)
+
+        Returns:
+            np.ndarray: Predicted rating per item index (per user for a block),
+                clipped to 1-5; aligned with item_indices when given
+        """
+        user_vector = np.asarray(user_vector)
+        if user_vector.ndim == 2:
+            return self._predict_matrix(
+                user_vector, np.asarray(user_mean), item_indices
+            )
+
+        return self._predict_matrix(
+            user_vector[None, :], np.array([user_mean]), item_indices
+        )[0]
+
+    def item_scoring_vectors(self) -> np.ndarray:
+        """
+        Get item vectors whose inner product with [user_vector, 1] ranks items
+        like the predictions (everything but the user-constant terms)
+
+        Returns:
+            np.ndarray: Array with shape (n_items, n_factors + 1)
+        """
+        item_bias = (self.item_means - self.global_mean) * self.bias_shrinkage
+        return np.hstack([self.item_factors, item_bias[:, None]]).astype(np.float32)
+
+    def predict_users(self, user_indices: np.ndarray) -> np.ndarray:
+        """
+        Predict ratings for all items for a block of users
+
+        Args:
+            user_indices: Array of user indices
+
+        Returns:
+            np.ndarray: Predictions with shape (len(user_indices), n_items)
+        """
+        user_indices = np.asarray(user_indices, dtype=np.int64)
+        return self._predict_matrix(
+            self.user_factors[user_indices], self.user_means[user_indices]
+        )
+
+    def _predict_matrix(
+        self,
+        user_vectors: np.ndarray,
+        user_means: np.ndarray,
+        item_indices: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Score every item for a block of users as one matrix product plus bias vectors
+        (same formula as predict_user_item with common_items=0)
+
+        Args:
+            user_vectors: User latent factors with shape (n_users, n_factors)
+            user_means: Mean rating per user
+            item_indices: Only score these items (default: all items)
+
+        Returns:
+            np.ndarray: Predictions with shape (n_users, n_items), clipped to 1-5
+        """
+        item_factors = self.item_factors
+        item_means = self.item_means
+        if item_indices is not None:
+            item_factors = item_factors[item_indices]
+            item_means = item_means[item_indices]
+
+        # Dampen extreme biases exactly like predict_user_item
+        user_bias = (user_means - self.global_mean).astype(
+            np.float64
+        ) * self.bias_shrinkage
+        item_bias = (item_means - self.global_mean).astype(
+            np.float64
+        ) * self.bias_shrinkage
+
+        # Interaction term for every (user, item) pair in one matrix product
+        interaction = (user_vectors @ item_factors.T).astype(np.float64)
+
+        predictions = self.global_mean + user_bias[:, None] + item_bias[None, :]
+        predictions += interaction
+        return np.clip(predictions, 1.0, 5.0)
+
+    @staticmethod
+    def select_top_n(
+        predictions: np.ndarray,
+        top_n: Optional[int] = None,
+        exclude_items: Optional[List[int]] = None,
+        min_rating: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Select the best items from a prediction vector
+
+        Excluded items are masked with a boolean array. np.partition finds the
+        N-th best score, and only the candidates scoring at least that much
+        (the top N plus any ties with the N-th) are stably sorted, so ties keep
+        item order like a stable sort of all predictions.
+
+        Args:
+            predictions: Predicted rating per item index
+            top_n: Number of items to return (None = all candidates)
+            exclude_items: Item indices to exclude
+            min_rating: Minimum predicted rating threshold
+
+        Returns:
+            List[Tuple[int, float]]: (item_idx, predicted_rating) sorted descending
+        """
+        candidate_mask = np.ones(len(predictions), dtype=bool)
+        if exclude_items is not None and len(exclude_items) > 0:
+            candidate_mask[np.asarray(exclude_items, dtype=np.int64)] = False
+        if min_rating is not None:
+            candidate_mask &= predictions >= min_rating
+
+        candidates = np.flatnonzero(candidate_mask)
+        scores = predictions[candidates]
+
+        if top_n is not None and top_n < len(candidates):
+            if top_n <= 0:
+                return []
+            # Keep every candidate tied with the N-th best so ordering stays stable
+            kth_score = -np.partition(-scores, top_n - 1)[top_n - 1]
+            keep = scores >= kth_score
+            candidates = candidates[keep]
+            scores = scores[keep]
+
+        order = np.argsort(-scores, kind="stable")[:top_n]
+        return [(int(candidates[i]), float(scores[i])) for i in order]
+
     def predict_for_user(
         self, user_idx: int, exclude_items: List[int] = None
     ) -> List[Tuple[int, float]]:
@@ -288,23 +541,13 @@ class LocalSVDModel:
                 logger.error("SVD model not fitted")
                 return []
 
-            exclude_items = exclude_items or []
-            predictions = []
-
-            for item_idx in range(self.n_items):
-                if item_idx in exclude_items:
-                    continue
-
-                # PERBAIKAN: Asumsi common_items=0 jika tidak diketahui; bisa pass dari external jika ada
-                predicted_rating = self.predict_user_item(
-                    user_idx, item_idx, common_items=0
-                )
-                predictions.append((item_idx, predicted_rating))
-
-            # Sort by predicted rating (descending)
-            predictions.sort(key=lambda x: x[1], reverse=True)
+            if user_idx >= self.n_users:
+                logger.warning(f"Index out of bounds: user {user_idx}")
+                predictions = np.full(self.n_items, self.global_mean)
+            else:
+                predictions = self.predict_users([user_idx])[0]
 
-            return predictions
+            return self.select_top_n(predictions, exclude_items=exclude_items)
 
         except Exception as e:
             logger.error(f"Error predicting for user: {e}")
@@ -330,39 +573,54 @@ class LocalSVDModel:
             List[Tuple[int, float]]: List of (item_idx, predicted_rating) tuples sorted by rating descending
         """
         try:
-            # Get all predictions for user (already sorted by rating descending)
-            predictions = self.predict_for_user(user_idx, exclude_items)
+            if not self.is_fitted:
+                logger.error("SVD model not fitted")
+                return []
 
-            # Filter by minimum rating
-            filtered_predictions = [
-                (item_idx, rating)
-                for item_idx, rating in predictions
-                if rating >= min_rating
-            ]
+            if user_idx >= self.n_users:
+                logger.warning(f"Index out of bounds: user {user_idx}")
+                predictions = np.full(self.n_items, self.global_mean)
+            else:
+                predictions = self.predict_users([user_idx])[0]
+
+            # Mask excluded items, filter by minimum rating and take top N
+            recommendations = self.select_top_n(
+                predictions,
+                top_n=top_n,
+                exclude_items=exclude_items,
+                min_rating=min_rating,
+            )
 
-            if not filtered_predictions:
+            if not recommendations:
                 logger.warning(
                     f"No predictions above min_rating={min_rating} for user {user_idx}"
                 )
                 return []
 
             logger.info(
-                f"Filtered predictions (min_rating={min_rating}): {len(filtered_predictions)} items"
+                f"Selected top {len(recommendations)} predictions (min_rating={min_rating})"
             )
 
-            # Return top N recommendations (already sorted by predicted rating)
-            return filtered_predictions[:top_n]
+            return recommendations
 
         except Exception as e:
             logger.error(f"Error getting top recommendations: {e}")
             return []
 
-    def evaluate_model(self, test_matrix: pd.DataFrame) -> Dict[str, float]:
+    def evaluate_model(
+        self,
+        test_matrix: Union[pd.DataFrame, RatingMatrix],
+        train_matrix: Optional[Union[pd.DataFrame, RatingMatrix]] = None,
+        k: int = None,
+    ) -> Dict[str, float]:
         """
         Evaluate model performance on test data with NDCG
 
         Args:
-            test_matrix: Test user-item matrix
+            test_matrix: Test user-item matrix aligned with the training matrix
+            train_matrix: Training user-item matrix; its ratings are left out of
+                the top-k lists for precision/recall/MAP
+            k: Rank cutoff (default from config)
 
         Returns:
             Dict[str, float]: Evaluation metrics including NDCG
@@ -372,71 +630,37 @@ class LocalSVDModel:
                 logger.error("SVD model not fitted")
                 return {}
 
-            predictions = []
-            actuals = []
-
-            # For NDCG calculation - per user
-            all_ndcg_scores = []
-
-            # Get predictions for test data
-            for i in range(min(test_matrix.shape[0], self.n_users)):
-                user_predictions = []
-                user_actuals = []
-
-                for j in range(min(test_matrix.shape[1], self.n_items)):
-                    actual_rating = test_matrix.iloc[i, j]
-                    if actual_rating > 0:  # Only evaluate on known ratings
-                        predicted_rating = self.predict_user_item(i, j)
-                        predictions.append(predicted_rating)
-                        actuals.append(actual_rating)
-                        user_predictions.append(predicted_rating)
-                        user_actuals.append(actual_rating)
-
-                # Calculate NDCG for this user if they have ratings
-                if len(user_predictions) > 1:
-                    try:
-                        # NDCG requires 2D arrays
-                        ndcg = ndcg_score(
-                            [user_actuals],
-                            [user_predictions],
-                            k=min(10, len(user_predictions)),
-                        )
-                        all_ndcg_scores.append(ndcg)
-                    except Exception as e:
-                        logger.debug(f"Could not calculate NDCG for user {i}: {e}")
-
-            if len(predictions) == 0:
+            def _to_csr(matrix):
+                if isinstance(matrix, RatingMatrix):
+                    matrix = matrix.matrix
+                elif isinstance(matrix, pd.DataFrame):
+                    matrix = matrix.values
+                return csr_matrix(matrix, dtype=np.float32)[
+                    : self.n_users, : self.n_items
+                ]
+
+            test_csr = _to_csr(test_matrix)
+            test_csr.data[test_csr.data < 0] = 0.0  # Only evaluate on known ratings
+            test_csr.eliminate_zeros()
+            if test_csr.nnz == 0:
                 logger.warning("No test predictions to evaluate")
                 return {}
 
-            # Calculate metrics
-            predictions = np.array(predictions)
-            actuals = np.array(actuals)
-
-            mae = np.mean(np.abs(predictions - actuals))
-            mse = np.mean((predictions - actuals) ** 2)
-            rmse = np.sqrt(mse)
-
-            # Average NDCG across users
-            avg_ndcg = np.mean(all_ndcg_scores) if all_ndcg_scores else 0.0
-
-            # Coverage berdasarkan actual recommended items / total
-            n_recommendable = len([p for p in predictions if p >= 3.0])
-            coverage = n_recommendable / self.n_items if self.n_items > 0 else 0.0
-
-            metrics = {
-                "mae": float(mae),
-                "mse": float(mse),
-                "rmse": float(rmse),
-                "ndcg": float(avg_ndcg),
-                "coverage": float(coverage),
-                "n_predictions": len(predictions),
-                "n_users_evaluated": len(all_ndcg_scores),
-            }
+            n_users, n_items = test_csr.shape
+            metrics = evaluate_predictions(
+                test_csr,
+                lambda user_indices: self.predict_users(user_indices)[:, :n_items],
+                train_matrix=(
+                    _to_csr(train_matrix) if train_matrix is not None else None
+                ),
+                k=k,
+            )
 
             logger.info(
-                f"Model evaluation: MAE={mae:.3f}, RMSE={rmse:.3f}, "
-                f"NDCG@10={avg_ndcg:.3f}, Coverage={coverage:.3f}"
+                f"Model evaluation: MAE={metrics['mae']:.3f}, "
+                f"RMSE={metrics['rmse']:.3f}, NDCG@{k or RecommendationConfig.EVALUATION_K}="
+                f"{metrics['ndcg']:.3f}, MAP={metrics['map']:.3f}, "
+                f"Coverage={metrics['coverage']:.3f}"
             )
             return metrics
 
@@ -457,6 +681,7 @@ class LocalSVDModel:
 
             info = {
                 "fitted": True,
+                "engine": self.engine,
                 "n_components": self.svd_model.n_components,
                 "n_factors": self.svd_model.n_components,  # Alias for consistency
                 "n_users": self.n_users,
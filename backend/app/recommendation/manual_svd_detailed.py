@@ -18,6 +18,7 @@ import os
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+from scipy.sparse import csr_matrix
 from scipy.sparse.linalg import svds
 from rich.console import Console
 from rich.table import Table
@@ -30,6 +31,7 @@ from app.modules.user.models import User
 from app.modules.food.models import Food
 from app.modules.rating.models import FoodRating
 from app.extensions import db
+from app.recommendation.metrics import rating_errors, ndcg_at_k
 
 # Rich Console
 console = Console()
@@ -718,27 +720,18 @@ def calculate_evaluation_metrics(
 
     console.rule("[bold cyan]📊 STEP 5: MODEL EVALUATION METRICS", style="cyan")
 
-    # Get all actual ratings from the original matrix
-    actual_ratings = []
-    predicted_ratings = []
-
     console.print("\n[cyan]Calculating error metrics on known ratings...[/cyan]")
 
-    for user_idx, user_id in enumerate(all_user_ids):
-        user_full_vector = user_vectors[user_id]["vector"]
-
-        for food_idx_in_matrix, food_idx_global in enumerate(rated_food_ids):
-            actual = user_full_vector[food_idx_global]
+    # Known ratings of the matrix (row by row) and their clipped predictions
+    truth = csr_matrix(original_matrix)
+    truth.eliminate_zeros()
+    predictions = np.clip(reconstructed, 1.0, 5.0)
+    error_metrics = rating_errors(truth, predictions)
 
-            if actual > 0:  # Only evaluate on known ratings
-                predicted = reconstructed[user_idx, food_idx_in_matrix]
-                predicted = max(1.0, min(5.0, predicted))  # Clip to [1, 5]
-
-                actual_ratings.append(actual)
-                predicted_ratings.append(predicted)
-
-    actual_ratings = np.array(actual_ratings)
-    predicted_ratings = np.array(predicted_ratings)
+    actual_ratings = truth.data
+    predicted_ratings = predictions[
+        np.repeat(np.arange(truth.shape[0]), np.diff(truth.indptr)), truth.indices
+    ]
 
     console.print(
         f"[green]✓[/green] Evaluating on {len(actual_ratings)} known ratings\n"
@@ -787,7 +780,7 @@ def calculate_evaluation_metrics(
     )
 
     errors = np.abs(actual_ratings - predicted_ratings)
-    mae = np.mean(errors)
+    mae = error_metrics["mae"]
 
     console.print(f"  Step 1: Calculate absolute errors")
     console.print(f"          |yᵢ - ŷᵢ| for each rating")
@@ -807,8 +800,8 @@ def calculate_evaluation_metrics(
     )
 
     squared_errors = (actual_ratings - predicted_ratings) ** 2
-    mse = np.mean(squared_errors)
-    rmse = np.sqrt(mse)
+    mse = error_metrics["mse"]
+    rmse = error_metrics["rmse"]
 
     console.print(f"  Step 1: Calculate squared errors")
     console.print(f"          (yᵢ - ŷᵢ)² for each rating")
@@ -981,7 +974,17 @@ def calculate_evaluation_metrics(
         console.print(f"  Step 3: Calculate NDCG")
         console.print(f"          NDCG = DCG / IDCG")
         console.print(f"          NDCG = {dcg:.4f} / {idcg:.4f}")
-        ndcg = dcg / idcg if idcg > 0 else 0.0
+        # Same value from the shared metrics (ties keep item order, as above)
+        ndcg = float(
+            ndcg_at_k(
+                truth[target_idx],
+                predictions[target_idx : target_idx + 1],
+                k=None,
+                exponential_gain=True,
+                ignore_ties=True,
+                min_items=1,
+            )[0]
+        )
         console.print(f"          [bold green]NDCG = {ndcg:.4f}[/bold green]\n")
     else:
         ndcg = 0.0
@@ -0,0 +1,366 @@
+"""
+Evaluation Metrics Module
+Rating and ranking metrics (RMSE, MAE, NDCG@k, precision/recall@k, MAP,
+catalog coverage) computed for all users at once from sparse truth matrices
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from typing import Callable, Dict, Optional, Tuple, Union
+from .config import RecommendationConfig
+
+
+def _row_ids(matrix: csr_matrix) -> np.ndarray:
+    """Row index of every stored entry of a CSR matrix"""
+    return np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+
+
+def _at_ratings(truth: csr_matrix, predictions: np.ndarray) -> np.ndarray:
+    """
+    Get the predictions of the stored truth entries
+
+    Args:
+        truth: Sparse true ratings
+        predictions: Dense predictions shaped like truth, or one prediction per
+            stored truth rating (in CSR order)
+
+    Returns:
+        np.ndarray: One prediction per stored truth rating
+    """
+    predictions = np.asarray(predictions)
+    if predictions.ndim == 2:
+        return predictions[_row_ids(truth), truth.indices]
+    return predictions
+
+
+def holdout_split(
+    rating_matrix: csr_matrix,
+    test_ratio: float = 0.2,
+    min_ratings: int = 2,
+    random_state: Optional[int] = None,
+) -> Tuple[csr_matrix, csr_matrix]:
+    """
+    Hold out a random share of every user's ratings
+
+    Users with fewer than min_ratings ratings keep all of them in training;
+    every other user has at least one rating held out.
+
+    Args:
+        rating_matrix: Sparse ratings (0 = not rated)
+        test_ratio: Share of each user's ratings moved to the test matrix
+        min_ratings: Minimum ratings a user needs to be tested
+        random_state: Random state for reproducibility
+
+    Returns:
+        Tuple[csr_matrix, csr_matrix]: (train_matrix, test_matrix) with the
+            shape of rating_matrix
+    """
+    matrix = csr_matrix(rating_matrix)
+    matrix.eliminate_zeros()
+    matrix.sort_indices()
+
+    rows = _row_ids(matrix)
+    counts = np.diff(matrix.indptr)
+    n_test = np.where(
+        counts >= min_ratings, np.maximum(1, (counts * test_ratio).astype(int)), 0
+    )
+
+    # Random position of every rating within its row
+    rng = np.random.default_rng(random_state)
+    order = np.lexsort((rng.random(matrix.nnz), rows))
+    positions = np.empty(matrix.nnz, dtype=np.int64)
+    positions[order] = np.arange(matrix.nnz) - matrix.indptr[rows[order]]
+    is_test = positions < n_test[rows]
+
+    def _subset(mask: np.ndarray) -> csr_matrix:
+        return csr_matrix(
+            (matrix.data[mask], (rows[mask], matrix.indices[mask])), shape=matrix.shape
+        )
+
+    return _subset(~is_test), _subset(is_test)
+
+
+def rating_errors(
+    truth: csr_matrix, predictions: np.ndarray
+) -> Dict[str, Union[float, int]]:
+    """
+    Get MAE, MSE and RMSE over the stored truth ratings
+
+    Args:
+        truth: Sparse true ratings
+        predictions: Dense predictions shaped like truth, or one prediction per
+            stored truth rating
+
+    Returns:
+        Dict[str, Union[float, int]]: mae, mse, rmse and n_predictions
+    """
+    errors = _at_ratings(truth, predictions).astype(np.float64) - truth.data
+    if len(errors) == 0:
+        return {"mae": 0.0, "mse": 0.0, "rmse": 0.0, "n_predictions": 0}
+
+    mse = float(np.mean(errors**2))
+    return {
+        "mae": float(np.mean(np.abs(errors))),
+        "mse": mse,
+        "rmse": float(np.sqrt(mse)),
+        "n_predictions": len(errors),
+    }
+
+
+def ndcg_at_k(
+    truth: csr_matrix,
+    predictions: np.ndarray,
+    k: Optional[int] = 10,
+    exponential_gain: bool = False,
+    ignore_ties: bool = False,
+    min_items: int = 2,
+) -> np.ndarray:
+    """
+    Get the NDCG@k of every user's rated items ranked by prediction
+
+    Same definition as sklearn.metrics.ndcg_score applied per user: tied
+    predictions share their average gain unless ignore_ties is set, in which
+    case ties keep item order.
+
+    Args:
+        truth: Sparse true ratings (the relevance of each item)
+        predictions: Dense predictions shaped like truth, or one prediction per
+            stored truth rating
+        k: Rank cutoff (None = all rated items)
+        exponential_gain: Use 2^rating - 1 as gain instead of the rating
+        ignore_ties: Rank tied predictions in item order
+        min_items: Minimum rated items a user needs to be scored
+
+    Returns:
+        np.ndarray: NDCG per user, NaN for users with fewer than min_items
+    """
+    n_users = truth.shape[0]
+    rows = _row_ids(truth)
+    predicted = _at_ratings(truth, predictions)
+    gains = truth.data.astype(np.float64)
+    if exponential_gain:
+        gains = np.exp2(gains) - 1.0
+
+    def _discounted(order: np.ndarray, sorted_gains: np.ndarray) -> np.ndarray:
+        positions = np.arange(len(order)) - truth.indptr[rows[order]]
+        discounts = 1.0 / np.log2(positions + 2.0)
+        if k is not None:
+            discounts[positions >= k] = 0.0
+        return np.bincount(
+            rows[order], weights=sorted_gains * discounts, minlength=n_users
+        )
+
+    # DCG: items sorted by prediction, tied predictions share their mean gain
+    order = np.lexsort((-predicted, rows))
+    sorted_gains = gains[order]
+    if not ignore_ties and len(order) > 0:
+        sorted_rows = rows[order]
+        sorted_predicted = predicted[order]
+        new_group = np.ones(len(order), dtype=bool)
+        new_group[1:] = (sorted_rows[1:] != sorted_rows[:-1]) | (
+            sorted_predicted[1:] != sorted_predicted[:-1]
+        )
+        groups = np.cumsum(new_group) - 1
+        sorted_gains = (
+            np.bincount(groups, weights=sorted_gains) / np.bincount(groups)
+        )[groups]
+    dcg = _discounted(order, sorted_gains)
+
+    # IDCG: items sorted by true rating
+    ideal_order = np.lexsort((-gains, rows))
+    idcg = _discounted(ideal_order, gains[ideal_order])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ndcg = np.where(idcg > 0, dcg / idcg, 0.0)
+    ndcg[np.diff(truth.indptr) < min_items] = np.nan
+    return ndcg
+
+
+def top_k_items(
+    scores: np.ndarray, k: int, exclude: Optional[csr_matrix] = None
+) -> np.ndarray:
+    """
+    Get the k best scored items of every user
+
+    Args:
+        scores: Dense scores with shape (n_users, n_items)
+        k: Number of items per user
+        exclude: Sparse matrix shaped like scores whose stored entries are
+            never returned (typically the training ratings)
+
+    Returns:
+        np.ndarray: Item indices with shape (n_users, k), best first; -1 pads
+            users with fewer than k candidates
+    """
+    scores = np.array(scores, dtype=np.float64)
+    n_users, n_items = scores.shape
+    if exclude is not None and exclude.nnz > 0:
+        scores[_row_ids(exclude), exclude.indices] = -np.inf
+
+    k = min(k, n_items)
+    if k <= 0:
+        return np.empty((n_users, 0), dtype=np.int64)
+    if k < n_items:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(n_items), scores.shape).copy()
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    return np.where(np.isneginf(top_scores), -1, top)
+
+
+def retrieval_at_k(
+    relevant: csr_matrix, top_items: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Get precision@k, recall@k and average precision@k of every user
+
+    Args:
+        relevant: Sparse matrix whose stored entries are the relevant items
+        top_items: Recommended item indices with shape (n_users, k), best
+            first, -1 for empty slots
+
+    Returns:
+        Dict[str, np.ndarray]: precision, recall and average_precision per
+            user, NaN for users without relevant items
+    """
+    n_users, k = top_items.shape
+    n_items = relevant.shape[1]
+    n_relevant = np.diff(relevant.indptr)
+
+    # Membership test of (user, item) keys against the relevant entries
+    relevant_keys = _row_ids(relevant) * n_items + relevant.indices
+    top_keys = np.arange(n_users)[:, None] * n_items + top_items
+    hits = np.isin(top_keys, relevant_keys) & (top_items >= 0)
+
+    hit_counts = hits.sum(axis=1)
+    cumulative_precision = np.cumsum(hits, axis=1) / np.arange(1, k + 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = hit_counts / k if k > 0 else np.zeros(n_users)
+        recall = hit_counts / n_relevant
+        average_precision = (cumulative_precision * hits).sum(axis=1) / np.minimum(
+            n_relevant, k
+        )
+
+    no_relevant = n_relevant == 0
+    for values in (precision, recall, average_precision):
+        values[no_relevant] = np.nan
+    return {
+        "precision": precision,
+        "recall": recall,
+        "average_precision": average_precision,
+    }
+
+
+def catalog_coverage(top_items: np.ndarray, n_items: int) -> float:
+    """
+    Get the share of the catalog recommended to at least one user
+
+    Args:
+        top_items: Recommended item indices, -1 for empty slots
+        n_items: Catalog size
+
+    Returns:
+        float: Coverage between 0 and 1
+    """
+    if n_items == 0:
+        return 0.0
+    recommended = top_items[top_items >= 0]
+    return float(len(np.unique(recommended)) / n_items)
+
+
+def _nanmean(values: np.ndarray) -> float:
+    """Mean over the non-NaN values, 0.0 if there are none"""
+    values = values[~np.isnan(values)]
+    return float(values.mean()) if len(values) > 0 else 0.0
+
+
+def evaluate_predictions(
+    test_matrix: csr_matrix,
+    scores: Union[np.ndarray, Callable[[np.ndarray], np.ndarray]],
+    train_matrix: Optional[csr_matrix] = None,
+    k: int = None,
+    relevance_threshold: float = None,
+    block_size: int = None,
+) -> Dict[str, Union[float, int]]:
+    """
+    Evaluate predictions against held-out ratings
+
+    Users with test ratings are scored in blocks, so the dense prediction
+    matrix never has to exist at once; every metric is then computed for all
+    users in one pass.
+
+    Args:
+        test_matrix: Sparse held-out ratings
+        scores: Dense predictions shaped like test_matrix, or a function
+            returning the prediction rows of some user indices
+        train_matrix: Sparse training ratings, excluded from the top-k lists
+        k: Rank cutoff (default from config)
+        relevance_threshold: Minimum held-out rating of a relevant item for
+            precision/recall/MAP (default from config)
+        block_size: Users scored per block (default from config)
+
+    Returns:
+        Dict[str, Union[float, int]]: mae, mse, rmse, ndcg, precision, recall,
+            map, coverage, n_predictions and n_users_evaluated
+    """
+    k = k or RecommendationConfig.EVALUATION_K
+    if relevance_threshold is None:
+        relevance_threshold = RecommendationConfig.EVALUATION_RELEVANCE_THRESHOLD
+    block_size = block_size or RecommendationConfig.BATCH_BLOCK_SIZE
+
+    test_matrix = csr_matrix(test_matrix, dtype=np.float64)
+    test_matrix.eliminate_zeros()
+    test_matrix.sort_indices()
+    if train_matrix is not None:
+        train_matrix = csr_matrix(train_matrix)
+
+    if isinstance(scores, np.ndarray):
+        dense_scores = scores
+        scores = lambda user_indices: dense_scores[user_indices]
+
+    # Only users with held-out ratings are scored
+    test_users = np.flatnonzero(np.diff(test_matrix.indptr))
+    predicted = np.empty(test_matrix.nnz, dtype=np.float64)
+    top_items = np.full((test_matrix.shape[0], k), -1, dtype=np.int64)
+
+    for start in range(0, len(test_users), block_size):
+        block_users = test_users[start : start + block_size]
+        block_scores = np.asarray(scores(block_users))
+
+        block_truth = test_matrix[block_users]
+        first = test_matrix.indptr[block_users[0]]
+        last = test_matrix.indptr[block_users[-1] + 1]
+        predicted[first:last] = _at_ratings(block_truth, block_scores)
+
+        block_top = top_k_items(
+            block_scores,
+            k,
+            exclude=train_matrix[block_users] if train_matrix is not None else None,
+        )
+        top_items[block_users, : block_top.shape[1]] = block_top
+
+    relevant = test_matrix.copy()
+    relevant.data = (relevant.data >= relevance_threshold).astype(np.int8)
+    relevant.eliminate_zeros()
+
+    ndcg = ndcg_at_k(test_matrix, predicted, k=k)
+    retrieval = retrieval_at_k(relevant[test_users], top_items[test_users])
+
+    metrics = rating_errors(test_matrix, predicted)
+    metrics.update(
+        {
+            "ndcg": _nanmean(ndcg),
+            "precision": _nanmean(retrieval["precision"]),
+            "recall": _nanmean(retrieval["recall"]),
+            "map": _nanmean(retrieval["average_precision"]),
+            "coverage": catalog_coverage(
+                top_items[test_users], test_matrix.shape[1]
+            ),
+            "n_users_evaluated": int(np.sum(~np.isnan(ndcg))),
+        }
+    )
+    return metrics
@@ -0,0 +1,497 @@
+"""
+Biased Matrix Factorization Model Module
+Alternative engine behind the LocalSVDModel interface: global mean, user/item
+biases and latent factors fitted on the observed ratings only (ALS or SGD)
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple, Union
+from scipy.sparse import csr_matrix
+from app.utils.logger import get_logger
+from .config import RecommendationConfig
+from .local_model import LocalSVDModel
+from .ratings_store import RatingMatrix
+
+logger = get_logger(__name__)
+
+
+class BiasedMFModel(LocalSVDModel):
+    """
+    Biased matrix factorization: r_ui = mu + b_u + b_i + p_u . q_i
+
+    Unlike TruncatedSVD on the zero-filled matrix, missing entries are not
+    treated as ratings. user_means/item_means hold mu + b_u and mu + b_i, so
+    fold-in, batch scoring and get_top_recommendations work as for SVD.
+    """
+
+    engine = "mf"
+    bias_shrinkage = 1.0
+
+    def __init__(
+        self,
+        n_components: int = None,
+        random_state: int = None,
+        algorithm: str = None,
+        n_epochs: int = None,
+    ):
+        """
+        Initialize MF model
+
+        Args:
+            n_components: Number of latent factors (default from config)
+            random_state: Random state for reproducibility (default from config)
+            algorithm: "als" or "sgd" (default from config)
+            n_epochs: Maximum number of epochs (default from config, per algorithm)
+        """
+        super().__init__(n_components=n_components, random_state=random_state)
+        self.algorithm = algorithm or RecommendationConfig.MF_ALGORITHM
+        self.regularization = RecommendationConfig.MF_REGULARIZATION
+        self.learning_rate = RecommendationConfig.MF_LEARNING_RATE
+        self.sgd_regularization = RecommendationConfig.MF_SGD_REGULARIZATION
+
+        if self.algorithm == "sgd":
+            self.n_epochs = n_epochs or RecommendationConfig.MF_SGD_N_EPOCHS
+            self.min_epochs = RecommendationConfig.MF_SGD_MIN_EPOCHS
+            self.patience = RecommendationConfig.MF_SGD_EARLY_STOPPING_PATIENCE
+        else:
+            self.n_epochs = n_epochs or RecommendationConfig.SVD_N_EPOCHS
+            self.min_epochs = 1
+            self.patience = RecommendationConfig.MF_EARLY_STOPPING_PATIENCE
+
+        self.n_factors = 0
+        self.epochs_trained = 0
+        self.validation_rmse = None
+
+    @staticmethod
+    def _observed_ratings(
+        pivot_matrix: Union[pd.DataFrame, RatingMatrix],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the observed (rating > 0) entries of a pivot matrix
+
+        Args:
+            pivot_matrix: User-item pivot matrix or RatingMatrix
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: (user_idx, item_idx, rating)
+        """
+        if isinstance(pivot_matrix, RatingMatrix):
+            coo = pivot_matrix.matrix.tocoo()
+            observed = coo.data > 0
+            return (
+                coo.row[observed].astype(np.int64),
+                coo.col[observed].astype(np.int64),
+                coo.data[observed].astype(np.float64),
+            )
+
+        values = pivot_matrix.values.astype(np.float64)
+        rows, cols = np.nonzero(values > 0)
+        return rows, cols, values[rows, cols]
+
+    def fit(self, pivot_matrix: Union[pd.DataFrame, RatingMatrix]) -> bool:
+        """
+        Train the MF model with early stopping on a held-out fraction of ratings
+
+        Args:
+            pivot_matrix: User-item pivot matrix, or a RatingMatrix
+
+        Returns:
+            bool: True if training successful
+        """
+        try:
+            if pivot_matrix.empty:
+                logger.error("Empty pivot matrix provided for MF training")
+                return False
+
+            self.n_users, self.n_items = pivot_matrix.shape
+            rows, cols, values = self._observed_ratings(pivot_matrix)
+            if len(values) == 0:
+                logger.error("No observed ratings provided for MF training")
+                return False
+
+            self.sparsity = 1 - (len(values) / (self.n_users * self.n_items))
+            n_factors = min(self.n_components, self.n_users, self.n_items)
+
+            logger.info(
+                f"Training {self.algorithm.upper()} MF on matrix: {self.n_users} users "
+                f"x {self.n_items} items, {len(values)} ratings, "
+                f"sparsity: {self.sparsity:.3f}"
+            )
+
+            rng = np.random.default_rng(self.random_state)
+
+            # Hold out ratings for early stopping; tiny datasets use training RMSE
+            n_validation = int(len(values) * RecommendationConfig.MF_VALIDATION_FRACTION)
+            order = rng.permutation(len(values))
+            validation = order[:n_validation] if n_validation > 0 else order
+            train = order[n_validation:]
+
+            train_rows, train_cols, train_values = rows[train], cols[train], values[train]
+            global_mean = float(train_values.mean())
+
+            user_factors = rng.normal(0.0, 0.1, (self.n_users, n_factors))
+            item_factors = rng.normal(0.0, 0.1, (self.n_items, n_factors))
+            user_bias = np.zeros(self.n_users)
+            item_bias = np.zeros(self.n_items)
+
+            if self.algorithm == "als":
+                train_matrix = csr_matrix(
+                    (train_values, (train_rows, train_cols)),
+                    shape=(self.n_users, self.n_items),
+                )
+                train_matrix_t = train_matrix.T.tocsr()
+            elif self.algorithm != "sgd":
+                logger.error(f"Unknown MF algorithm: {self.algorithm}")
+                return False
+
+            best = None
+            best_rmse = np.inf
+            epochs_without_improvement = 0
+
+            for epoch in range(1, self.n_epochs + 1):
+                if self.algorithm == "als":
+                    user_factors, user_bias = self._als_step(
+                        train_matrix, item_factors, item_bias, global_mean
+                    )
+                    item_factors, item_bias = self._als_step(
+                        train_matrix_t, user_factors, user_bias, global_mean
+                    )
+                else:
+                    self._sgd_epoch(
+                        train_rows,
+                        train_cols,
+                        train_values,
+                        user_factors,
+                        item_factors,
+                        user_bias,
+                        item_bias,
+                        global_mean,
+                        rng,
+                    )
+
+                rmse = self._rmse(
+                    rows[validation],
+                    cols[validation],
+                    values[validation],
+                    user_factors,
+                    item_factors,
+                    user_bias,
+                    item_bias,
+                    global_mean,
+                )
+                logger.debug(f"MF epoch {epoch}: validation RMSE {rmse:.4f}")
+                if not np.isfinite(rmse):
+                    logger.warning(f"MF training diverged at epoch {epoch}")
+                    break
+
+                if best_rmse - rmse > RecommendationConfig.MF_EARLY_STOPPING_TOLERANCE:
+                    best_rmse = rmse
+                    best = (
+                        user_factors.copy(),
+                        item_factors.copy(),
+                        user_bias.copy(),
+                        item_bias.copy(),
+                        epoch,
+                    )
+                    epochs_without_improvement = 0
+                elif epoch >= self.min_epochs:
+                    epochs_without_improvement += 1
+                    if epochs_without_improvement >= self.patience:
+                        logger.info(f"MF early stopping after epoch {epoch}")
+                        break
+
+            if best is None:
+                logger.error("MF training diverged")
+                return False
+
+            user_factors, item_factors, user_bias, item_bias, self.epochs_trained = best
+
+            self.global_mean = global_mean
+            self.user_means = (global_mean + user_bias).astype(np.float32)
+            self.item_means = (global_mean + item_bias).astype(np.float32)
+            self.user_factors = user_factors.astype(np.float32)
+            self.item_factors = item_factors.astype(np.float32)
+            self.n_factors = n_factors
+            self.validation_rmse = float(best_rmse)
+            self.is_centered = True
+            self.rating_matrix = csr_matrix(
+                (values.astype(np.float32), (rows, cols)),
+                shape=(self.n_users, self.n_items),
+            )
+            self.is_fitted = True
+
+            logger.info(
+                f"MF training completed: {n_factors} factors, "
+                f"{self.epochs_trained} epochs, validation RMSE: {best_rmse:.3f}"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error training MF model: {e}")
+            self.is_fitted = False
+            return False
+
+    def _solve_ridge(
+        self,
+        indicator_rows: csr_matrix,
+        target_rows: csr_matrix,
+        features: np.ndarray,
+        counts: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Solve one regularized least-squares problem per row, all rows at once
+
+        Args:
+            indicator_rows: Rows x columns CSR matrix with 1 where observed
+            target_rows: Same structure holding the regression targets
+            features: Feature vector per column
+            counts: Number of observations per row (ALS-WR regularization)
+
+        Returns:
+            np.ndarray: Solution vector per row
+        """
+        # Only columns observed in these rows contribute (fold-in of few users)
+        observed = np.unique(indicator_rows.indices)
+        if len(observed) < len(features):
+            indicator_rows = indicator_rows[:, observed]
+            target_rows = target_rows[:, observed]
+            features = features[observed]
+
+        n_features = features.shape[1]
+        grams = (features[:, :, None] * features[:, None, :]).reshape(
+            len(features), -1
+        )
+        lhs = np.asarray(indicator_rows @ grams).reshape(-1, n_features, n_features)
+        lhs += (
+            self.regularization * np.maximum(counts, 1)[:, None, None]
+        ) * np.eye(n_features)
+        rhs = np.asarray(target_rows @ features)
+        return np.linalg.solve(lhs, rhs[:, :, None])[:, :, 0]
+
+    def _als_step(
+        self,
+        ratings: csr_matrix,
+        fixed_factors: np.ndarray,
+        fixed_bias: np.ndarray,
+        global_mean: float,
+        block_size: int = 8192,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Solve the factors and biases of the rows of ratings with the other side fixed
+
+        Args:
+            ratings: CSR ratings with the solved side as rows
+            fixed_factors: Factors of the columns
+            fixed_bias: Biases of the columns
+            global_mean: Global mean rating
+            block_size: Rows solved per batch
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (factors, biases) of the rows
+        """
+        n_rows = ratings.shape[0]
+        n_factors = fixed_factors.shape[1]
+
+        # The bias is one more coefficient against a constant feature
+        features = np.hstack([fixed_factors, np.ones((len(fixed_factors), 1))])
+        indicator = ratings.copy()
+        indicator.data = np.ones_like(indicator.data)
+        targets = ratings.copy()
+        targets.data = ratings.data - global_mean - fixed_bias[ratings.indices]
+        counts = np.diff(ratings.indptr)
+
+        solution = np.zeros((n_rows, n_factors + 1))
+        for start in range(0, n_rows, block_size):
+            stop = min(start + block_size, n_rows)
+            solution[start:stop] = self._solve_ridge(
+                indicator[start:stop], targets[start:stop], features, counts[start:stop]
+            )
+
+        return solution[:, :n_factors], solution[:, n_factors]
+
+    def _sgd_epoch(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        values: np.ndarray,
+        user_factors: np.ndarray,
+        item_factors: np.ndarray,
+        user_bias: np.ndarray,
+        item_bias: np.ndarray,
+        global_mean: float,
+        rng: np.random.Generator,
+    ) -> None:
+        """
+        One pass of mini-batch SGD over shuffled ratings, updating in place
+
+        Args:
+            rows: User index per rating
+            cols: Item index per rating
+            values: Rating values
+            user_factors: User factors (updated)
+            item_factors: Item factors (updated)
+            user_bias: User biases (updated)
+            item_bias: Item biases (updated)
+            global_mean: Global mean rating
+            rng: Random generator for the shuffle
+        """
+        lr = self.learning_rate
+        reg = self.sgd_regularization
+        batch_size = RecommendationConfig.MF_SGD_BATCH_SIZE
+
+        order = rng.permutation(len(values))
+        for start in range(0, len(order), batch_size):
+            batch = order[start : start + batch_size]
+            users, items = rows[batch], cols[batch]
+            p, q = user_factors[users], item_factors[items]
+
+            errors = values[batch] - (
+                global_mean + user_bias[users] + item_bias[items] + np.sum(p * q, axis=1)
+            )
+
+            np.add.at(user_bias, users, lr * (errors - reg * user_bias[users]))
+            np.add.at(item_bias, items, lr * (errors - reg * item_bias[items]))
+            np.add.at(user_factors, users, lr * (errors[:, None] * q - reg * p))
+            np.add.at(item_factors, items, lr * (errors[:, None] * p - reg * q))
+
+    @staticmethod
+    def _rmse(
+        rows: np.ndarray,
+        cols: np.ndarray,
+        values: np.ndarray,
+        user_factors: np.ndarray,
+        item_factors: np.ndarray,
+        user_bias: np.ndarray,
+        item_bias: np.ndarray,
+        global_mean: float,
+    ) -> float:
+        """RMSE of the clipped predictions on the given ratings"""
+        predictions = (
+            global_mean
+            + user_bias[rows]
+            + item_bias[cols]
+            + np.sum(user_factors[rows] * item_factors[cols], axis=1)
+        )
+        predictions = np.clip(predictions, 1.0, 5.0)
+        return float(np.sqrt(np.mean((predictions - values) ** 2)))
+
+    def predict_user_item(
+        self, user_idx: int, item_idx: int, common_items: int = 0
+    ) -> float:
+        """
+        Predict rating for specific user-item pair
+
+        Args:
+            user_idx: User index
+            item_idx: Item index
+            common_items: Number of common items for confidence weighting
+
+        Returns:
+            float: Predicted rating
+        """
+        try:
+            if not self.is_fitted:
+                logger.error("MF model not fitted")
+                return self.global_mean
+
+            if user_idx >= self.n_users or item_idx >= self.n_items:
+                logger.warning(f"Index out of bounds: user {user_idx}, item {item_idx}")
+                return self.global_mean
+
+            prediction = (
+                self.user_means[user_idx]
+                + self.item_means[item_idx]
+                - self.global_mean
+                + np.dot(self.user_factors[user_idx], self.item_factors[item_idx])
+            )
+
+            if common_items > 0:
+                confidence_weight = min(1.0, np.sqrt(common_items / 5.0))
+                prediction = self.global_mean + confidence_weight * (
+                    prediction - self.global_mean
+                )
+
+            return float(np.clip(prediction, 1.0, 5.0))
+
+        except Exception as e:
+            logger.error(f"Error predicting user-item rating: {e}")
+            return self.global_mean
+
+    def fold_in_users(self, rating_matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fit factors and bias of a block of new users against the fixed item side
+        (one ALS user step)
+
+        Args:
+            rating_matrix: Ratings with shape (n_users, n_items), 0 = not rated
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (user_factor_vectors, mu + user_bias)
+        """
+        rated = csr_matrix(rating_matrix > 0, dtype=np.float64)
+        features = np.hstack(
+            [self.item_factors, np.ones((self.n_items, 1), dtype=np.float32)]
+        ).astype(np.float64)
+        targets = rated.copy()
+        targets.data = (
+            rating_matrix[rated.nonzero()] - self.item_means[rated.indices]
+        ).astype(np.float64)
+
+        solution = self._solve_ridge(
+            rated, targets, features, np.diff(rated.indptr)
+        )
+        return solution[:, :-1], self.global_mean + solution[:, -1]
+
+    def _predict_matrix(
+        self,
+        user_vectors: np.ndarray,
+        user_means: np.ndarray,
+        item_indices: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Score every item for a block of users: mu + b_u + b_i + p_u . q_i
+
+        Args:
+            user_vectors: User latent factors with shape (n_users, n_factors)
+            user_means: mu + b_u per user
+            item_indices: Only score these items (default: all items)
+
+        Returns:
+            np.ndarray: Predictions with shape (n_users, n_items), clipped to 1-5
+        """
+        item_factors = self.item_factors
+        item_means = self.item_means
+        if item_indices is not None:
+            item_factors = item_factors[item_indices]
+            item_means = item_means[item_indices]
+
+        item_bias = (item_means - self.global_mean).astype(np.float64)
+        predictions = (user_vectors @ item_factors.T).astype(np.float64)
+        predictions += np.asarray(user_means, dtype=np.float64)[:, None]
+        predictions += item_bias[None, :]
+        return np.clip(predictions, 1.0, 5.0)
+
+    def get_model_info(self) -> Dict[str, any]:
+        """
+        Get information about the trained model
+
+        Returns:
+            Dict[str, any]: Model information
+        """
+        if not self.is_fitted:
+            return {"fitted": False}
+
+        return {
+            "fitted": True,
+            "engine": self.engine,
+            "algorithm": self.algorithm,
+            "n_components": self.n_factors,
+            "n_factors": self.n_factors,
+            "n_users": self.n_users,
+            "n_items": self.n_items,
+            "sparsity": self.sparsity,
+            "global_mean": self.global_mean,
+            "epochs_trained": self.epochs_trained,
+            "validation_rmse": self.validation_rmse,
+        }
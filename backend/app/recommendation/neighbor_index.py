@@ -0,0 +1,356 @@
+"""
+User Neighbor Index Module
+Precomputed top-K cosine neighbors for every user of a ratings snapshot
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from typing import List, Tuple, Dict, Optional
+from app.utils.logger import get_logger
+from .config import RecommendationConfig
+from .similarity import (
+    build_user_item_matrix,
+    calculate_similarity_scores,
+    common_item_cosine,
+)
+
+logger = get_logger(__name__)
+
+
+class UserNeighborIndex:
+    """
+    Top-K user-neighbor index built once per ratings snapshot and updated per user
+    """
+
+    # Upper bound on dense scores (users x users) held per kernel call while building
+    BUILD_BLOCK_ENTRIES = 4_000_000
+
+    def __init__(self, top_k: int = None, min_common_items: int = 2):
+        """
+        Initialize neighbor index
+
+        Args:
+            top_k: Number of neighbors kept per user (default from config)
+            min_common_items: Minimum number of co-rated items for a neighbor
+        """
+        self.top_k = top_k or RecommendationConfig.NEIGHBOR_INDEX_TOP_K
+        self.min_common_items = min_common_items
+
+        self.user_ids = []
+        self.user_index = {}
+        self.food_index = {}
+        self.user_matrix = None
+
+        # Neighbor table: row = user index, -1 marks an empty slot
+        self.neighbor_idx = None
+        self.neighbor_scores = None
+        self.stale_users = set()
+
+        # Reads may recompute stale rows, so readers and writers share one lock
+        self._lock = threading.RLock()
+
+    @property
+    def is_built(self) -> bool:
+        return self.neighbor_idx is not None
+
+    def build(self, ratings_df: pd.DataFrame) -> bool:
+        """
+        Build the index from a ratings snapshot
+
+        Args:
+            ratings_df: DataFrame with columns [user_id, food_id, rating]
+
+        Returns:
+            bool: True if the index was built
+        """
+        with self._lock:
+            return self._build(ratings_df)
+
+    def _build(self, ratings_df: pd.DataFrame) -> bool:
+        """Build the index (caller holds the lock)"""
+        try:
+            if len(ratings_df) == 0:
+                logger.warning("Empty ratings data, neighbor index not built")
+                return False
+
+            user_matrix, self.user_ids, food_ids = build_user_item_matrix(ratings_df)
+            # Own the arrays: update_user rewrites rows in place
+            self.user_matrix = user_matrix.copy()
+            self.user_index = {user_id: idx for idx, user_id in enumerate(self.user_ids)}
+            self.food_index = {food_id: idx for idx, food_id in enumerate(food_ids)}
+
+            n_users = len(self.user_ids)
+            self.neighbor_idx = np.full((n_users, self.top_k), -1, dtype=np.int32)
+            self.neighbor_scores = np.zeros((n_users, self.top_k), dtype=np.float64)
+            self.stale_users = set()
+
+            # Score blocks of users against everyone with the sparse kernel
+            block_size = max(1, self.BUILD_BLOCK_ENTRIES // n_users)
+            for block_start in range(0, n_users, block_size):
+                block = np.arange(block_start, min(block_start + block_size, n_users))
+                block_scores = common_item_cosine(
+                    self.user_matrix, block, min_common_items=self.min_common_items
+                )
+                for row, user_idx in enumerate(block):
+                    self._store_neighbors(user_idx, block_scores[row])
+
+            logger.info(
+                f"Built neighbor index: {n_users} users, top_k={self.top_k}, "
+                f"{len(self.food_index)} foods"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error building neighbor index: {e}")
+            self.neighbor_idx = None
+            return False
+
+    def _compute_neighbors(self, user_idx: int) -> np.ndarray:
+        """
+        Recompute the neighbor row of one user
+
+        Args:
+            user_idx: User index
+
+        Returns:
+            np.ndarray: Similarity of the user against every user
+        """
+        scores = calculate_similarity_scores(
+            self.user_matrix, user_idx, min_common_items=self.min_common_items
+        )
+        self._store_neighbors(user_idx, scores)
+        return scores
+
+    def _store_neighbors(self, user_idx: int, scores: np.ndarray) -> None:
+        """
+        Keep the top-K positive scores of a user as its neighbor row
+
+        Args:
+            user_idx: User index
+            scores: Similarity of the user against every user
+        """
+        # Stable sort keeps ties in user order, matching get_similar_users
+        candidates = np.flatnonzero(scores > 0)
+        order = np.argsort(-scores[candidates], kind="stable")[: self.top_k]
+        selected = candidates[order]
+
+        self.neighbor_idx[user_idx] = -1
+        self.neighbor_scores[user_idx] = 0.0
+        self.neighbor_idx[user_idx, : len(selected)] = selected
+        self.neighbor_scores[user_idx, : len(selected)] = scores[selected]
+        self.stale_users.discard(user_idx)
+
+    def get_neighbors(
+        self,
+        user_id: str,
+        top_k: int = 50,
+        similarity_threshold: float = 0.0,
+    ) -> Optional[List[Tuple[str, float]]]:
+        """
+        Read the neighbors of a user from the index
+
+        Args:
+            user_id: Target user ID
+            top_k: Number of neighbors to return (at most the index top_k)
+            similarity_threshold: Minimum similarity score threshold
+
+        Returns:
+            Optional[List[Tuple[str, float]]]: (user_id, score) tuples sorted by score,
+                or None if the index cannot answer the query
+        """
+        with self._lock:
+            return self._get_neighbors(user_id, top_k, similarity_threshold)
+
+    def _get_neighbors(
+        self, user_id: str, top_k: int, similarity_threshold: float
+    ) -> Optional[List[Tuple[str, float]]]:
+        """Read the neighbors of a user (caller holds the lock)"""
+        if not self.is_built or top_k > self.top_k:
+            return None
+
+        user_idx = self.user_index.get(user_id)
+        if user_idx is None:
+            return []
+
+        if user_idx in self.stale_users:
+            self._compute_neighbors(user_idx)
+
+        neighbors = []
+        for neighbor_idx, score in zip(
+            self.neighbor_idx[user_idx], self.neighbor_scores[user_idx]
+        ):
+            if neighbor_idx < 0 or len(neighbors) >= top_k:
+                break
+            if score >= similarity_threshold:
+                neighbors.append((self.user_ids[neighbor_idx], float(score)))
+
+        return neighbors
+
+    def update_user(self, user_id: str, user_ratings: Dict[str, float]) -> bool:
+        """
+        Update the index after the ratings of one user changed
+
+        Args:
+            user_id: User whose ratings changed
+            user_ratings: Complete mapping of food_id -> rating for the user
+
+        Returns:
+            bool: True if the index was updated
+        """
+        with self._lock:
+            return self._update_user(user_id, user_ratings)
+
+    def _update_user(self, user_id: str, user_ratings: Dict[str, float]) -> bool:
+        """Update the index for one user (caller holds the lock)"""
+        try:
+            if not self.is_built:
+                return False
+
+            # Grow the food axis for foods the snapshot has not seen yet
+            for food_id in user_ratings:
+                if food_id not in self.food_index:
+                    self.food_index[food_id] = len(self.food_index)
+            n_foods = len(self.food_index)
+            if n_foods > self.user_matrix.shape[1]:
+                self.user_matrix.resize((self.user_matrix.shape[0], n_foods))
+
+            row = csr_matrix(
+                (
+                    np.fromiter(user_ratings.values(), dtype=np.float64),
+                    (
+                        np.zeros(len(user_ratings), dtype=np.int32),
+                        np.fromiter(
+                            (self.food_index[f] for f in user_ratings), dtype=np.int32
+                        ),
+                    ),
+                ),
+                shape=(1, n_foods),
+            )
+
+            user_idx = self.user_index.get(user_id)
+            if user_idx is None:
+                user_idx = len(self.user_ids)
+                self.user_ids.append(user_id)
+                self.user_index[user_id] = user_idx
+                self._append_empty_row()
+            self._set_matrix_row(user_idx, row)
+
+            scores = self._compute_neighbors(user_idx)
+
+            # Similarity is symmetric: fix up the rows that held the user or that
+            # the new score enters (above the last kept score, or any positive
+            # score while the row has free slots)
+            thresholds = np.where(
+                self.neighbor_idx[:, -1] >= 0, self.neighbor_scores[:, -1], 0.0
+            )
+            affected = np.flatnonzero(
+                (self.neighbor_idx == user_idx).any(axis=1) | (scores > thresholds)
+            )
+            for other_idx in affected:
+                if other_idx == user_idx or other_idx in self.stale_users:
+                    continue
+                self._update_neighbor_row(other_idx, user_idx, scores[other_idx])
+
+            logger.info(f"Updated neighbor index for user {user_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error updating neighbor index for user {user_id}: {e}")
+            return False
+
+    def _append_empty_row(self) -> None:
+        """Add an empty user row to the matrix and the neighbor table"""
+        n_users, n_foods = self.user_matrix.shape
+        self.user_matrix = csr_matrix(
+            (
+                self.user_matrix.data,
+                self.user_matrix.indices,
+                np.append(self.user_matrix.indptr, self.user_matrix.indptr[-1]),
+            ),
+            shape=(n_users + 1, n_foods),
+        )
+        self.neighbor_idx = np.vstack(
+            [self.neighbor_idx, np.full((1, self.top_k), -1, dtype=np.int32)]
+        )
+        self.neighbor_scores = np.vstack(
+            [self.neighbor_scores, np.zeros((1, self.top_k))]
+        )
+
+    def _set_matrix_row(self, user_idx: int, row: csr_matrix) -> None:
+        """
+        Replace one row of the user matrix by splicing its CSR arrays
+
+        Args:
+            user_idx: Row to replace
+            row: New 1 x n_foods row
+        """
+        row.sum_duplicates()
+        matrix = self.user_matrix
+        start, end = matrix.indptr[user_idx], matrix.indptr[user_idx + 1]
+
+        if end - start == row.nnz:
+            matrix.data[start:end] = row.data
+            matrix.indices[start:end] = row.indices
+            return
+
+        indptr = matrix.indptr.copy()
+        indptr[user_idx + 1 :] += row.nnz - (end - start)
+        self.user_matrix = csr_matrix(
+            (
+                np.concatenate([matrix.data[:start], row.data, matrix.data[end:]]),
+                np.concatenate(
+                    [
+                        matrix.indices[:start],
+                        row.indices.astype(matrix.indices.dtype),
+                        matrix.indices[end:],
+                    ]
+                ),
+                indptr,
+            ),
+            shape=matrix.shape,
+        )
+
+    def _update_neighbor_row(self, row_idx: int, user_idx: int, score: float) -> None:
+        """
+        Replace the score of user_idx inside the neighbor row of row_idx
+
+        Args:
+            row_idx: User whose neighbor row is updated
+            user_idx: User whose similarity changed
+            score: New similarity between the two users
+        """
+        row_neighbors = self.neighbor_idx[row_idx]
+        position = np.flatnonzero(row_neighbors == user_idx)
+        is_full = row_neighbors[-1] >= 0
+
+        if len(position) > 0:
+            if is_full and score < self.neighbor_scores[row_idx, -1]:
+                # A user outside the table may now rank higher; recompute lazily
+                self.stale_users.add(row_idx)
+                return
+            neighbors = [
+                (n, s)
+                for n, s in zip(row_neighbors, self.neighbor_scores[row_idx])
+                if n >= 0 and n != user_idx
+            ]
+        elif score > 0 and (not is_full or score > self.neighbor_scores[row_idx, -1]):
+            neighbors = [
+                (n, s)
+                for n, s in zip(row_neighbors, self.neighbor_scores[row_idx])
+                if n >= 0
+            ]
+        else:
+            return
+
+        if score > 0:
+            neighbors.append((user_idx, score))
+        neighbors.sort(key=lambda x: (-x[1], x[0]))
+        neighbors = neighbors[: self.top_k]
+
+        self.neighbor_idx[row_idx] = -1
+        self.neighbor_scores[row_idx] = 0.0
+        for slot, (neighbor_idx, neighbor_score) in enumerate(neighbors):
+            self.neighbor_idx[row_idx, slot] = neighbor_idx
+            self.neighbor_scores[row_idx, slot] = neighbor_score
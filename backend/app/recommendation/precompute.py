@@ -0,0 +1,264 @@
+"""
+Recommendation Precompute Module
+Nightly job writing the top-N recommendations of every active user to the
+user_recommendations table, computed across forked worker processes
+"""
+
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set
+from sqlalchemy import union
+from app.extensions import db
+from app.modules.rating.models import FoodRating, RestaurantRating
+from app.modules.recommendation.models import UserRecommendation
+from app.utils.logger import get_logger
+from .config import RecommendationConfig
+from .snapshot import RecommendationSnapshot
+
+logger = get_logger(__name__)
+
+# Set in the parent before the pool forks; workers inherit the loaded snapshot
+# copy-on-write instead of loading or unpickling their own
+_worker_app = None
+_worker_recommender = None
+
+
+def _init_worker() -> None:
+    """Give a forked worker an app context and its own database connections"""
+    _worker_app.app_context().push()
+    # Connections inherited from the parent must not be shared across processes
+    db.engine.dispose(close=False)
+
+
+def _recommend_chunk(
+    user_ids: List[str], top_n: int
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Recommend for one chunk of users in a worker (or in-process)"""
+    return _worker_recommender.recommend_many(user_ids, top_n=top_n)
+
+
+def _chunks(items: List[str], size: int) -> Iterator[List[str]]:
+    """Split a list into consecutive chunks of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def model_version(snapshot: RecommendationSnapshot) -> str:
+    """
+    Get the version label stored with precomputed rows
+
+    Args:
+        snapshot: Snapshot the recommendations are computed from
+
+    Returns:
+        str: "<engine>_<trained_at ms>" of the global model (matching its
+            artifact name), or "local" without one
+    """
+    if snapshot.has_global_model:
+        global_model = snapshot.global_model
+        return f"{global_model.engine}_{int(global_model.trained_at * 1000)}"
+    return "local"
+
+
+def get_active_user_ids(active_days: int) -> List[str]:
+    """
+    Get users with a food or restaurant rating written in the last days
+
+    Args:
+        active_days: Activity window in days
+
+    Returns:
+        List[str]: Sorted user IDs
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=active_days)
+    query = union(
+        db.select(FoodRating.user_id).where(FoodRating.updated_at >= cutoff),
+        db.select(RestaurantRating.user_id).where(
+            RestaurantRating.updated_at >= cutoff
+        ),
+    )
+    return sorted(row[0] for row in db.session.execute(query))
+
+
+def _write_chunk(
+    results: Dict[str, List[Dict[str, Any]]],
+    version: str,
+    computed_at: datetime,
+) -> int:
+    """
+    Replace the stored rows of a chunk of users in one transaction
+
+    Args:
+        results: user_id -> recommendation dicts; users without recommendations
+            only lose their old rows
+        version: Model version label
+        computed_at: Timestamp of the run
+
+    Returns:
+        int: Number of rows written
+    """
+    rows = [
+        {
+            "user_id": user_id,
+            "rank": rec["rank"],
+            "food_id": rec["food_id"],
+            "score": rec["predicted_rating"],
+            "model_version": version,
+            "computed_at": computed_at,
+        }
+        for user_id, recommendations in results.items()
+        for rec in recommendations
+    ]
+
+    try:
+        db.session.query(UserRecommendation).filter(
+            UserRecommendation.user_id.in_(list(results))
+        ).delete(synchronize_session=False)
+        if rows:
+            # Core bulk insert: one executemany instead of an ORM flush per row
+            db.session.execute(UserRecommendation.__table__.insert(), rows)
+        db.session.commit()
+        return len(rows)
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error writing precomputed recommendations: {e}")
+        return 0
+
+
+def _prune_inactive_users(active_user_ids: Set[str], chunk_size: int) -> int:
+    """
+    Delete the stored rows of users outside this run's active set
+
+    Args:
+        active_user_ids: Users this run rewrote
+        chunk_size: Users per DELETE statement
+
+    Returns:
+        int: Number of users pruned
+    """
+    stored_user_ids = {
+        row[0] for row in db.session.query(UserRecommendation.user_id).distinct()
+    }
+    inactive_user_ids = sorted(stored_user_ids - active_user_ids)
+
+    try:
+        for user_ids in _chunks(inactive_user_ids, chunk_size):
+            db.session.query(UserRecommendation).filter(
+                UserRecommendation.user_id.in_(user_ids)
+            ).delete(synchronize_session=False)
+        db.session.commit()
+        return len(inactive_user_ids)
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error pruning precomputed recommendations: {e}")
+        return 0
+
+
+def precompute_recommendations(
+    app,
+    recommender,
+    top_n: Optional[int] = None,
+    workers: Optional[int] = None,
+    active_days: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Compute and store the recommendations of every active user
+
+    The recommender's snapshot must be loaded (with its global model and cold
+    start ranking) before calling; it is served read-only from then on. Rows
+    of users outside the run's active set are pruned at the end.
+
+    Args:
+        app: Flask application, for the database session of each worker
+        recommender: Recommendations instance with a loaded snapshot
+        top_n: Recommendations stored per user (default from config)
+        workers: Worker processes; 1 computes in-process (default: CPU count)
+        active_days: Activity window in days (default from config)
+        chunk_size: Users per worker task (default from config)
+
+    Returns:
+        Dict[str, Any]: Run summary
+    """
+    global _worker_app, _worker_recommender
+
+    top_n = top_n or RecommendationConfig.PRECOMPUTE_TOP_N
+    workers = workers or RecommendationConfig.PRECOMPUTE_WORKERS or os.cpu_count()
+    active_days = active_days or RecommendationConfig.PRECOMPUTE_ACTIVE_DAYS
+    chunk_size = chunk_size or RecommendationConfig.PRECOMPUTE_CHUNK_SIZE
+
+    start_time = time.time()
+    snapshot = recommender.snapshot
+    # Stamped with the snapshot's load time (rounded down to whole seconds,
+    # which DATETIME columns keep), so ratings written after the load are newer
+    # than the rows and make them stale
+    computed_at = datetime.fromtimestamp(int(snapshot.loaded_at), timezone.utc)
+    version = model_version(snapshot)
+
+    user_ids = get_active_user_ids(active_days)
+    chunks = list(_chunks(user_ids, chunk_size))
+    logger.info(
+        f"Precomputing top {top_n} recommendations of {len(user_ids)} active users "
+        f"in {len(chunks)} chunks, model {version}"
+    )
+
+    recommender.read_only = True
+    _worker_app, _worker_recommender = app, recommender
+
+    # Workers share the snapshot through fork; elsewhere compute in-process
+    use_pool = (
+        workers > 1
+        and len(chunks) > 1
+        and "fork" in multiprocessing.get_all_start_methods()
+    )
+
+    n_users = 0
+    n_rows = 0
+    n_pruned = 0
+    try:
+        if use_pool:
+            executor = ProcessPoolExecutor(
+                max_workers=min(workers, len(chunks)),
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+            )
+            chunk_results = executor.map(
+                _recommend_chunk, chunks, itertools.repeat(top_n)
+            )
+        else:
+            executor = None
+            chunk_results = map(_recommend_chunk, chunks, itertools.repeat(top_n))
+
+        try:
+            # Write each chunk as it arrives, in the parent's single session
+            for results in chunk_results:
+                n_users += sum(1 for recs in results.values() if recs)
+                n_rows += _write_chunk(results, version, computed_at)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Users no longer active fall back to online; pruned by user rather than
+        # by computed_at so no stored timestamp precision can hit this run's rows
+        n_pruned = _prune_inactive_users(set(user_ids), chunk_size)
+
+    finally:
+        _worker_app = _worker_recommender = None
+
+    summary = {
+        "active_users": len(user_ids),
+        "users_written": n_users,
+        "rows_written": n_rows,
+        "users_pruned": n_pruned,
+        "model_version": version,
+        "workers": min(workers, len(chunks)) if use_pool else 1,
+        "elapsed": round(time.time() - start_time, 3),
+    }
+    logger.info(f"Precomputed recommendations: {summary}")
+    return summary
@@ -0,0 +1,732 @@
+"""
+Ratings Store Module
+Compact columnar storage of the ratings snapshot: int32 user/item codes,
+float32 ratings and dictionary encoders for the UUID strings, plus the sparse
+user x food matrix built from them
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix, csr_matrix
+from typing import List, Dict, Iterable, Optional, Union
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IdEncoder:
+    """
+    Dictionary encoder between string IDs and dense int32 codes
+    """
+
+    def __init__(self, ids: Iterable[str] = ()):
+        """
+        Initialize encoder
+
+        Args:
+            ids: IDs in code order (code = position)
+        """
+        self.ids = np.asarray(list(ids), dtype=object)
+        self.index = {id_: code for code, id_ in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self.index
+
+    def get(self, id_: str) -> Optional[int]:
+        """
+        Get the code of an ID
+
+        Args:
+            id_: String ID
+
+        Returns:
+            Optional[int]: Code, or None if the ID is unknown
+        """
+        return self.index.get(id_)
+
+    def get_id(self, code: int) -> Optional[str]:
+        """
+        Get the ID of a code
+
+        Args:
+            code: int code
+
+        Returns:
+            Optional[str]: String ID, or None if the code is out of range
+        """
+        if 0 <= code < len(self.ids):
+            return self.ids[code]
+        return None
+
+    def encode(self, ids: Iterable[str]) -> np.ndarray:
+        """
+        Encode IDs to codes
+
+        Args:
+            ids: String IDs
+
+        Returns:
+            np.ndarray: int32 codes, -1 for unknown IDs
+        """
+        ids = list(ids)
+        return np.fromiter(
+            (self.index.get(id_, -1) for id_ in ids), dtype=np.int32, count=len(ids)
+        )
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Decode codes to IDs
+
+        Args:
+            codes: int codes
+
+        Returns:
+            np.ndarray: Object array of string IDs (shares the encoder's strings)
+        """
+        return self.ids[np.asarray(codes, dtype=np.int64)]
+
+    def extended(self, ids: Iterable[str]) -> "IdEncoder":
+        """
+        Get a new encoder with unseen IDs appended; existing codes are unchanged
+
+        Args:
+            ids: IDs that may not be encoded yet
+
+        Returns:
+            IdEncoder: This encoder if nothing is new, otherwise an extended copy
+        """
+        new_ids = [id_ for id_ in dict.fromkeys(ids) if id_ not in self.index]
+        if not new_ids:
+            return self
+
+        encoder = IdEncoder.__new__(IdEncoder)
+        encoder.ids = np.concatenate([self.ids, np.asarray(new_ids, dtype=object)])
+        encoder.index = dict(self.index)
+        for code, id_ in enumerate(new_ids, len(self.ids)):
+            encoder.index[id_] = code
+        return encoder
+
+    def memory_usage(self) -> int:
+        """
+        Estimate the memory held by the encoder (ID strings, array and dict)
+
+        Returns:
+            int: Size in bytes
+        """
+        strings = sum(sys.getsizeof(id_) for id_ in self.ids)
+        return strings + self.ids.nbytes + sys.getsizeof(self.index)
+
+
+class RatingsStore:
+    """
+    Immutable columnar ratings snapshot with per-user row lookup
+    """
+
+    def __init__(
+        self,
+        user_codes: np.ndarray,
+        item_codes: np.ndarray,
+        ratings: np.ndarray,
+        user_encoder: IdEncoder,
+        item_encoder: IdEncoder,
+        has_restaurant_rating: Optional[np.ndarray] = None,
+    ):
+        """
+        Initialize store from encoded columns
+
+        Args:
+            user_codes: int32 user code per rating
+            item_codes: int32 food code per rating
+            ratings: float32 rating values
+            user_encoder: Encoder of user IDs
+            item_encoder: Encoder of food IDs
+            has_restaurant_rating: Optional bool flag per rating (hybrid scoring)
+        """
+        self.user_codes = np.asarray(user_codes, dtype=np.int32)
+        self.item_codes = np.asarray(item_codes, dtype=np.int32)
+        self.ratings = np.asarray(ratings, dtype=np.float32)
+        self.has_restaurant_rating = (
+            np.asarray(has_restaurant_rating, dtype=bool)
+            if has_restaurant_rating is not None
+            else None
+        )
+        self.user_encoder = user_encoder
+        self.item_encoder = item_encoder
+
+        # Rows grouped per user: rows of user u are
+        # _user_rows[_user_offsets[u]:_user_offsets[u + 1]], in snapshot order
+        self._user_rows = np.argsort(self.user_codes, kind="stable").astype(np.int32)
+        self._user_offsets = np.zeros(len(user_encoder) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(self.user_codes, minlength=len(user_encoder)),
+            out=self._user_offsets[1:],
+        )
+
+        # Derived data of this snapshot (full matrix, k-core filters); the
+        # store never changes, so entries never need invalidating
+        self._cache = {}
+
+        for column in (
+            self.user_codes,
+            self.item_codes,
+            self.ratings,
+            self.has_restaurant_rating,
+            self._user_rows,
+            self._user_offsets,
+        ):
+            if column is not None:
+                column.flags.writeable = False
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        df: pd.DataFrame,
+        user_encoder: Optional[IdEncoder] = None,
+        item_encoder: Optional[IdEncoder] = None,
+    ) -> "RatingsStore":
+        """
+        Build a store from a ratings DataFrame
+
+        Args:
+            df: DataFrame with columns [user_id, food_id, rating] and optionally
+                has_restaurant_rating
+            user_encoder: Existing user encoder to extend (default: new, sorted IDs)
+            item_encoder: Existing food encoder to extend (default: new, sorted IDs)
+
+        Returns:
+            RatingsStore: Store with the rows of df in the same order
+        """
+        if len(df) == 0:
+            df = df.reindex(columns=["user_id", "food_id", "rating"])
+
+        if user_encoder is None:
+            user_codes, user_ids = pd.factorize(df["user_id"], sort=True)
+            user_encoder = IdEncoder(user_ids)
+        else:
+            user_encoder = user_encoder.extended(df["user_id"])
+            user_codes = user_encoder.encode(df["user_id"])
+
+        if item_encoder is None:
+            item_codes, food_ids = pd.factorize(df["food_id"], sort=True)
+            item_encoder = IdEncoder(food_ids)
+        else:
+            item_encoder = item_encoder.extended(df["food_id"])
+            item_codes = item_encoder.encode(df["food_id"])
+
+        has_restaurant_rating = (
+            df["has_restaurant_rating"].to_numpy(dtype=bool)
+            if "has_restaurant_rating" in df.columns
+            else None
+        )
+
+        return cls(
+            user_codes,
+            item_codes,
+            df["rating"].to_numpy(dtype=np.float32),
+            user_encoder,
+            item_encoder,
+            has_restaurant_rating,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ratings)
+
+    @property
+    def n_users(self) -> int:
+        """Number of users with at least one rating"""
+        return int(np.count_nonzero(np.diff(self._user_offsets)))
+
+    @property
+    def n_items(self) -> int:
+        """Number of foods with at least one rating"""
+        return int(np.count_nonzero(np.bincount(self.item_codes)))
+
+    def user_rows(self, user_id: str) -> np.ndarray:
+        """
+        Get the row indices of a user's ratings
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            np.ndarray: Row indices (empty if the user has no ratings)
+        """
+        user_code = self.user_encoder.get(user_id)
+        if user_code is None:
+            return np.empty(0, dtype=np.int32)
+        return self._user_rows[
+            self._user_offsets[user_code] : self._user_offsets[user_code + 1]
+        ]
+
+    def has_user(self, user_id: str) -> bool:
+        """Check whether a user has at least one rating"""
+        return len(self.user_rows(user_id)) > 0
+
+    def get_user_ratings(self, user_id: str) -> Dict[str, float]:
+        """
+        Get a user's ratings
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Dict[str, float]: Mapping of food_id -> rating
+        """
+        rows = self.user_rows(user_id)
+        return dict(
+            zip(
+                self.item_encoder.decode(self.item_codes[rows]),
+                self.ratings[rows].tolist(),
+            )
+        )
+
+    def get_user_rated_foods(self, user_id: str) -> List[str]:
+        """
+        Get the foods a user has rated
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            List[str]: Food IDs in snapshot order
+        """
+        rows = self.user_rows(user_id)
+        return self.item_encoder.decode(self.item_codes[rows]).tolist()
+
+    def to_dataframe(self, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Materialize (a subset of) the store as a ratings DataFrame
+
+        The ID columns reference the encoders' strings, so the frame costs one
+        pointer per cell rather than one string per cell.
+
+        Args:
+            rows: Row indices or boolean mask to materialize (default: all rows)
+
+        Returns:
+            pd.DataFrame: DataFrame with columns [user_id, food_id, rating] and
+                has_restaurant_rating when available
+        """
+        if rows is None:
+            rows = slice(None)
+
+        data = {
+            "user_id": self.user_encoder.decode(self.user_codes[rows]),
+            "food_id": self.item_encoder.decode(self.item_codes[rows]),
+            "rating": self.ratings[rows].astype(np.float64),
+        }
+        if self.has_restaurant_rating is not None:
+            data["has_restaurant_rating"] = self.has_restaurant_rating[rows]
+
+        return pd.DataFrame(data)
+
+    def to_matrix(self, rows: Optional[np.ndarray] = None) -> "RatingMatrix":
+        """
+        Build the sparse user x food matrix of (a subset of) the store
+
+        Args:
+            rows: Row indices or boolean mask to include (default: all rows)
+
+        Returns:
+            RatingMatrix: Matrix over the users and foods present in the rows
+        """
+        if rows is None:
+            matrix = self._cache.get("matrix")
+            if matrix is None:
+                matrix = self._cache["matrix"] = RatingMatrix.from_codes(
+                    self.user_codes,
+                    self.item_codes,
+                    self.ratings,
+                    self.user_encoder.ids,
+                    self.item_encoder.ids,
+                )
+            return matrix
+
+        return RatingMatrix.from_codes(
+            self.user_codes[rows],
+            self.item_codes[rows],
+            self.ratings[rows],
+            self.user_encoder.ids,
+            self.item_encoder.ids,
+        )
+
+    def kcore_rows(
+        self,
+        min_user_ratings: int,
+        min_food_ratings: int,
+        max_iterations: int = 5,
+    ) -> np.ndarray:
+        """
+        Get the rows left after iteratively dropping users and foods with too few
+        ratings, counted with bincount over the codes
+
+        Duplicate (user, food) rows count once, as in the matrix. The result is
+        cached per thresholds for the lifetime of the store.
+
+        Args:
+            min_user_ratings: Minimum ratings per user
+            min_food_ratings: Minimum ratings per food
+            max_iterations: Extra passes after the first one before giving up
+                on reaching a stable set
+
+        Returns:
+            np.ndarray: Read-only boolean mask over the rows
+        """
+        key = ("kcore", min_user_ratings, min_food_ratings, max_iterations)
+        rows = self._cache.get(key)
+        if rows is not None:
+            return rows
+
+        n_users = len(self.user_encoder)
+        n_items = len(self.item_encoder)
+
+        # One entry per distinct (user, food) pair
+        pairs = np.unique(
+            self.user_codes.astype(np.int64) * max(n_items, 1) + self.item_codes
+        )
+        pair_users = pairs // max(n_items, 1)
+        pair_items = pairs % max(n_items, 1)
+
+        alive = np.ones(len(pairs), dtype=bool)
+        prev_size = len(pairs)
+        for _ in range(max_iterations + 1):
+            user_counts = np.bincount(pair_users[alive], minlength=n_users)
+            item_counts = np.bincount(pair_items[alive], minlength=n_items)
+            alive &= (user_counts[pair_users] >= min_user_ratings) & (
+                item_counts[pair_items] >= min_food_ratings
+            )
+            current_size = int(np.count_nonzero(alive))
+            if current_size == prev_size:
+                break
+            prev_size = current_size
+
+        valid_users = np.zeros(n_users, dtype=bool)
+        valid_users[pair_users[alive]] = True
+        valid_items = np.zeros(n_items, dtype=bool)
+        valid_items[pair_items[alive]] = True
+
+        rows = valid_users[self.user_codes] & valid_items[self.item_codes]
+        rows.flags.writeable = False
+        self._cache[key] = rows
+        return rows
+
+    def filtered_matrix(
+        self, min_user_ratings: int, min_food_ratings: int
+    ) -> "RatingMatrix":
+        """
+        Get the matrix of the rows kept by kcore_rows, cached per thresholds
+
+        Args:
+            min_user_ratings: Minimum ratings per user
+            min_food_ratings: Minimum ratings per food
+
+        Returns:
+            RatingMatrix: Filtered matrix without empty rows or columns
+        """
+        key = ("filtered_matrix", min_user_ratings, min_food_ratings)
+        matrix = self._cache.get(key)
+        if matrix is None:
+            rows = self.kcore_rows(min_user_ratings, min_food_ratings)
+            matrix = self._cache[key] = self.to_matrix(rows)
+            logger.info(
+                f"Filtered data: {len(self)} -> {int(np.count_nonzero(rows))} ratings, "
+                f"{matrix.shape[0]} users, {matrix.shape[1]} foods"
+            )
+        return matrix
+
+    def replace_users(self, user_ids: List[str], users_df: pd.DataFrame) -> "RatingsStore":
+        """
+        Get a new store where the ratings of some users are replaced
+
+        Args:
+            user_ids: Users whose ratings are replaced (users without rows in
+                users_df end up with no ratings)
+            users_df: Fresh ratings of those users
+
+        Returns:
+            RatingsStore: New store; this store is left unchanged
+        """
+        user_encoder = self.user_encoder.extended(user_ids)
+        replaced_codes = user_encoder.encode(user_ids)
+        keep = ~np.isin(self.user_codes, replaced_codes)
+
+        users_store = RatingsStore.from_dataframe(
+            users_df, user_encoder=user_encoder, item_encoder=self.item_encoder
+        )
+
+        has_restaurant_rating = None
+        if self.has_restaurant_rating is not None:
+            has_restaurant_rating = np.concatenate(
+                [
+                    self.has_restaurant_rating[keep],
+                    (
+                        users_store.has_restaurant_rating
+                        if users_store.has_restaurant_rating is not None
+                        else np.zeros(len(users_store), dtype=bool)
+                    ),
+                ]
+            )
+
+        return RatingsStore(
+            np.concatenate([self.user_codes[keep], users_store.user_codes]),
+            np.concatenate([self.item_codes[keep], users_store.item_codes]),
+            np.concatenate([self.ratings[keep], users_store.ratings]),
+            users_store.user_encoder,
+            users_store.item_encoder,
+            has_restaurant_rating,
+        )
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Report the memory footprint of the store
+
+        Returns:
+            Dict[str, int]: Bytes per component and in total
+        """
+        columns = (
+            self.user_codes.nbytes
+            + self.item_codes.nbytes
+            + self.ratings.nbytes
+            + (
+                self.has_restaurant_rating.nbytes
+                if self.has_restaurant_rating is not None
+                else 0
+            )
+        )
+        user_index = self._user_rows.nbytes + self._user_offsets.nbytes
+        user_encoder = self.user_encoder.memory_usage()
+        item_encoder = self.item_encoder.memory_usage()
+
+        return {
+            "n_ratings": len(self),
+            "columns_bytes": columns,
+            "user_index_bytes": user_index,
+            "user_encoder_bytes": user_encoder,
+            "item_encoder_bytes": item_encoder,
+            "total_bytes": columns + user_index + user_encoder + item_encoder,
+        }
+
+
+class RatingMatrix:
+    """
+    Sparse user x food rating matrix (0 = not rated) with its row and column IDs
+
+    Drop-in for the dense pivot_table(fill_value=0) frame where callers only
+    need shape, index, columns and the values.
+    """
+
+    def __init__(
+        self,
+        matrix: csr_matrix,
+        user_ids: Iterable[str],
+        food_ids: Iterable[str],
+    ):
+        """
+        Initialize matrix
+
+        Args:
+            matrix: CSR matrix with one row per user and one column per food
+            user_ids: Row IDs
+            food_ids: Column IDs
+        """
+        self.matrix = csr_matrix(matrix)
+        self.index = pd.Index(user_ids, dtype=object)
+        self.columns = pd.Index(food_ids, dtype=object)
+
+    @classmethod
+    def from_codes(
+        cls,
+        user_codes: np.ndarray,
+        item_codes: np.ndarray,
+        ratings: np.ndarray,
+        user_ids: np.ndarray,
+        food_ids: np.ndarray,
+    ) -> "RatingMatrix":
+        """
+        Build a matrix from coded rating rows, without a dense intermediate
+
+        Rows and columns are limited to the codes present and ordered by ID,
+        like DataFrame.pivot_table. Duplicate (user, food) rows are averaged.
+
+        Args:
+            user_codes: User code per rating
+            item_codes: Food code per rating
+            ratings: Rating values
+            user_ids: Code -> user ID lookup
+            food_ids: Code -> food ID lookup
+
+        Returns:
+            RatingMatrix: Matrix over the present users and foods
+        """
+        user_codes = np.asarray(user_codes)
+        item_codes = np.asarray(item_codes)
+
+        present_users = np.unique(user_codes)
+        present_items = np.unique(item_codes)
+        present_users = present_users[
+            np.argsort(np.asarray(user_ids)[present_users], kind="stable")
+        ]
+        present_items = present_items[
+            np.argsort(np.asarray(food_ids)[present_items], kind="stable")
+        ]
+
+        # Code -> position among the present users/foods
+        row_of = np.empty(int(user_codes.max(initial=-1)) + 1, dtype=np.int32)
+        row_of[present_users] = np.arange(len(present_users), dtype=np.int32)
+        col_of = np.empty(int(item_codes.max(initial=-1)) + 1, dtype=np.int32)
+        col_of[present_items] = np.arange(len(present_items), dtype=np.int32)
+
+        shape = (len(present_users), len(present_items))
+        rows = row_of[user_codes]
+        cols = col_of[item_codes]
+        values = np.asarray(ratings, dtype=np.float32)
+
+        # COO -> CSR sums duplicates; divide by the count to average them
+        matrix = coo_matrix((values, (rows, cols)), shape=shape).tocsr()
+        counts = coo_matrix(
+            (np.ones(len(values), dtype=np.float32), (rows, cols)), shape=shape
+        ).tocsr()
+        if counts.nnz and counts.data.max() > 1:
+            matrix.data /= counts.data
+
+        return cls(
+            matrix,
+            np.asarray(user_ids, dtype=object)[present_users],
+            np.asarray(food_ids, dtype=object)[present_items],
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "RatingMatrix":
+        """
+        Build a matrix from a ratings DataFrame
+
+        Args:
+            df: DataFrame with columns [user_id, food_id, rating]
+
+        Returns:
+            RatingMatrix: Matrix over the users and foods of df
+        """
+        user_codes, user_ids = pd.factorize(df["user_id"])
+        item_codes, food_ids = pd.factorize(df["food_id"])
+        return cls.from_codes(
+            user_codes,
+            item_codes,
+            df["rating"].to_numpy(dtype=np.float32),
+            np.asarray(user_ids, dtype=object),
+            np.asarray(food_ids, dtype=object),
+        )
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    @property
+    def empty(self) -> bool:
+        return self.matrix.shape[0] == 0 or self.matrix.shape[1] == 0
+
+    @property
+    def nnz(self) -> int:
+        return self.matrix.nnz
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def user_counts(self) -> np.ndarray:
+        """Number of ratings per row"""
+        return np.diff(self.matrix.indptr)
+
+    def food_counts(self) -> np.ndarray:
+        """Number of ratings per column"""
+        return np.bincount(self.matrix.indices, minlength=self.matrix.shape[1])
+
+    def select(
+        self,
+        user_mask: Optional[np.ndarray] = None,
+        food_mask: Optional[np.ndarray] = None,
+        drop_empty_foods: bool = False,
+    ) -> "RatingMatrix":
+        """
+        Get the sub-matrix of some users and foods
+
+        Args:
+            user_mask: Boolean mask or indices of rows to keep (default: all)
+            food_mask: Boolean mask or indices of columns to keep (default: all)
+            drop_empty_foods: Also drop columns without ratings in the result,
+                like a pivot of the selected rows
+
+        Returns:
+            RatingMatrix: Sub-matrix
+        """
+        matrix = self.matrix
+        user_ids = self.index
+        food_ids = self.columns
+
+        if user_mask is not None:
+            matrix = matrix[user_mask]
+            user_ids = user_ids[user_mask]
+        if food_mask is not None:
+            matrix = matrix[:, food_mask]
+            food_ids = food_ids[food_mask]
+        if drop_empty_foods:
+            rated_foods = np.bincount(matrix.indices, minlength=matrix.shape[1]) > 0
+            matrix = matrix[:, rated_foods]
+            food_ids = food_ids[rated_foods]
+
+        return RatingMatrix(matrix, user_ids, food_ids)
+
+    def select_users(
+        self, user_ids: Iterable[str], drop_empty_foods: bool = True
+    ) -> "RatingMatrix":
+        """
+        Get the sub-matrix of some users, keeping row order
+
+        Args:
+            user_ids: Users to keep; unknown IDs are ignored
+            drop_empty_foods: Drop columns the selected users did not rate
+
+        Returns:
+            RatingMatrix: Sub-matrix
+        """
+        return self.select(
+            self.index.isin(list(user_ids)), drop_empty_foods=drop_empty_foods
+        )
+
+    def to_dense(self) -> np.ndarray:
+        """Dense float32 array (only for small matrices)"""
+        return self.matrix.toarray().astype(np.float32)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Get the ratings of the matrix in long form
+
+        Returns:
+            pd.DataFrame: DataFrame with columns [user_id, food_id, rating]
+        """
+        coo = self.matrix.tocoo()
+        return pd.DataFrame(
+            {
+                "user_id": self.index.to_numpy()[coo.row],
+                "food_id": self.columns.to_numpy()[coo.col],
+                "rating": coo.data.astype(np.float64),
+            }
+        )
+
+
+def as_rating_matrix(ratings: Union[pd.DataFrame, RatingMatrix]) -> RatingMatrix:
+    """
+    Get ratings in sparse form
+
+    Args:
+        ratings: Ratings DataFrame with columns [user_id, food_id, rating], or a
+            RatingMatrix (returned unchanged)
+
+    Returns:
+        RatingMatrix: Sparse ratings
+    """
+    if isinstance(ratings, RatingMatrix):
+        return ratings
+    return RatingMatrix.from_dataframe(ratings)
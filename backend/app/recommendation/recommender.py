@@ -5,7 +5,8 @@ Main interface class for the recommendation system
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional, Tuple, Any
+from typing import Iterable, List, Dict, Optional, Set, Tuple, Any
+import threading
 import time
 from app.utils.logger import get_logger
 from app.modules.rating.models import FoodRating
@@ -15,9 +16,16 @@ from app.modules.food.models import Food
 from app.modules.user.models import User
 from app.extensions import db
 
+from .cold_start import ColdStartRanking
 from .config import RecommendationConfig
 from .local_data import LocalDataProcessor
 from .local_model import LocalSVDModel
+from .global_model import GlobalSVDModel
+from .item_neighbors import ItemNeighborTable
+from .latency import latency_recorder
+from .ratings_store import IdEncoder
+from .snapshot import RecommendationSnapshot
+from .cache import RecommendationCache
 from .similarity import validate_similarity_calculation
 
 
@@ -25,6 +33,11 @@ class Recommendations:
     """
     Main recommendation system class with hybrid food+restaurant scoring
     Provides the public interface: recommend(user_id, top_n, alpha)
+
+    One instance is shared by all request threads. Requests read an immutable
+    RecommendationSnapshot and keep their working state (local dataset, local
+    SVD model, index encoders) on the stack; reloads, refreshes and training
+    publish a new snapshot instead of modifying the one being served.
     """
 
     def __init__(self, alpha: Optional[float] = None):
@@ -40,12 +53,40 @@ class Recommendations:
             else RecommendationConfig.DEFAULT_FOOD_RESTAURANT_ALPHA
         )
         self.data_processor = LocalDataProcessor(alpha=self.alpha)
-        self.svd_model = LocalSVDModel()
+        self.svd_model = LocalSVDModel()  # Last fitted local model (for explanations)
+        self.global_model = GlobalSVDModel()  # Global model of the latest snapshot
+        self.use_global_model = True
         self.is_initialized = False
         self.last_data_load = 0
-        self.cache_duration = 3600  # 1 hour cache
+        self.last_delta_refresh = 0
+        self.cache_duration = RecommendationConfig.RECONCILE_INTERVAL  # full reload
         self.use_hybrid_scoring = True
 
+        # Per-user result cache; data_version changes whenever data or model does
+        self.result_cache = RecommendationCache()
+        self.data_version = 0
+
+        # Snapshot served to requests, swapped atomically by _publish
+        self.snapshot = None
+        self._publish_lock = threading.Lock()  # Guards snapshot read-modify-write
+        self._update_lock = threading.Lock()  # Serializes data loads and refreshes
+        self._training_lock = threading.Lock()  # Serializes global model training
+        self._precompute_lock = threading.Lock()  # Serializes table rebuilds
+        self._stats_lock = threading.Lock()
+
+        # Users whose ratings changed since their last merge into the snapshot;
+        # rating writes only queue them, the next refresh merges them
+        self._pending_user_ids = set()
+        self._pending_lock = threading.Lock()
+
+        # Background TrainingScheduler; while attached, requests never reload
+        # data or train the global model themselves
+        self.scheduler = None
+
+        # Precompute workers serve the loaded snapshot and model as they are,
+        # without reloading data or training on the request path
+        self.read_only = False
+
         # Performance tracking
         self.stats = {
             "total_requests": 0,
@@ -54,55 +95,155 @@ class Recommendations:
             "hybrid_coverage": 0.0,  # Average restaurant rating coverage
         }
 
+    def _publish(self, new_version: bool = False, **changes) -> RecommendationSnapshot:
+        """
+        Publish a new snapshot built from the current one with some fields replaced
+
+        Args:
+            new_version: Assign a new data version (invalidates cached results)
+            **changes: Snapshot fields to replace
+
+        Returns:
+            RecommendationSnapshot: The published snapshot
+        """
+        with self._publish_lock:
+            if new_version:
+                self.data_version += 1
+                changes["version"] = self.data_version
+
+            if self.snapshot is None:
+                snapshot = RecommendationSnapshot(**changes)
+            else:
+                snapshot = self.snapshot.replace(**changes)
+
+            self.snapshot = snapshot
+            if snapshot.global_model is not None:
+                self.global_model = snapshot.global_model
+            return snapshot
+
+    def _get_snapshot(self) -> Optional[RecommendationSnapshot]:
+        """
+        Get the snapshot to serve a request from, reloading or refreshing the data
+        first when due
+
+        Only the first load blocks; while another thread reloads, requests keep
+        serving the previous snapshot. With a scheduler attached, reloads and
+        delta refreshes are left to the scheduler and requests only merge users
+        queued by rating writes; a read-only recommender never reloads.
+
+        Returns:
+            Optional[RecommendationSnapshot]: Snapshot, or None if no data is loaded
+        """
+        snapshot = self.snapshot
+        if snapshot is not None and (
+            self.read_only
+            or (
+                not self._pending_user_ids
+                and (
+                    self.scheduler is not None
+                    or not self._data_update_due(time.time())
+                )
+            )
+        ):
+            return snapshot
+
+        if not self._update_lock.acquire(blocking=snapshot is None):
+            return snapshot
+
+        try:
+            if snapshot is not None and self.scheduler is not None:
+                self._merge_pending_users()
+            else:
+                self._load_and_validate_data()
+            return self.snapshot
+        finally:
+            self._update_lock.release()
+
+    def _data_update_due(self, current_time: float) -> bool:
+        """Check whether a full reload or a delta refresh is due"""
+        return (
+            not self.is_initialized
+            or (current_time - self.last_data_load) >= self.cache_duration
+            or (current_time - self.last_delta_refresh)
+            >= RecommendationConfig.DELTA_REFRESH_INTERVAL
+        )
+
     def _load_and_validate_data(self) -> bool:
         """
-        Load and validate data from database (with hybrid scoring support)
+        Load and validate data from database (with hybrid scoring support) and
+        publish it as a new snapshot; the caller holds the update lock
 
         Returns:
             bool: True if data loaded successfully
         """
+        pending_user_ids = set()
         try:
             # Check if we need to reload data
             current_time = time.time()
             if (
                 current_time - self.last_data_load
             ) < self.cache_duration and self.is_initialized:
+                if (
+                    current_time - self.last_delta_refresh
+                    >= RecommendationConfig.DELTA_REFRESH_INTERVAL
+                ):
+                    with latency_recorder.time("delta_refresh"):
+                        self._refresh_changed_ratings(current_time)
+                self._merge_pending_users()
                 return True
 
             logger.info("Loading ratings data from database...")
 
+            # The reload reads the ratings of users queued until now; users
+            # queued while it runs stay queued
+            pending_user_ids = self._take_pending_user_ids()
+
             # Load ratings data (hybrid or food-only)
             if self.use_hybrid_scoring:
-                ratings_df = self.data_processor.load_hybrid_ratings_from_db()
+                with latency_recorder.time("data_reload"):
+                    ratings_df = self.data_processor.load_hybrid_ratings_from_db()
 
                 # Get hybrid coverage statistics
                 if "has_restaurant_rating" in ratings_df.columns:
-                    self.stats["hybrid_coverage"] = ratings_df[
-                        "has_restaurant_rating"
-                    ].mean()
+                    with self._stats_lock:
+                        self.stats["hybrid_coverage"] = ratings_df[
+                            "has_restaurant_rating"
+                        ].mean()
                     logger.info(
                         f"Hybrid scoring active: alpha={self.alpha}, coverage={self.stats['hybrid_coverage']*100:.1f}%"
                     )
             else:
-                ratings_df = self.data_processor.load_ratings_from_db()
+                with latency_recorder.time("data_reload"):
+                    ratings_df = self.data_processor.load_ratings_from_db()
                 logger.info("Using food ratings only")
 
             if len(ratings_df) == 0:
                 logger.error("No ratings data found in database")
+                self._queue_pending_user_ids(pending_user_ids)
                 return False
 
-            # Validate data quality
-            if not self._validate_data_quality(ratings_df):
-                logger.error("Data quality validation failed")
-                return False
-
-            # Validate similarity calculations on a sample
-            if not validate_similarity_calculation(ratings_df, sample_size=3):
-                logger.warning(
-                    "Similarity calculation validation failed, but continuing..."
-                )
+            with latency_recorder.time("quality_validation"):
+                # Validate data quality
+                if not self._validate_data_quality(ratings_df):
+                    logger.error("Data quality validation failed")
+                    self._queue_pending_user_ids(pending_user_ids)
+                    return False
+
+                # Validate similarity calculations on a sample
+                if not validate_similarity_calculation(
+                    self.data_processor.ratings_store.to_matrix(), sample_size=3
+                ):
+                    logger.warning(
+                        "Similarity calculation validation failed, but continuing..."
+                    )
 
+            self._publish(
+                new_version=True,
+                ratings_store=self.data_processor.ratings_store,
+                loaded_at=current_time,
+            )
             self.last_data_load = current_time
+            self.last_delta_refresh = current_time
             self.is_initialized = True
 
             logger.info(f"Data loaded successfully: {len(ratings_df)} ratings")
@@ -110,8 +251,29 @@ class Recommendations:
 
         except Exception as e:
             logger.error(f"Error loading and validating data: {e}")
+            self._queue_pending_user_ids(pending_user_ids)
             return False
 
+    def _refresh_changed_ratings(self, current_time: float) -> None:
+        """
+        Merge ratings changed since the last load into the snapshot and evict the
+        cached results of the affected users
+
+        Args:
+            current_time: Timestamp of this refresh
+        """
+        self.last_delta_refresh = current_time
+        if not self.use_hybrid_scoring:
+            return
+
+        # None means no incremental refresh was possible; the next full reload
+        # brings the snapshot up to date
+        changed_user_ids = self.data_processor.refresh_changed_ratings() or []
+        if changed_user_ids:
+            self._publish(ratings_store=self.data_processor.ratings_store)
+        for user_id in changed_user_ids:
+            self.result_cache.invalidate_user(user_id)
+
     def _validate_data_quality(self, ratings_df: pd.DataFrame) -> bool:
         """
         Validate the quality of ratings data
@@ -171,27 +333,449 @@ class Recommendations:
             logger.error(f"Error validating data quality: {e}")
             return False
 
-    def _get_user_context(self, user_id: str) -> Dict[str, any]:
+    def refresh_data(self) -> bool:
+        """
+        Reload or incrementally refresh the ratings snapshot when due
+
+        Returns:
+            bool: True if a snapshot is available
+        """
+        with self._update_lock:
+            self._load_and_validate_data()
+        return self.snapshot is not None
+
+    def train_global_model(self, force: bool = False) -> bool:
+        """
+        Train the global model on the current snapshot and publish it
+
+        Args:
+            force: Train even if the current model is within the training interval
+
+        Returns:
+            bool: True if a global model is available afterwards
+        """
+        if self.snapshot is None:
+            logger.error("Cannot train global SVD model without ratings data")
+            return False
+
+        with self._training_lock:
+            return self._prepare_global_model(force=force).has_global_model
+
+    def load_latest_global_model(self) -> bool:
+        """
+        Hot-swap the newest artifact on disk if it is newer than the served model
+
+        Returns:
+            bool: True if a new model was swapped in
+        """
+        model_file = GlobalSVDModel.latest_model_file()
+        if model_file is None or self.snapshot is None:
+            return False
+
+        with self._training_lock:
+            current = self.snapshot.global_model
+            if current is not None and current.artifact_file == model_file:
+                return False
+
+            global_model = GlobalSVDModel(
+                n_components=self.global_model.n_components,
+                random_state=self.global_model.random_state,
+                engine=self.global_model.engine,
+            )
+            if not global_model.load(model_file):
+                return False
+            if current is not None and global_model.trained_at <= current.trained_at:
+                return False
+
+            self._publish(new_version=True, global_model=global_model)
+            logger.info(f"Swapped in global SVD model from {model_file}")
+            return True
+
+    def refresh_item_neighbors(self, force: bool = False) -> bool:
+        """
+        Rebuild the item neighbor table of the current snapshot when it is
+        missing, or when the data changed and the table is older than
+        ITEM_NEIGHBORS_REFRESH_INTERVAL
+
+        Args:
+            force: Rebuild even if the table is fresh
+
+        Returns:
+            bool: True if a table is available afterwards
+        """
+        with self._precompute_lock:
+            snapshot = self.snapshot
+            if snapshot is None:
+                return False
+
+            table = snapshot.item_neighbors
+            if table is not None and not force:
+                is_stale = table.source_version != snapshot.version and (
+                    time.time() - table.built_at
+                    >= RecommendationConfig.ITEM_NEIGHBORS_REFRESH_INTERVAL
+                )
+                if not is_stale:
+                    return True
+
+            new_table = ItemNeighborTable()
+            if not new_table.build(
+                snapshot.ratings_store.to_matrix(), source_version=snapshot.version
+            ):
+                return table is not None
+
+            # Same data version: cached per-user results stay valid
+            self._publish(item_neighbors=new_table)
+            return True
+
+    def refresh_cold_start_ranking(self, force: bool = False) -> bool:
+        """
+        Rebuild the cold start ranking of the current snapshot when it is
+        missing, or when the data changed and the ranking is older than
+        COLD_START_REFRESH_INTERVAL
+
+        Args:
+            force: Rebuild even if the ranking is fresh
+
+        Returns:
+            bool: True if a ranking is available afterwards
+        """
+        with self._precompute_lock:
+            snapshot = self.snapshot
+            if snapshot is None:
+                return False
+
+            ranking = snapshot.cold_start
+            if ranking is not None and not force:
+                is_stale = ranking.source_version != snapshot.version and (
+                    time.time() - ranking.built_at
+                    >= RecommendationConfig.COLD_START_REFRESH_INTERVAL
+                )
+                if not is_stale:
+                    return True
+
+            new_ranking = ColdStartRanking()
+            if not new_ranking.build(
+                snapshot.ratings_store,
+                self.data_processor.load_food_categories_from_db(),
+                source_version=snapshot.version,
+            ):
+                return ranking is not None
+
+            self._publish(cold_start=new_ranking)
+            return True
+
+    def _is_cold_user(self, user_id: str, snapshot: RecommendationSnapshot) -> bool:
+        """
+        Whether a user is served from the cold start ranking: too few ratings
+        for collaborative filtering, or pruned from the filtered matrix the
+        models are trained on (k-core filtering can drop users above the minimum)
+
+        Args:
+            user_id: User ID
+            snapshot: Snapshot to read from
+
+        Returns:
+            bool: True for a cold user
+        """
+        ratings_store = snapshot.ratings_store
+        if len(ratings_store.user_rows(user_id)) < self.data_processor.min_user_ratings:
+            return True
+        # Cached per snapshot, so this is a hash lookup after the first call
+        return (
+            user_id
+            not in ratings_store.filtered_matrix(
+                self.data_processor.min_user_ratings,
+                self.data_processor.min_food_ratings,
+            ).index
+        )
+
+    def _recommend_cold_start(
+        self,
+        snapshot: RecommendationSnapshot,
+        users_exclude_foods: Dict[str, List[str]],
+        top_n: int,
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Get recommendations for cold users from the precomputed ranking, favoring
+        the best foods of their favorite categories
+
+        Args:
+            snapshot: Snapshot to read from
+            users_exclude_foods: user_id -> food IDs to exclude
+            top_n: Number of recommendations per user
+
+        Returns:
+            Dict[str, List[Tuple[str, float]]]: user_id -> (food_id, score) tuples
+        """
+        if snapshot.cold_start is None:
+            # First call before the scheduler built the ranking
+            self.refresh_cold_start_ranking()
+            if self.snapshot.cold_start is None:
+                return {}
+            snapshot = snapshot.replace(cold_start=self.snapshot.cold_start)
+
+        favorite_categories = self.data_processor.load_favorite_categories_from_db(
+            list(users_exclude_foods)
+        )
+        return {
+            user_id: snapshot.cold_start.recommend(
+                top_n=top_n,
+                category_ids=favorite_categories.get(user_id, ()),
+                exclude_foods=exclude_foods,
+            )
+            for user_id, exclude_foods in users_exclude_foods.items()
+        }
+
+    def get_similar_foods(
+        self, food_id: str, top_n: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the foods most often rated alike with a food, from the precomputed
+        item neighbor table
+
+        Args:
+            food_id: Food ID
+            top_n: Number of foods to return
+
+        Returns:
+            List[Dict[str, Any]]: [{"food_id", "similarity", "rank"}] sorted by
+                similarity descending
+        """
+        try:
+            snapshot = self._get_snapshot()
+            if snapshot is None:
+                return []
+
+            if snapshot.item_neighbors is None:
+                # First call before the scheduler built the table
+                self.refresh_item_neighbors()
+                snapshot = self.snapshot
+                if snapshot.item_neighbors is None:
+                    return []
+
+            return [
+                {"food_id": similar_id, "similarity": similarity, "rank": rank}
+                for rank, (similar_id, similarity) in enumerate(
+                    snapshot.item_neighbors.get_similar_foods(food_id, top_n=top_n),
+                    1,
+                )
+            ]
+
+        except Exception as e:
+            logger.error(f"Error getting similar foods for {food_id}: {e}")
+            return []
+
+    def _ensure_global_model(
+        self, snapshot: RecommendationSnapshot
+    ) -> RecommendationSnapshot:
+        """
+        Make sure a global SVD model is available, loading the saved artifact or
+        retraining it once the configured training interval has passed
+
+        With a scheduler attached, or when read-only, the request serves
+        whatever model the snapshot has. Otherwise the model is trained into a new GlobalSVDModel and
+        published with a new snapshot; while another thread trains, requests keep
+        the current model and only wait when there is no model at all.
+
+        Args:
+            snapshot: Snapshot of the current request
+
+        Returns:
+            RecommendationSnapshot: Snapshot to continue the request with; check
+                has_global_model before serving from it
+        """
+        if self.read_only or self.scheduler is not None:
+            return snapshot
+
+        if snapshot.has_global_model and not snapshot.global_model.needs_training():
+            return snapshot
+
+        if not self._training_lock.acquire(blocking=not snapshot.has_global_model):
+            return snapshot
+
+        try:
+            return self._prepare_global_model()
+        finally:
+            self._training_lock.release()
+
+    def _prepare_global_model(self, force: bool = False) -> RecommendationSnapshot:
+        """
+        Load or train a global model for the current snapshot and publish it; the
+        caller holds the training lock
+
+        Args:
+            force: Train even if the current model is within the training interval
+
+        Returns:
+            RecommendationSnapshot: The current snapshot afterwards
+        """
+        try:
+            current = self.snapshot
+            if (
+                not force
+                and current.has_global_model
+                and not current.global_model.needs_training()
+            ):
+                return current
+
+            global_model = GlobalSVDModel(
+                n_components=self.global_model.n_components,
+                random_state=self.global_model.random_state,
+                engine=self.global_model.engine,
+            )
+
+            # Prefer a fresh artifact on disk over retraining in this process
+            if not force and not current.has_global_model and global_model.load():
+                if not global_model.needs_training():
+                    return self._publish(new_version=True, global_model=global_model)
+
+            logger.info("Training global SVD model on full ratings data...")
+            filtered_matrix = current.ratings_store.filtered_matrix(
+                self.data_processor.min_user_ratings,
+                self.data_processor.min_food_ratings,
+            )
+            if not global_model.train(filtered_matrix):
+                if global_model.is_fitted and not current.has_global_model:
+                    # Serve the stale artifact rather than nothing
+                    return self._publish(new_version=True, global_model=global_model)
+                return current
+
+            global_model.save()
+            return self._publish(new_version=True, global_model=global_model)
+
+        except Exception as e:
+            logger.error(f"Error preparing global SVD model: {e}")
+            return self.snapshot
+
+    def _recommend_from_global_model(
+        self,
+        snapshot: RecommendationSnapshot,
+        user_id: str,
+        top_n: int,
+        exclude_foods: List[str],
+    ) -> List[Tuple[str, float]]:
+        """
+        Generate recommendations by folding the user's ratings into the global model
+
+        Args:
+            snapshot: Snapshot with a fitted global model
+            user_id: User ID
+            top_n: Number of recommendations to return
+            exclude_foods: Food IDs already rated by the user
+
+        Returns:
+            List[Tuple[str, float]]: (food_id, predicted_rating) tuples
+        """
+        user_ratings = snapshot.ratings_store.get_user_ratings(user_id)
+
+        return snapshot.global_model.recommend(
+            user_ratings=user_ratings,
+            top_n=top_n,
+            exclude_foods=exclude_foods,
+            min_rating=RecommendationConfig.MIN_RATING_THRESHOLD,
+        )
+
+    def on_user_ratings_changed(self, user_id: str) -> None:
+        """
+        Evict cached results of a user after their ratings changed and queue
+        them for a merge into the snapshot
+
+        Runs inside the rating write request, so it never waits for the update
+        lock: the next request, delta refresh or scheduler tick merges the
+        queued users, and their results are not cached until then.
+
+        Args:
+            user_id: User whose ratings were created, updated or deleted
+        """
+        if not user_id:
+            return
+
+        if self.is_initialized:
+            self._queue_pending_user_ids([user_id])
+        self.result_cache.invalidate_user(user_id)
+
+    def _queue_pending_user_ids(self, user_ids: Iterable[str]) -> None:
+        """Queue users whose ratings must be merged into the snapshot"""
+        with self._pending_lock:
+            self._pending_user_ids.update(user_ids)
+
+    def _take_pending_user_ids(self) -> Set[str]:
+        """Take all queued users, leaving the queue empty"""
+        with self._pending_lock:
+            user_ids, self._pending_user_ids = self._pending_user_ids, set()
+        return user_ids
+
+    def _merge_pending_users(self) -> None:
+        """
+        Re-query the ratings of queued users into the snapshot (including
+        deletes, which delta refreshes cannot see) and evict their cached
+        results; the caller holds the update lock
+        """
+        user_ids = self._take_pending_user_ids()
+        if not user_ids:
+            return
+
+        # A failed user is left to the next full reload
+        refreshed = [
+            user_id
+            for user_id in sorted(user_ids)
+            if self.data_processor.refresh_user_ratings(user_id)
+        ]
+        if refreshed:
+            self._publish(ratings_store=self.data_processor.ratings_store)
+
+        # Evict after publishing so a recompute cannot read the old ratings
+        for user_id in user_ids:
+            self.result_cache.invalidate_user(user_id)
+
+    def _cache_result(
+        self,
+        snapshot: RecommendationSnapshot,
+        cache_key: Tuple,
+        recommendations: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Cache a result unless its ratings were replaced while it was computed
+
+        Args:
+            snapshot: Snapshot the result was computed from
+            cache_key: Result cache key
+            recommendations: Recommendation dicts to cache
+        """
+        # A rating write may have published new ratings and evicted this user
+        # after the request took its snapshot, or queued them for a merge
+        if (
+            snapshot.ratings_store is self.snapshot.ratings_store
+            and cache_key[0] not in self._pending_user_ids
+        ):
+            self.result_cache.set(cache_key, recommendations)
+
+    def _get_user_context(
+        self, user_id: str, snapshot: Optional[RecommendationSnapshot] = None
+    ) -> Dict[str, any]:
         """
         Get additional context about the user for recommendations
 
         Args:
             user_id: User ID
+            snapshot: Snapshot to read from (default: the current one)
 
         Returns:
             Dict[str, any]: User context information
         """
         try:
+            snapshot = snapshot or self.snapshot
+
             # Get user's rating history
-            user_ratings = self.data_processor.get_user_rated_foods(user_id)
+            user_rating_values = (
+                snapshot.ratings_store.get_user_ratings(user_id) if snapshot else {}
+            )
+            user_ratings = list(user_rating_values)
 
             # Get user's rating statistics
             if len(user_ratings) > 0:
-                user_ratings_df = self.data_processor.ratings_df[
-                    self.data_processor.ratings_df["user_id"] == user_id
-                ]
-                avg_rating = user_ratings_df["rating"].mean()
-                rating_count = len(user_ratings_df)
+                avg_rating = float(np.mean(list(user_rating_values.values())))
+                rating_count = len(user_rating_values)
             else:
                 avg_rating = 0.0
                 rating_count = 0
@@ -256,19 +840,70 @@ class Recommendations:
                 min(top_n, RecommendationConfig.MAX_RECOMMENDATIONS),
             )
 
-            self.stats["total_requests"] += 1
+            with self._stats_lock:
+                self.stats["total_requests"] += 1
 
             logger.info(f"Generating recommendations for user {user_id}, top_n={top_n}")
 
-            # Load and validate data
-            if not self._load_and_validate_data():
+            # Load and validate data; the request reads this snapshot throughout
+            with latency_recorder.time("data_load"):
+                snapshot = self._get_snapshot()
+            if snapshot is None:
                 logger.error("Failed to load or validate data")
                 return []
 
+            # Serve repeated requests from the result cache
+            cache_key = (user_id, top_n, self.alpha, snapshot.version)
+            cached_recommendations = self.result_cache.get(cache_key)
+            if cached_recommendations is not None:
+                self._record_success(user_id, cached_recommendations, start_time)
+                return cached_recommendations
+
             # Get user context
-            user_context = self._get_user_context(user_id)
+            user_context = self._get_user_context(user_id, snapshot)
             exclude_foods = user_context["rated_foods"]
 
+            # Users with too few ratings: precomputed ranking, no model at all
+            if self._is_cold_user(user_id, snapshot):
+                with latency_recorder.time("cold_start"):
+                    cold_start_recommendations = self._recommend_cold_start(
+                        snapshot, {user_id: exclude_foods}, top_n
+                    ).get(user_id)
+                if cold_start_recommendations:
+                    detailed_recommendations = self._format_recommendations(
+                        cold_start_recommendations
+                    )
+                    self._cache_result(snapshot, cache_key, detailed_recommendations)
+                    self._record_success(user_id, detailed_recommendations, start_time)
+                    return detailed_recommendations
+
+                logger.info(
+                    f"No cold start ranking for user {user_id}, "
+                    "falling back to the models"
+                )
+
+            # Serve from the global model by fold-in when available
+            if self.use_global_model:
+                snapshot = self._ensure_global_model(snapshot)
+
+            if self.use_global_model and snapshot.has_global_model:
+                with latency_recorder.time("global_scoring"):
+                    global_recommendations = self._recommend_from_global_model(
+                        snapshot, user_id, top_n, exclude_foods
+                    )
+                if global_recommendations:
+                    detailed_recommendations = self._format_recommendations(
+                        global_recommendations
+                    )
+                    self._cache_result(snapshot, cache_key, detailed_recommendations)
+                    self._record_success(user_id, detailed_recommendations, start_time)
+                    return detailed_recommendations
+
+                logger.info(
+                    f"Global model returned no recommendations for user {user_id}, "
+                    "falling back to local SVD"
+                )
+
             # Create local dataset with similar users
             try:
                 sub_ratings_df, sub_pivot_matrix = (
@@ -277,6 +912,7 @@ class Recommendations:
                         top_k_users=50,
                         similarity_method="cosine",
                         similarity_threshold=0.2,
+                        ratings_store=snapshot.ratings_store,
                     )
                 )
 
@@ -288,19 +924,31 @@ class Recommendations:
                 logger.error(f"Error creating local dataset: {e}")
                 return []
 
-            # Train SVD model on local dataset
+            # Train a request-scoped SVD model on the local dataset
+            svd_model = LocalSVDModel(
+                n_components=self.svd_model.n_components,
+                random_state=self.svd_model.random_state,
+            )
             try:
-                if not self.svd_model.fit(sub_pivot_matrix):
+                with latency_recorder.time("fit"):
+                    fitted = svd_model.fit(sub_pivot_matrix)
+                if not fitted:
                     logger.warning("SVD training failed, no recommendations available")
                     return []
 
+                self.svd_model = svd_model
+
             except Exception as e:
                 logger.error(f"Error training SVD model: {e}")
                 return []
 
+            # Index encoders of the local dataset
+            user_encoder = IdEncoder(sub_pivot_matrix.index)
+            food_encoder = IdEncoder(sub_pivot_matrix.columns)
+
             # Get user index in the local dataset
             try:
-                user_idx = self.data_processor.user_mapping.get(user_id)
+                user_idx = user_encoder.get(user_id)
                 if user_idx is None:
                     logger.warning(f"User {user_id} not found in local dataset mapping")
                     return []
@@ -312,18 +960,19 @@ class Recommendations:
             # Get item indices to exclude
             exclude_item_indices = []
             for food_id in exclude_foods:
-                item_idx = self.data_processor.food_mapping.get(food_id)
+                item_idx = food_encoder.get(food_id)
                 if item_idx is not None:
                     exclude_item_indices.append(item_idx)
 
             # Generate recommendations using SVD
             try:
-                recommendations = self.svd_model.get_top_recommendations(
-                    user_idx=user_idx,
-                    top_n=top_n,
-                    exclude_items=exclude_item_indices,
-                    min_rating=RecommendationConfig.MIN_RATING_THRESHOLD,
-                )
+                with latency_recorder.time("scoring"):
+                    recommendations = svd_model.get_top_recommendations(
+                        user_idx=user_idx,
+                        top_n=top_n,
+                        exclude_items=exclude_item_indices,
+                        min_rating=RecommendationConfig.MIN_RATING_THRESHOLD,
+                    )
 
                 if len(recommendations) == 0:
                     logger.warning("No SVD recommendations generated")
@@ -336,7 +985,7 @@ class Recommendations:
             # Convert item indices to food IDs with predicted ratings
             detailed_recommendations = []
             for rank, (item_idx, predicted_rating) in enumerate(recommendations, 1):
-                food_id = self.data_processor.reverse_food_mapping.get(item_idx)
+                food_id = food_encoder.get_id(item_idx)
                 if food_id and food_id not in exclude_foods:
                     detailed_recommendations.append(
                         {
@@ -346,29 +995,205 @@ class Recommendations:
                         }
                     )
 
-            # Update statistics
+            if detailed_recommendations:
+                self._cache_result(snapshot, cache_key, detailed_recommendations)
+            self._record_success(user_id, detailed_recommendations, start_time)
+            return detailed_recommendations
+
+        except Exception as e:
+            logger.error(f"Error in recommend_with_scores method: {e}")
             processing_time = time.time() - start_time
-            self.stats["successful_recommendations"] += 1
-            self.stats["avg_processing_time"] = (
-                self.stats["avg_processing_time"] * (self.stats["total_requests"] - 1)
-                + processing_time
-            ) / self.stats["total_requests"]
+            with self._stats_lock:
+                self.stats["avg_processing_time"] = (
+                    self.stats["avg_processing_time"]
+                    * (self.stats["total_requests"] - 1)
+                    + processing_time
+                ) / self.stats["total_requests"]
+            return []
+
+        finally:
+            latency_recorder.record("total", time.time() - start_time)
+
+    def recommend_many(
+        self, user_ids: List[str], top_n: int = 5
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Generate detailed recommendations for many users from one data snapshot
+
+        Users are served from the result cache first, cold users from the
+        precomputed cold start ranking, the rest are scored together by the global
+        model in matrix blocks. Users the global model cannot serve fall back to
+        recommend_with_scores.
+
+        Args:
+            user_ids: User IDs to generate recommendations for
+            top_n: Number of recommendations per user (1-50)
+
+        Returns:
+            Dict[str, List[Dict]]: user_id -> recommendation dicts in the same format
+                as recommend_with_scores
+        """
+        start_time = time.time()
+
+        try:
+            # Drop empty and duplicate IDs, keeping request order
+            user_ids = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+            if not user_ids:
+                return {}
+
+            top_n = max(
+                RecommendationConfig.MIN_RECOMMENDATIONS,
+                min(top_n, RecommendationConfig.MAX_RECOMMENDATIONS),
+            )
 
             logger.info(
-                f"Generated {len(detailed_recommendations)} recommendations for user {user_id} "
-                f"in {processing_time:.3f}s"
+                f"Generating batch recommendations for {len(user_ids)} users, top_n={top_n}"
             )
 
-            return detailed_recommendations
+            with latency_recorder.time("data_load"):
+                snapshot = self._get_snapshot()
+            if snapshot is None:
+                logger.error("Failed to load or validate data")
+                return {}
+
+            results = {}
+            pending_user_ids = []
+            for user_id in user_ids:
+                cached_recommendations = self.result_cache.get(
+                    (user_id, top_n, self.alpha, snapshot.version)
+                )
+                if cached_recommendations is not None:
+                    results[user_id] = cached_recommendations
+                else:
+                    pending_user_ids.append(user_id)
+
+            users_ratings = {
+                user_id: snapshot.ratings_store.get_user_ratings(user_id)
+                for user_id in pending_user_ids
+            }
+            # Same test as recommend_with_scores, so both paths agree per user
+            cold_users_exclude_foods = {
+                user_id: list(users_ratings[user_id])
+                for user_id in pending_user_ids
+                if self._is_cold_user(user_id, snapshot)
+            }
+            if cold_users_exclude_foods:
+                with latency_recorder.time("cold_start"):
+                    cold_start_results = self._recommend_cold_start(
+                        snapshot, cold_users_exclude_foods, top_n
+                    )
+                for user_id, cold_start_recommendations in cold_start_results.items():
+                    if not cold_start_recommendations:
+                        continue
+                    detailed_recommendations = self._format_recommendations(
+                        cold_start_recommendations
+                    )
+                    self._cache_result(
+                        snapshot,
+                        (user_id, top_n, self.alpha, snapshot.version),
+                        detailed_recommendations,
+                    )
+                    results[user_id] = detailed_recommendations
+                pending_user_ids = [
+                    user_id for user_id in pending_user_ids if user_id not in results
+                ]
+
+            if pending_user_ids and self.use_global_model:
+                snapshot = self._ensure_global_model(snapshot)
+
+            if pending_user_ids and self.use_global_model and snapshot.has_global_model:
+                with latency_recorder.time("global_scoring"):
+                    global_results = snapshot.global_model.recommend_many(
+                        {
+                            user_id: users_ratings[user_id]
+                            for user_id in pending_user_ids
+                            if users_ratings[user_id]
+                        },
+                        top_n=top_n,
+                        min_rating=RecommendationConfig.MIN_RATING_THRESHOLD,
+                    )
+                for user_id, global_recommendations in global_results.items():
+                    if not global_recommendations:
+                        continue
+                    detailed_recommendations = self._format_recommendations(
+                        global_recommendations
+                    )
+                    self._cache_result(
+                        snapshot,
+                        (user_id, top_n, self.alpha, snapshot.version),
+                        detailed_recommendations,
+                    )
+                    results[user_id] = detailed_recommendations
+
+            served_count = len(results)
+            if served_count > 0:
+                # Spread the batch time over the users it served
+                per_user_time = (time.time() - start_time) / served_count
+                with self._stats_lock:
+                    previous_total = self.stats["total_requests"]
+                    self.stats["total_requests"] += served_count
+                    self.stats["successful_recommendations"] += served_count
+                    self.stats["avg_processing_time"] = (
+                        self.stats["avg_processing_time"] * previous_total
+                        + per_user_time * served_count
+                    ) / self.stats["total_requests"]
+
+            # Per-user local SVD for users the global model could not serve
+            fallback_user_ids = [
+                user_id for user_id in pending_user_ids if user_id not in results
+            ]
+            if fallback_user_ids:
+                logger.info(
+                    f"Falling back to local SVD for {len(fallback_user_ids)} users"
+                )
+            for user_id in fallback_user_ids:
+                results[user_id] = self.recommend_with_scores(user_id, top_n)
+
+            logger.info(
+                f"Generated batch recommendations for {len(user_ids)} users "
+                f"in {time.time() - start_time:.3f}s"
+            )
+            return {user_id: results.get(user_id, []) for user_id in user_ids}
 
         except Exception as e:
-            logger.error(f"Error in recommend_with_scores method: {e}")
-            processing_time = time.time() - start_time
+            logger.error(f"Error in recommend_many method: {e}")
+            return {}
+
+        finally:
+            latency_recorder.record("batch", time.time() - start_time)
+
+    def _format_recommendations(
+        self, recommendations: List[Tuple[str, float]]
+    ) -> List[Dict[str, Any]]:
+        """Convert (food_id, predicted_rating) tuples to ranked recommendation dicts"""
+        return [
+            {
+                "food_id": food_id,
+                "predicted_rating": round(float(predicted_rating), 3),
+                "rank": rank,
+            }
+            for rank, (food_id, predicted_rating) in enumerate(recommendations, 1)
+        ]
+
+    def _record_success(
+        self,
+        user_id: str,
+        detailed_recommendations: List[Dict[str, Any]],
+        start_time: float,
+    ) -> None:
+        """Update statistics after a successful recommendation request"""
+        processing_time = time.time() - start_time
+        with self._stats_lock:
+            self.stats["successful_recommendations"] += 1
             self.stats["avg_processing_time"] = (
                 self.stats["avg_processing_time"] * (self.stats["total_requests"] - 1)
                 + processing_time
             ) / self.stats["total_requests"]
-            return []
+
+        logger.info(
+            f"Generated {len(detailed_recommendations)} recommendations for user {user_id} "
+            f"in {processing_time:.3f}s"
+        )
 
     def get_recommendation_explanation(
         self, user_id: str, recommended_food_ids: List[str]
@@ -387,7 +1212,11 @@ class Recommendations:
             user_context = self._get_user_context(user_id)
 
             explanation = {
-                "method": "collaborative_filtering_svd",
+                "method": (
+                    "collaborative_filtering_svd_fold_in"
+                    if self.use_global_model and self.global_model.is_fitted
+                    else "collaborative_filtering_svd"
+                ),
                 "user_profile": {
                     "total_ratings": user_context["rating_count"],
                     "average_rating": round(user_context["avg_rating"], 2),
@@ -396,6 +1225,7 @@ class Recommendations:
                 "model_info": (
                     self.svd_model.get_model_info() if self.svd_model.is_fitted else {}
                 ),
+                "global_model_info": self.global_model.get_model_info(),
             }
 
             return explanation
@@ -427,18 +1257,63 @@ class Recommendations:
                 "cache_age": (
                     time.time() - self.last_data_load if self.last_data_load > 0 else 0
                 ),
+                "result_cache": self.result_cache.get_stats(),
+                "latency": latency_recorder.get_stats(),
+                "global_model": {
+                    "enabled": self.use_global_model,
+                    "fitted": self.global_model.is_fitted,
+                    "model_age": (
+                        time.time() - self.global_model.trained_at
+                        if self.global_model.is_fitted
+                        else 0
+                    ),
+                    "artifact_file": self.global_model.artifact_file,
+                },
+                "scheduler": (
+                    {
+                        "running": self.scheduler.is_running,
+                        "train": self.scheduler.train,
+                        "runs": self.scheduler.runs,
+                        "last_run_age": (
+                            time.time() - self.scheduler.last_run_at
+                            if self.scheduler.last_run_at > 0
+                            else None
+                        ),
+                        "last_error": self.scheduler.last_error,
+                    }
+                    if self.scheduler is not None
+                    else None
+                ),
             }
 
             # Add data statistics if available
-            if self.data_processor.ratings_df is not None:
-                df = self.data_processor.ratings_df
+            snapshot = self.snapshot
+            if snapshot is not None:
+                store = snapshot.ratings_store
+                # Ratings are stored as float32; round before counting values
+                ratings = store.ratings.astype(np.float64).round(3)
+                rating_values, rating_counts = np.unique(ratings, return_counts=True)
                 system_stats["data_stats"] = {
-                    "total_ratings": len(df),
-                    "unique_users": df["user_id"].nunique(),
-                    "unique_foods": df["food_id"].nunique(),
-                    "avg_rating": round(df["rating"].mean(), 2),
-                    "rating_distribution": df["rating"].value_counts().to_dict(),
+                    "total_ratings": len(store),
+                    "unique_users": store.n_users,
+                    "unique_foods": store.n_items,
+                    "avg_rating": round(float(ratings.mean()), 2) if len(store) else 0,
+                    "rating_distribution": dict(
+                        zip(rating_values.tolist(), rating_counts.tolist())
+                    ),
+                    "memory_usage": store.memory_usage(),
+                    "snapshot_version": snapshot.version,
                 }
+                system_stats["item_neighbors"] = (
+                    snapshot.item_neighbors.get_info()
+                    if snapshot.item_neighbors is not None
+                    else {"built": False}
+                )
+                system_stats["cold_start"] = (
+                    snapshot.cold_start.get_info()
+                    if snapshot.cold_start is not None
+                    else {"built": False}
+                )
 
             return system_stats
 
@@ -0,0 +1,139 @@
+"""
+Training Scheduler Module
+Background thread that refreshes the ratings snapshot and precomputed tables,
+retrains the global model on TRAINING_INTERVAL and hot-swaps new model artifacts
+into a serving process
+"""
+
+import threading
+import time
+from typing import Optional
+from app.utils.logger import get_logger
+from .config import RecommendationConfig
+
+logger = get_logger(__name__)
+
+
+class TrainingScheduler:
+    """
+    Keeps a Recommendations instance fresh off the request path
+    """
+
+    def __init__(
+        self,
+        app,
+        recommender,
+        train: bool = True,
+        poll_interval: Optional[float] = None,
+    ):
+        """
+        Initialize scheduler
+
+        Args:
+            app: Flask application, for the database session of each run
+            recommender: Recommendations instance to keep fresh
+            train: Train the global model in this process; if False, only
+                artifacts written by another process are swapped in
+            poll_interval: Seconds between runs (default from config)
+        """
+        self.app = app
+        self.recommender = recommender
+        self.train = train
+        self.poll_interval = (
+            poll_interval or RecommendationConfig.SCHEDULER_POLL_INTERVAL
+        )
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.runs = 0
+        self.last_run_at = 0.0
+        self.last_error = None
+        self._warned_no_artifact = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Attach to the recommender and start the background thread"""
+        if self.is_running:
+            return
+
+        self.recommender.scheduler = self
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="recommender-training", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Training scheduler started (train={self.train}, "
+            f"poll every {self.poll_interval}s)"
+        )
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background thread and detach from the recommender
+
+        Args:
+            timeout: Seconds to wait for a running refresh to finish
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.recommender.scheduler is self:
+            self.recommender.scheduler = None
+        logger.info("Training scheduler stopped")
+
+    def _run(self) -> None:
+        """Thread body: run once right away, then every poll_interval"""
+        while True:
+            self.run_once()
+            if self._stop_event.wait(self.poll_interval):
+                break
+
+    def run_once(self) -> bool:
+        """
+        Refresh the ratings snapshot and precomputed tables, then swap in a newer
+        artifact or retrain the global model when it is due
+
+        Returns:
+            bool: True if the run completed without errors
+        """
+        try:
+            with self.app.app_context():
+                if not self.recommender.refresh_data():
+                    logger.warning("Training scheduler: no ratings data available")
+                    return False
+
+                self.recommender.refresh_item_neighbors()
+                self.recommender.refresh_cold_start_ranking()
+
+                # Another process may already have trained a newer version
+                self.recommender.load_latest_global_model()
+
+                if self.train and self.recommender.global_model.needs_training():
+                    logger.info("Training scheduler: retraining global SVD model")
+                    self.recommender.train_global_model()
+                elif (
+                    not self.train
+                    and not self.recommender.snapshot.has_global_model
+                    and not self._warned_no_artifact
+                ):
+                    # Requests fall back to per-user local SVD until one appears
+                    logger.warning(
+                        "Training scheduler: no global model artifact yet; run "
+                        "`flask recommender train --loop` as the single trainer"
+                    )
+                    self._warned_no_artifact = True
+
+            self.runs += 1
+            self.last_run_at = time.time()
+            self.last_error = None
+            return True
+
+        except Exception as e:
+            logger.error(f"Error in training scheduler run: {e}")
+            self.last_error = str(e)
+            return False
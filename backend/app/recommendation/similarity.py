@@ -7,8 +7,9 @@ import numpy as np
 import pandas as pd
 from scipy.sparse import csr_matrix
 from scipy.spatial.distance import cosine
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Union
 from app.utils.logger import get_logger
+from .ratings_store import RatingMatrix, as_rating_matrix
 
 logger = get_logger(__name__)
 
@@ -78,8 +79,135 @@ def cosine_similarity_sparse(
         return 0.0
 
 
+def build_user_item_matrix(
+    ratings: Union[pd.DataFrame, RatingMatrix],
+) -> Tuple[csr_matrix, List[str], List[str]]:
+    """
+    Build a sparse user-item matrix straight from ratings rows
+
+    Args:
+        ratings: DataFrame with columns [user_id, food_id, rating] or a RatingMatrix
+
+    Returns:
+        Tuple[csr_matrix, List[str], List[str]]: (matrix, user_ids, food_ids) with rows
+            and columns in sorted ID order, like DataFrame.pivot
+    """
+    rating_matrix = as_rating_matrix(ratings)
+    return (
+        csr_matrix(rating_matrix.matrix, dtype=np.float64),
+        list(rating_matrix.index),
+        list(rating_matrix.columns),
+    )
+
+
+def common_item_cosine(
+    user_matrix: csr_matrix,
+    target_users: Union[int, np.ndarray, None] = None,
+    min_common_items: int = 2,
+) -> np.ndarray:
+    """
+    Batched cosine similarity restricted to co-rated items, computed with sparse
+    products instead of one cosine_similarity_sparse call per user pair
+
+    For users u and v with common items C:
+        sim(u, v) = sum_C(u*v) / sqrt(sum_C(u^2) * sum_C(v^2))
+
+    Args:
+        user_matrix: Sparse user-item matrix
+        target_users: One user index (returns a 1-D row), an array of user indices
+            (returns a block of rows) or None for all pairs
+        min_common_items: Minimum number of common items required
+
+    Returns:
+        np.ndarray: Similarity scores; 0 on the diagonal, for pairs below
+            min_common_items and where the cosine is undefined
+    """
+    ratings = csr_matrix(user_matrix, dtype=np.float64, copy=True)
+    ratings.data[ratings.data <= 0] = 0.0
+    ratings.eliminate_zeros()
+
+    rated = ratings.copy()
+    rated.data = np.ones_like(rated.data)
+    squared = ratings.multiply(ratings).tocsr()
+
+    single_target = np.isscalar(target_users)
+    if target_users is None:
+        rows = np.arange(ratings.shape[0])
+    else:
+        rows = np.atleast_1d(np.asarray(target_users, dtype=np.int64))
+
+    dot = (ratings[rows] @ ratings.T).toarray()
+    common = (rated[rows] @ rated.T).toarray()
+    target_norm = (squared[rows] @ rated.T).toarray()
+    other_norm = (rated[rows] @ squared.T).toarray()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Same formula and clipping as scipy.spatial.distance.cosine
+        distance = np.clip(1.0 - dot / np.sqrt(target_norm * other_norm), 0.0, 2.0)
+        scores = 1.0 - distance
+
+    valid = (common >= min_common_items) & (target_norm > 0) & (other_norm > 0)
+    scores = np.where(valid & ~np.isnan(scores), scores, 0.0)
+    scores[np.arange(len(rows)), rows] = 0.0
+
+    return scores[0] if single_target else scores
+
+
+def calculate_similarity_scores(
+    user_matrix: csr_matrix,
+    target_user_idx: int,
+    min_common_items: int = 2,
+) -> np.ndarray:
+    """
+    Calculate cosine similarity on common items between target user and every user
+
+    Args:
+        user_matrix: Sparse user-item matrix
+        target_user_idx: Index of target user
+        min_common_items: Minimum number of common items required
+
+    Returns:
+        np.ndarray: Similarity per user index (0 for the target user and for users
+            below min_common_items)
+    """
+    return common_item_cosine(
+        user_matrix, int(target_user_idx), min_common_items=min_common_items
+    )
+
+
+def common_item_jaccard(
+    user_matrix: csr_matrix, target_user_idx: int, min_common_items: int = 2
+) -> np.ndarray:
+    """
+    Jaccard similarity of the rated-food sets of a target user and every user,
+    computed with one sparse product
+
+    Args:
+        user_matrix: Sparse user-item matrix (any stored entry counts as rated)
+        target_user_idx: Index of target user
+        min_common_items: Minimum number of common items required
+
+    Returns:
+        np.ndarray: Similarity per user index (0 for the target user and for users
+            below min_common_items)
+    """
+    rated = csr_matrix(user_matrix, dtype=np.float64, copy=True)
+    rated.data = np.ones_like(rated.data)
+
+    common = (rated[target_user_idx] @ rated.T).toarray()[0]
+    rated_counts = np.diff(rated.indptr)
+    union = rated_counts[target_user_idx] + rated_counts - common
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(union > 0, common / union, 0.0)
+
+    scores[common < min_common_items] = 0.0
+    scores[target_user_idx] = 0.0
+    return scores
+
+
 def calculate_user_similarities(
-    ratings_df: pd.DataFrame,
+    ratings: Union[pd.DataFrame, RatingMatrix],
     target_user_id: str,
     method: str = "cosine",  # PERBAIKAN: Default ke cosine
     min_common_items: int = 2,
@@ -88,7 +216,7 @@ def calculate_user_similarities(
     Calculate similarities between target user and all other users - PERBAIKAN: Enhance cosine dengan common mask
 
     Args:
-        ratings_df: DataFrame with columns [user_id, food_id, rating]
+        ratings: DataFrame with columns [user_id, food_id, rating] or a RatingMatrix
         target_user_id: ID of the target user
         method: Similarity method ('jaccard' or 'cosine')
         min_common_items: Minimum number of common items required
@@ -97,75 +225,31 @@ def calculate_user_similarities(
         Dict[str, float]: Dictionary mapping user_id to similarity score
     """
     try:
+        sparse_matrix, user_ids, _ = build_user_item_matrix(ratings)
+
         # Check if target user exists
-        if target_user_id not in ratings_df["user_id"].values:
+        if target_user_id not in user_ids:
             logger.warning(f"Target user {target_user_id} not found in ratings data")
             return {}
 
+        target_idx = user_ids.index(target_user_id)
         similarities = {}
 
         if method == "jaccard":
-            # Get target user's rated foods
-            target_foods = set(
-                ratings_df[ratings_df["user_id"] == target_user_id]["food_id"]
+            # Overlap of rated-food sets against every user in one sparse product
+            scores = common_item_jaccard(
+                sparse_matrix, target_idx, min_common_items=min_common_items
             )
-
-            # Calculate Jaccard similarity with each other user
-            for user_id in ratings_df["user_id"].unique():
-                if user_id == target_user_id:
-                    continue
-
-                user_foods = set(
-                    ratings_df[ratings_df["user_id"] == user_id]["food_id"]
-                )
-
-                # Check minimum common items
-                common_items = len(target_foods.intersection(user_foods))
-                if common_items < min_common_items:
-                    continue
-
-                similarity = jaccard_similarity(target_foods, user_foods)
-                if similarity > 0:
-                    similarities[user_id] = similarity
+            for idx in np.flatnonzero(scores > 0):
+                similarities[user_ids[idx]] = float(scores[idx])
 
         elif method == "cosine":
-            # Create user-item matrix
-            user_item_matrix = ratings_df.pivot(
-                index="user_id", columns="food_id", values="rating"
-            ).fillna(0)
-
-            # Convert to sparse matrix
-            sparse_matrix = csr_matrix(user_item_matrix.values)
-
-            # Get target user index
-            try:
-                target_idx = user_item_matrix.index.get_loc(target_user_id)
-            except KeyError:
-                logger.warning(
-                    f"Target user {target_user_id} not found in pivot matrix"
-                )
-                return {}
-
-            # Calculate cosine similarity with each other user
-            for idx, user_id in enumerate(user_item_matrix.index):
-                if user_id == target_user_id:
-                    continue
-
-                # Check if users have enough common ratings
-                target_ratings = user_item_matrix.iloc[target_idx]
-                user_ratings = user_item_matrix.iloc[idx]
-                common_mask = ((target_ratings > 0) & (user_ratings > 0)).values
-                common_items = np.sum(common_mask)
-
-                if common_items < min_common_items:
-                    continue
-
-                # PERBAIKAN: Pass common_mask ke cosine untuk subset calculation
-                similarity = cosine_similarity_sparse(
-                    sparse_matrix, target_idx, idx, common_mask
-                )
-                if similarity > 0:
-                    similarities[user_id] = similarity
+            # Cosine on common items against every user in one batched kernel
+            scores = common_item_cosine(
+                sparse_matrix, target_idx, min_common_items=min_common_items
+            )
+            for idx in np.flatnonzero(scores > 0):
+                similarities[user_ids[idx]] = float(scores[idx])
 
         else:
             raise ValueError(f"Unknown similarity method: {method}")
@@ -181,7 +265,7 @@ def calculate_user_similarities(
 
 
 def get_similar_users(
-    ratings_df: pd.DataFrame,
+    ratings: Union[pd.DataFrame, RatingMatrix],
     target_user_id: str,
     top_k: int = 50,
     similarity_threshold: float = 0.1,
@@ -192,7 +276,7 @@ def get_similar_users(
     Get top-K most similar users to target user
 
     Args:
-        ratings_df: DataFrame with columns [user_id, food_id, rating]
+        ratings: DataFrame with columns [user_id, food_id, rating] or a RatingMatrix
         target_user_id: ID of the target user
         top_k: Number of top similar users to return
         similarity_threshold: Minimum similarity score threshold
@@ -205,7 +289,7 @@ def get_similar_users(
     try:
         # Calculate similarities
         similarities = calculate_user_similarities(
-            ratings_df, target_user_id, method=method, min_common_items=min_common_items
+            ratings, target_user_id, method=method, min_common_items=min_common_items
         )
 
         # Filter by threshold and sort
@@ -231,35 +315,38 @@ def get_similar_users(
 
 
 def validate_similarity_calculation(
-    ratings_df: pd.DataFrame, sample_size: int = 5
+    ratings: Union[pd.DataFrame, RatingMatrix], sample_size: int = 5
 ) -> bool:
     """
     Validate similarity calculation with a small sample - PERBAIKAN: Tambah test cosine + SVD
 
     Args:
-        ratings_df: DataFrame with columns [user_id, food_id, rating]
+        ratings: DataFrame with columns [user_id, food_id, rating] or a RatingMatrix
         sample_size: Number of users to test
 
     Returns:
         bool: True if validation passes
     """
     try:
-        if len(ratings_df) == 0:
+        if len(ratings) == 0:
             logger.warning("Empty ratings dataframe for validation")
             return False
 
+        # Build the sparse matrix once for every sample user
+        rating_matrix = as_rating_matrix(ratings)
+
         # Get sample users
-        sample_users = ratings_df["user_id"].unique()[:sample_size]
+        sample_users = list(rating_matrix.index[:sample_size])
 
         for user_id in sample_users:
             # Test Cosine similarity (fokus utama)
             cosine_similarities = get_similar_users(
-                ratings_df, user_id, top_k=5, method="cosine"
+                rating_matrix, user_id, top_k=5, method="cosine"
             )
 
             # Test Jaccard sebagai backup
             jaccard_similarities = get_similar_users(
-                ratings_df, user_id, top_k=5, method="jaccard"
+                rating_matrix, user_id, top_k=5, method="jaccard"
             )
 
             logger.info(
@@ -268,23 +355,14 @@ def validate_similarity_calculation(
 
             # PERBAIKAN: Simple SVD test pada sample sub-dataset
             if len(cosine_similarities) > 0:
-                sub_df = ratings_df[
-                    ratings_df["user_id"].isin(
-                        [user_id] + [u[0] for u in cosine_similarities[:3]]
-                    )
-                ]
-                if len(sub_df) > 5:
+                sub_matrix = rating_matrix.select_users(
+                    [user_id] + [u[0] for u in cosine_similarities[:3]]
+                )
+                if sub_matrix.nnz > 5:
                     from .local_model import LocalSVDModel
 
                     svd = LocalSVDModel()
-                    pivot = pd.pivot_table(
-                        sub_df,
-                        index="user_id",
-                        columns="food_id",
-                        values="rating",
-                        fill_value=0,
-                    )
-                    svd.fit(pivot)
+                    svd.fit(sub_matrix)
                     logger.debug(
                         f"SVD test on sample for {user_id}: fitted={svd.is_fitted}"
                     )
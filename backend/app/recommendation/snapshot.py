@@ -0,0 +1,82 @@
+"""
+Recommendation Snapshot Module
+Immutable view of the ratings data, global model and precomputed tables that
+requests are served from
+"""
+
+import time
+from typing import Optional
+from .cold_start import ColdStartRanking
+from .global_model import GlobalSVDModel
+from .item_neighbors import ItemNeighborTable
+from .ratings_store import RatingsStore
+
+
+class RecommendationSnapshot:
+    """
+    Read-only bundle of ratings store, global model, precomputed tables and data
+    version
+
+    Writers never modify a published snapshot; they build a new one with
+    replace() and swap the reference, so a request that took a snapshot reads
+    consistent data even while a reload or retraining runs in another thread.
+    """
+
+    __slots__ = (
+        "ratings_store",
+        "global_model",
+        "item_neighbors",
+        "cold_start",
+        "version",
+        "loaded_at",
+    )
+
+    def __init__(
+        self,
+        ratings_store: RatingsStore,
+        global_model: Optional[GlobalSVDModel] = None,
+        item_neighbors: Optional[ItemNeighborTable] = None,
+        cold_start: Optional[ColdStartRanking] = None,
+        version: int = 0,
+        loaded_at: Optional[float] = None,
+    ):
+        """
+        Initialize snapshot
+
+        Args:
+            ratings_store: Encoded ratings snapshot
+            global_model: Fitted global model, or None if not available yet
+            item_neighbors: Item neighbor table, or None if not built yet
+            cold_start: Cold start ranking, or None if not built yet
+            version: Data version, part of the result cache key
+            loaded_at: Time of the last full reload (default: now)
+        """
+        object.__setattr__(self, "ratings_store", ratings_store)
+        object.__setattr__(self, "global_model", global_model)
+        object.__setattr__(self, "item_neighbors", item_neighbors)
+        object.__setattr__(self, "cold_start", cold_start)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(
+            self, "loaded_at", loaded_at if loaded_at is not None else time.time()
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RecommendationSnapshot is immutable, use replace()")
+
+    def replace(self, **changes) -> "RecommendationSnapshot":
+        """
+        Get a copy of the snapshot with some fields replaced
+
+        Args:
+            **changes: Field values to replace
+
+        Returns:
+            RecommendationSnapshot: New snapshot
+        """
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return RecommendationSnapshot(**fields)
+
+    @property
+    def has_global_model(self) -> bool:
+        return self.global_model is not None and self.global_model.is_fitted
@@ -0,0 +1,99 @@
+"""
+Script untuk benchmark waktu training LocalSVDModel terhadap ukuran matrix
+
+Membuat matrix rating acak (user x item) dengan sparsity tertentu, lalu mengukur:
+- Waktu _prepare_matrix (perhitungan bias + centering)
+- Waktu fit total (prepare + TruncatedSVD)
+
+Tidak membutuhkan database.
+
+Usage:
+    python simulate/benchmark_svd_fit.py
+    python simulate/benchmark_svd_fit.py --sizes 100x200 1000x2000 --density 0.05
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pandas as pd
+from app.recommendation.local_model import LocalSVDModel
+
+DEFAULT_SIZES = ["50x100", "200x500", "1000x2000", "3000x5000"]
+
+
+def print_section(title):
+    """Print section separator"""
+    print(f"\n{'=' * 80}")
+    print(f"  {title}")
+    print(f"{'=' * 80}\n")
+
+
+def make_pivot_matrix(
+    n_users: int, n_items: int, density: float, rng: np.random.Generator
+) -> pd.DataFrame:
+    """Create random user-item pivot matrix with ratings 1-5 (0 = not rated)"""
+    ratings = rng.integers(1, 6, size=(n_users, n_items)).astype(np.float32)
+    observed = rng.random((n_users, n_items)) < density
+    return pd.DataFrame(np.where(observed, ratings, 0.0))
+
+
+def time_call(func, repeat: int) -> float:
+    """Return best wall time of func over repeat runs (seconds)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(sizes, density: float, repeat: int, seed: int):
+    """Run fit benchmark for every matrix size"""
+    print_section("⏱️  BENCHMARK LocalSVDModel.fit vs MATRIX SIZE")
+
+    rng = np.random.default_rng(seed)
+    print(f"Density: {density:.1%}, repeat: {repeat} (best of)\n")
+    print(
+        f"{'Users':>8} {'Items':>8} {'Ratings':>10} {'Prepare (ms)':>14} {'Fit (ms)':>12}"
+    )
+    print(f"{'-' * 56}")
+
+    for size in sizes:
+        n_users, n_items = (int(x) for x in size.lower().split("x"))
+        pivot_matrix = make_pivot_matrix(n_users, n_items, density, rng)
+        n_ratings = int((pivot_matrix.values > 0).sum())
+
+        model = LocalSVDModel()
+        prepare_time = time_call(lambda: model._prepare_matrix(pivot_matrix), repeat)
+        fit_time = time_call(lambda: LocalSVDModel().fit(pivot_matrix), repeat)
+
+        print(
+            f"{n_users:>8} {n_items:>8} {n_ratings:>10} "
+            f"{prepare_time * 1000:>14.2f} {fit_time * 1000:>12.2f}"
+        )
+
+    print_section("✅ BENCHMARK COMPLETED")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark LocalSVDModel.fit")
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Matrix sizes as USERSxITEMS (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--density", type=float, default=0.05, help="Fraction of rated cells"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    benchmark(args.sizes, args.density, args.repeat, args.seed)
@@ -0,0 +1,631 @@
+"""
+Script untuk membuat dataset rating sintetis berskala besar (load testing recommender)
+
+Dataset parametris dengan struktur yang mirip data produksi:
+- Users, restaurants, foods dan categories (satu category per taste cluster)
+- Jumlah rating per user mengikuti distribusi power-law (Pareto)
+- Popularitas food mengikuti distribusi Zipf
+- Taste cluster laten: user lebih sering merating (dan menilai lebih tinggi)
+  food dari cluster-nya sendiri
+- Restaurant rating untuk sebagian pasangan (user, restaurant) yang dirating
+- Favorite categories per user
+
+User diproses per chunk dan hasilnya langsung di-stream ke CSV/Parquet atau
+di-bulk-load ke database, sehingga puluhan juta rating tidak perlu muat di memory.
+
+Usage:
+    python simulate/generate_synthetic_ratings.py --preset 10k --output data/synthetic_10k
+    python simulate/generate_synthetic_ratings.py --preset 1m --format parquet --output data/synthetic_1m
+    python simulate/generate_synthetic_ratings.py --users 50000 --foods 5000 --format db
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pandas as pd
+
+# Users / foods / restaurants / mean ratings per user per benchmark scale
+PRESETS = {
+    "10k": {"users": 10_000, "foods": 2_000, "restaurants": 200, "mean_ratings": 20},
+    "100k": {"users": 100_000, "foods": 10_000, "restaurants": 1_000, "mean_ratings": 25},
+    "1m": {"users": 1_000_000, "foods": 50_000, "restaurants": 5_000, "mean_ratings": 30},
+}
+
+CRITERIA = ["flavor", "serving", "price", "place"]
+
+# Output tables in load order (foreign keys first)
+TABLES = [
+    "categories",
+    "restaurants",
+    "restaurant_categories",
+    "foods",
+    "users",
+    "user_favorite_categories",
+    "food_ratings",
+    "restaurant_ratings",
+]
+
+
+def print_section(title):
+    """Print section separator"""
+    print(f"\n{'=' * 80}")
+    print(f"  {title}")
+    print(f"{'=' * 80}\n")
+
+
+def uuid_strings(rng: np.random.Generator, n: int) -> list:
+    """Generate n random (version 4) UUID strings from the generator"""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    hexes = raw.tobytes().hex()
+    return [
+        f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
+        for h in (hexes[i * 32 : (i + 1) * 32] for i in range(n))
+    ]
+
+
+class SyntheticRatingsGenerator:
+    """
+    Parametric generator of catalog, users and ratings, streamed per user chunk
+    """
+
+    GLOBAL_MEAN = 3.6  # Mean rating before biases and taste
+    N_FACTORS = 8  # Dimension of the latent taste vectors
+    OVERSAMPLE = 1.5  # Food draws per rating, duplicates are dropped
+    TOP_UP_ROUNDS = 3  # Popularity-weighted rounds before a uniform one
+
+    def __init__(self, args: argparse.Namespace):
+        """
+        Initialize generator
+
+        Args:
+            args: Parsed command line arguments
+        """
+        self.args = args
+        self.rng = np.random.default_rng(args.seed)
+        self.n_clusters = args.clusters
+
+        # Taste cluster centroids; users and foods scatter around them
+        self.centroids = self.rng.normal(
+            0.0, 1.0, (self.n_clusters, self.N_FACTORS)
+        ) / np.sqrt(self.N_FACTORS)
+        self.ratings_scale = self._calibrate_ratings_scale()
+
+    def generate_catalog(self) -> dict:
+        """
+        Generate categories, restaurants and foods
+
+        Returns:
+            dict: table name -> DataFrame
+        """
+        args, rng = self.args, self.rng
+
+        category_ids = uuid_strings(rng, self.n_clusters)
+        categories = pd.DataFrame(
+            {
+                "id": category_ids,
+                "name": [f"Synthetic Category {c + 1}" for c in range(self.n_clusters)],
+                "description": "Synthetic taste cluster",
+                "is_active": True,
+            }
+        )
+
+        # Restaurants: one taste cluster each, plus a service quality bias
+        restaurant_cluster = rng.integers(0, self.n_clusters, args.restaurants)
+        self.restaurant_bias = rng.normal(0.0, 0.3, args.restaurants)
+        restaurant_ids = uuid_strings(rng, args.restaurants)
+        restaurants = pd.DataFrame(
+            {
+                "id": restaurant_ids,
+                "name": [f"Synthetic Restaurant {i + 1}" for i in range(args.restaurants)],
+                "address": [f"Synthetic Street {i + 1}" for i in range(args.restaurants)],
+                "latitude": -3.99 + rng.normal(0.0, 0.05, args.restaurants),
+                "longitude": 122.51 + rng.normal(0.0, 0.05, args.restaurants),
+                "is_active": True,
+            }
+        )
+        restaurant_categories = pd.DataFrame(
+            {
+                "restaurant_id": restaurant_ids,
+                "category_id": np.asarray(category_ids, dtype=object)[
+                    restaurant_cluster
+                ],
+            }
+        )
+
+        # Foods: cluster of their restaurant, Zipf popularity in random order
+        self.food_restaurant = rng.integers(0, args.restaurants, args.foods)
+        self.food_cluster = restaurant_cluster[self.food_restaurant]
+        self.food_bias = rng.normal(0.0, 0.4, args.foods)
+        self.food_vectors = self.centroids[self.food_cluster] + rng.normal(
+            0.0, 0.5 / np.sqrt(self.N_FACTORS), (args.foods, self.N_FACTORS)
+        )
+        popularity = rng.permutation(
+            1.0 / np.arange(1, args.foods + 1) ** args.popularity_skew
+        )
+        self.food_ids = np.asarray(uuid_strings(rng, args.foods), dtype=object)
+        foods = pd.DataFrame(
+            {
+                "id": self.food_ids,
+                "name": [f"Synthetic Food {i + 1}" for i in range(args.foods)],
+                "price": np.round(rng.lognormal(np.log(25000), 0.4, args.foods), -2),
+                "restaurant_id": np.asarray(restaurant_ids, dtype=object)[
+                    self.food_restaurant
+                ],
+            }
+        )
+
+        # Popularity CDFs over all foods and over the foods of every cluster
+        self.global_cdf = np.cumsum(popularity)
+        self.cluster_foods = []
+        self.cluster_cdfs = []
+        for cluster in range(self.n_clusters):
+            foods_in_cluster = np.flatnonzero(self.food_cluster == cluster)
+            self.cluster_foods.append(foods_in_cluster)
+            self.cluster_cdfs.append(np.cumsum(popularity[foods_in_cluster]))
+
+        self.category_ids = np.asarray(category_ids, dtype=object)
+        self.restaurant_ids = np.asarray(restaurant_ids, dtype=object)
+
+        return {
+            "categories": categories,
+            "restaurants": restaurants,
+            "restaurant_categories": restaurant_categories,
+            "foods": foods,
+        }
+
+    def _pareto_counts(self, uniform: np.ndarray, scale: float) -> np.ndarray:
+        """Power-law (Pareto) number of ratings for uniform samples"""
+        args = self.args
+        counts = np.floor(scale * (1.0 - uniform) ** (-1.0 / args.power_law_exponent))
+        max_ratings = min(args.max_ratings, args.foods)
+        return np.clip(counts, args.min_ratings, max_ratings).astype(np.int64)
+
+    def _calibrate_ratings_scale(self) -> float:
+        """Pareto scale whose floored and clipped counts average mean_ratings"""
+        quantiles = (np.arange(100_000) + 0.5) / 100_000
+        low, high = 1e-3, float(self.args.mean_ratings)
+        while self._pareto_counts(quantiles, high).mean() < self.args.mean_ratings:
+            if high > 1e9:
+                break
+            high *= 2.0
+        for _ in range(50):
+            middle = (low + high) / 2.0
+            if self._pareto_counts(quantiles, middle).mean() < self.args.mean_ratings:
+                low = middle
+            else:
+                high = middle
+        return high
+
+    def _ratings_per_user(self, n_users: int) -> np.ndarray:
+        """Power-law number of ratings per user around the requested mean"""
+        return self._pareto_counts(self.rng.random(n_users), self.ratings_scale)
+
+    def _sample_foods(self, rating_clusters: np.ndarray) -> np.ndarray:
+        """Sample one food per rating by popularity, mostly from the user's cluster"""
+        rng = self.rng
+        foods = np.empty(len(rating_clusters), dtype=np.int64)
+        in_cluster = rng.random(len(rating_clusters)) < self.args.cluster_affinity
+
+        for cluster in range(self.n_clusters):
+            rows = np.flatnonzero(in_cluster & (rating_clusters == cluster))
+            cdf = self.cluster_cdfs[cluster]
+            if len(cdf) == 0:
+                in_cluster[rows] = False
+                continue
+            picks = np.searchsorted(cdf, rng.random(len(rows)) * cdf[-1], side="right")
+            foods[rows] = self.cluster_foods[cluster][np.minimum(picks, len(cdf) - 1)]
+
+        rows = np.flatnonzero(~in_cluster)
+        picks = np.searchsorted(
+            self.global_cdf, rng.random(len(rows)) * self.global_cdf[-1], side="right"
+        )
+        foods[rows] = np.minimum(picks, len(self.global_cdf) - 1)
+        return foods
+
+    def _sample_rating_pairs(
+        self, user_cluster: np.ndarray, counts: np.ndarray
+    ) -> np.ndarray:
+        """
+        Sample counts[u] distinct foods for every user u of a chunk
+
+        Draws are oversampled and deduplicated; users still short of their
+        count (heavy users exhaust the popular foods of their cluster) are
+        topped up in further rounds, the last one uniform over all foods.
+
+        Args:
+            user_cluster: Taste cluster per user
+            counts: Number of ratings per user
+
+        Returns:
+            np.ndarray: Sorted keys user * n_foods + food
+        """
+        n_foods = self.args.foods
+        keys = np.empty(0, dtype=np.int64)
+        needed = counts.copy()
+
+        for attempt in range(self.TOP_UP_ROUNDS + 1):
+            users = np.flatnonzero(needed > 0)
+            if len(users) == 0:
+                break
+            draws = np.ceil(needed[users] * self.OVERSAMPLE).astype(np.int64) + 2
+            draw_users = np.repeat(users, draws)
+            if attempt < self.TOP_UP_ROUNDS:
+                draw_foods = self._sample_foods(user_cluster[draw_users])
+            else:
+                draw_foods = self.rng.integers(0, n_foods, len(draw_users))
+
+            draw_keys = draw_users * n_foods + draw_foods
+            draw_keys = draw_keys[~np.isin(draw_keys, keys)]
+
+            # First distinct draws of every user, up to what the user still needs
+            _, first_draws = np.unique(draw_keys, return_index=True)
+            new_keys = draw_keys[np.sort(first_draws)]
+            new_users = new_keys // n_foods
+            rank = np.arange(len(new_keys)) - np.searchsorted(new_users, new_users)
+            new_keys = new_keys[rank < needed[new_users]]
+
+            keys = np.concatenate([keys, new_keys])
+            needed -= np.bincount(new_keys // n_foods, minlength=len(counts))
+
+        return np.sort(keys)
+
+    def generate_user_chunk(self, start: int, n_users: int, password: str) -> dict:
+        """
+        Generate users start..start + n_users with their favorites and ratings
+
+        Args:
+            start: Index of the first user
+            n_users: Number of users in the chunk
+            password: Password hash shared by all synthetic users
+
+        Returns:
+            dict: table name -> DataFrame
+        """
+        args, rng = self.args, self.rng
+        numbers = np.arange(start + 1, start + n_users + 1)
+
+        user_ids = np.asarray(uuid_strings(rng, n_users), dtype=object)
+        user_cluster = rng.integers(0, self.n_clusters, n_users)
+        user_bias = rng.normal(0.0, 0.35, n_users)
+        user_vectors = self.centroids[user_cluster] + rng.normal(
+            0.0, 0.5 / np.sqrt(self.N_FACTORS), (n_users, self.N_FACTORS)
+        )
+        users = pd.DataFrame(
+            {
+                "id": user_ids,
+                "name": [f"Synthetic User {n}" for n in numbers],
+                "username": [f"synthetic_user_{n}" for n in numbers],
+                "email": [f"synthetic_user_{n}@example.com" for n in numbers],
+                "password": password,
+                "role": "user",
+                "onboarding_completed": True,
+            }
+        )
+
+        # Favorite categories: own cluster, sometimes one other
+        favorite_own = rng.random(n_users) < args.favorite_rate
+        other_cluster = rng.integers(0, self.n_clusters, n_users)
+        favorite_other = (rng.random(n_users) < args.favorite_rate / 2) & (
+            other_cluster != user_cluster
+        )
+        favorite_users = np.concatenate(
+            [np.flatnonzero(favorite_own), np.flatnonzero(favorite_other)]
+        )
+        favorite_clusters = np.concatenate(
+            [user_cluster[favorite_own], other_cluster[favorite_other]]
+        )
+        favorites = pd.DataFrame(
+            {
+                "user_id": user_ids[favorite_users],
+                "category_id": self.category_ids[favorite_clusters],
+            }
+        )
+
+        # Food ratings: distinct (user, food) pairs, sorted by user
+        pairs = self._sample_rating_pairs(user_cluster, self._ratings_per_user(n_users))
+        rating_users, rating_foods = pairs // args.foods, pairs % args.foods
+
+        # Biases plus latent taste match, then noisy integer criteria
+        taste = np.einsum(
+            "ij,ij->i", user_vectors[rating_users], self.food_vectors[rating_foods]
+        )
+        base = (
+            self.GLOBAL_MEAN
+            + user_bias[rating_users]
+            + self.food_bias[rating_foods]
+            + 0.5 * self.restaurant_bias[self.food_restaurant[rating_foods]]
+            + args.taste_scale * taste
+        )
+        criteria = np.clip(
+            np.rint(base[:, None] + rng.normal(0.0, 0.6, (len(base), len(CRITERIA)))),
+            1,
+            5,
+        ).astype(np.int8)
+        food_ratings = pd.DataFrame(
+            {
+                "user_id": user_ids[rating_users],
+                "food_id": self.food_ids[rating_foods],
+                "rating": np.round(criteria.mean(axis=1), 2),
+                **{name: criteria[:, i] for i, name in enumerate(CRITERIA)},
+            }
+        )
+
+        # Restaurant ratings for a share of the rated (user, restaurant) pairs
+        n_restaurants = args.restaurants
+        restaurant_keys, inverse = np.unique(
+            rating_users * n_restaurants + self.food_restaurant[rating_foods],
+            return_inverse=True,
+        )
+        mean_food_rating = np.bincount(
+            inverse, weights=food_ratings["rating"].to_numpy()
+        ) / np.bincount(inverse)
+        rated = rng.random(len(restaurant_keys)) < args.restaurant_coverage
+        restaurant_ratings = pd.DataFrame(
+            {
+                "user_id": user_ids[restaurant_keys[rated] // n_restaurants],
+                "restaurant_id": self.restaurant_ids[
+                    restaurant_keys[rated] % n_restaurants
+                ],
+                "rating": np.clip(
+                    np.rint(
+                        mean_food_rating[rated] + rng.normal(0.0, 0.5, int(rated.sum()))
+                    ),
+                    1,
+                    5,
+                ),
+            }
+        )
+
+        return {
+            "users": users,
+            "user_favorite_categories": favorites,
+            "food_ratings": food_ratings,
+            "restaurant_ratings": restaurant_ratings,
+        }
+
+
+class CsvSink:
+    """Append every table to <output>/<table>.csv"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        for table in TABLES:
+            path = os.path.join(output_dir, f"{table}.csv")
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write(self, table: str, df: pd.DataFrame):
+        path = os.path.join(self.output_dir, f"{table}.csv")
+        df.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+    def close(self):
+        pass
+
+
+class ParquetSink:
+    """Write every chunk of a table to <output>/<table>/part-NNNNN.parquet"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.parts = {}
+        for table in TABLES:
+            table_dir = os.path.join(output_dir, table)
+            os.makedirs(table_dir, exist_ok=True)
+            for name in os.listdir(table_dir):
+                if name.endswith(".parquet"):
+                    os.remove(os.path.join(table_dir, name))
+
+    def write(self, table: str, df: pd.DataFrame):
+        part = self.parts.get(table, 0)
+        df.to_parquet(
+            os.path.join(self.output_dir, table, f"part-{part:05d}.parquet"),
+            index=False,
+        )
+        self.parts[table] = part + 1
+
+    def close(self):
+        pass
+
+
+class DatabaseSink:
+    """Bulk insert every table into the configured database"""
+
+    def __init__(self, batch_size: int):
+        from app.extensions import db
+        from app.modules.category.models import (
+            Category,
+            UserFavoriteCategory,
+            restaurant_categories,
+        )
+        from app.modules.food.models import Food
+        from app.modules.rating.models import FoodRating, RestaurantRating
+        from app.modules.restaurant.models import Restaurant
+        from app.modules.user.models import User
+
+        self.db = db
+        self.batch_size = batch_size
+        self.tables = {
+            "categories": Category.__table__,
+            "restaurants": Restaurant.__table__,
+            "restaurant_categories": restaurant_categories,
+            "foods": Food.__table__,
+            "users": User.__table__,
+            "user_favorite_categories": UserFavoriteCategory.__table__,
+            "food_ratings": FoodRating.__table__,
+            "restaurant_ratings": RestaurantRating.__table__,
+        }
+
+    def write(self, table: str, df: pd.DataFrame):
+        if table == "food_ratings":
+            # Criteria columns become the rating_details JSON of FoodRating
+            df = df.assign(
+                id=uuid_strings(np.random.default_rng(), len(df)),
+                rating_details=[
+                    dict(zip(CRITERIA, values))
+                    for values in df[CRITERIA].astype(int).itertuples(index=False)
+                ],
+            ).drop(columns=CRITERIA)
+        elif table == "restaurant_ratings":
+            df = df.assign(id=uuid_strings(np.random.default_rng(), len(df)))
+
+        records = df.to_dict("records")
+        for start in range(0, len(records), self.batch_size):
+            self.db.session.execute(
+                self.tables[table].insert(), records[start : start + self.batch_size]
+            )
+            self.db.session.commit()
+
+    def close(self):
+        self.db.session.remove()
+
+
+def generate(args: argparse.Namespace):
+    """Generate the dataset and stream it to the selected output"""
+    from werkzeug.security import generate_password_hash
+
+    print_section("🏭 SYNTHETIC RATINGS GENERATOR")
+    print(
+        f"Users: {args.users:,}, foods: {args.foods:,}, restaurants: {args.restaurants:,}, "
+        f"clusters: {args.clusters}"
+    )
+    print(
+        f"Ratings per user: mean {args.mean_ratings}, power-law exponent "
+        f"{args.power_law_exponent}, range [{args.min_ratings}, {args.max_ratings}]"
+    )
+    print(f"Output: {args.format} {args.output if args.format != 'db' else ''}\n")
+
+    if args.format == "csv":
+        sink = CsvSink(args.output)
+    elif args.format == "parquet":
+        sink = ParquetSink(args.output)
+    else:
+        sink = DatabaseSink(args.db_batch_size)
+
+    start_time = time.time()
+    generator = SyntheticRatingsGenerator(args)
+    totals = dict.fromkeys(TABLES, 0)
+
+    for table, df in generator.generate_catalog().items():
+        sink.write(table, df)
+        totals[table] += len(df)
+
+    password = generate_password_hash(args.password)
+    for start in range(0, args.users, args.chunk_size):
+        n_users = min(args.chunk_size, args.users - start)
+        for table, df in generator.generate_user_chunk(start, n_users, password).items():
+            sink.write(table, df)
+            totals[table] += len(df)
+
+        elapsed = time.time() - start_time
+        print(
+            f"  {start + n_users:>10,} users  {totals['food_ratings']:>12,} food ratings  "
+            f"{elapsed:>8.1f}s"
+        )
+
+    sink.close()
+
+    elapsed = time.time() - start_time
+    print_section("✅ GENERATION COMPLETED")
+    for table in TABLES:
+        print(f"   - {table:<26} {totals[table]:>12,}")
+    print(
+        f"\n   Mean food ratings per user: {totals['food_ratings'] / max(args.users, 1):.1f}"
+    )
+    print(
+        f"   Time: {elapsed:.1f}s ({totals['food_ratings'] / max(elapsed, 1e-9):,.0f} ratings/s)"
+    )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments, filling unset sizes from the preset"""
+    parser = argparse.ArgumentParser(description="Generate synthetic ratings datasets")
+    parser.add_argument(
+        "--preset", choices=sorted(PRESETS), default="10k", help="Benchmark scale"
+    )
+    parser.add_argument("--users", type=int, help="Number of users (overrides preset)")
+    parser.add_argument("--foods", type=int, help="Number of foods (overrides preset)")
+    parser.add_argument(
+        "--restaurants", type=int, help="Number of restaurants (overrides preset)"
+    )
+    parser.add_argument(
+        "--mean-ratings", type=float, help="Mean food ratings per user (overrides preset)"
+    )
+    parser.add_argument("--min-ratings", type=int, default=1)
+    parser.add_argument("--max-ratings", type=int, default=2000)
+    parser.add_argument(
+        "--power-law-exponent",
+        type=float,
+        default=1.8,
+        help="Pareto tail index of ratings per user (> 1, smaller = heavier tail)",
+    )
+    parser.add_argument(
+        "--popularity-skew", type=float, default=1.0, help="Zipf exponent of food popularity"
+    )
+    parser.add_argument("--clusters", type=int, default=12, help="Latent taste clusters")
+    parser.add_argument(
+        "--cluster-affinity",
+        type=float,
+        default=0.7,
+        help="Share of a user's ratings on foods of their own cluster",
+    )
+    parser.add_argument(
+        "--taste-scale", type=float, default=1.5, help="Weight of the taste match"
+    )
+    parser.add_argument(
+        "--restaurant-coverage",
+        type=float,
+        default=0.5,
+        help="Share of rated (user, restaurant) pairs with a restaurant rating",
+    )
+    parser.add_argument(
+        "--favorite-rate",
+        type=float,
+        default=0.6,
+        help="Share of users favoriting their own cluster's category",
+    )
+    parser.add_argument(
+        "--format", choices=["csv", "parquet", "db"], default="csv", help="Output"
+    )
+    parser.add_argument(
+        "--output", default="data/synthetic", help="Output directory (csv/parquet)"
+    )
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Users per chunk")
+    parser.add_argument("--db-batch-size", type=int, default=5_000, help="Rows per insert")
+    parser.add_argument("--password", default="user123", help="Password of all users")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args(argv)
+
+    for name, value in PRESETS[args.preset].items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+
+    if args.power_law_exponent <= 1.0:
+        parser.error("--power-law-exponent must be greater than 1")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    try:
+        if args.format == "db":
+            from app import create_app
+
+            app = create_app()
+            with app.app_context():
+                generate(args)
+        else:
+            generate(args)
+
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
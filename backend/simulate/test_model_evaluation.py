@@ -11,9 +11,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
 from app.recommendation.local_data import LocalDataProcessor
 from app.recommendation.local_model import LocalSVDModel
+from app.recommendation.metrics import holdout_split
+from app.recommendation.ratings_store import RatingMatrix
 from app.utils.logger import get_logger
 from app.extensions import db
 from app import create_app
@@ -58,13 +59,11 @@ def test_model_evaluation():
         # 2. Create pivot matrix
         print_section("📈 Step 2: Creating User-Item Matrix")
 
-        pivot_matrix = ratings_df.pivot_table(
-            index="user_id", columns="food_id", values="rating", fill_value=0
-        )
+        pivot_matrix = RatingMatrix.from_dataframe(ratings_df)
 
         n_users, n_items = pivot_matrix.shape
         total_possible = n_users * n_items
-        actual_ratings = (pivot_matrix.values > 0).sum()
+        actual_ratings = pivot_matrix.nnz
         sparsity = 1 - (actual_ratings / total_possible)
 
         print(f"Matrix shape: {n_users} users × {n_items} items")
@@ -75,38 +74,21 @@ def test_model_evaluation():
         print_section("🔀 Step 3: Train-Test Split")
 
         # Strategy: Split by randomly holding out 20% of ratings per user
-        train_matrix = pivot_matrix.copy()
-        test_matrix = pd.DataFrame(
-            0, index=pivot_matrix.index, columns=pivot_matrix.columns
-        )
-
+        # (users with less than 2 ratings keep all of them in training)
         test_ratio = 0.2
-        n_test_ratings = 0
-        n_train_ratings = 0
 
         print(f"Splitting with test ratio: {test_ratio:.0%}")
 
-        for user_idx in range(n_users):
-            user_ratings_indices = np.where(pivot_matrix.iloc[user_idx].values > 0)[0]
-
-            if len(user_ratings_indices) < 2:
-                # If user has less than 2 ratings, keep all in training
-                continue
-
-            # Randomly select test indices
-            n_test = max(1, int(len(user_ratings_indices) * test_ratio))
-            test_indices = np.random.choice(
-                user_ratings_indices, size=n_test, replace=False
-            )
-
-            for test_idx in test_indices:
-                # Move rating from train to test
-                rating_value = train_matrix.iloc[user_idx, test_idx]
-                test_matrix.iloc[user_idx, test_idx] = rating_value
-                train_matrix.iloc[user_idx, test_idx] = 0
-                n_test_ratings += 1
+        train_csr, test_csr = holdout_split(
+            pivot_matrix.matrix, test_ratio=test_ratio, min_ratings=2, random_state=42
+        )
+        train_matrix = RatingMatrix(
+            train_csr, pivot_matrix.index, pivot_matrix.columns
+        )
+        test_matrix = RatingMatrix(test_csr, pivot_matrix.index, pivot_matrix.columns)
 
-            n_train_ratings += len(user_ratings_indices) - n_test
+        n_test_ratings = test_matrix.nnz
+        n_train_ratings = train_matrix.nnz
 
         print(f"✅ Split completed:")
         print(f"   - Training ratings: {n_train_ratings}")
@@ -139,7 +121,7 @@ def test_model_evaluation():
         print_section("📊 Step 5: Model Evaluation on Test Set")
 
         print("Evaluating model performance...")
-        metrics = svd_model.evaluate_model(test_matrix)
+        metrics = svd_model.evaluate_model(test_matrix, train_matrix=train_matrix)
 
         if not metrics:
             print("❌ Evaluation failed!")
@@ -153,9 +135,12 @@ def test_model_evaluation():
 
         print(f"\n🎯 Ranking Metrics:")
         print(f"   - NDCG@10 (Normalized DCG):      {metrics.get('ndcg', 0):.4f}")
+        print(f"   - Precision@10:                  {metrics.get('precision', 0):.4f}")
+        print(f"   - Recall@10:                     {metrics.get('recall', 0):.4f}")
+        print(f"   - MAP@10:                        {metrics.get('map', 0):.4f}")
 
         print(f"\n📊 Coverage Metrics:")
-        print(f"   - Coverage (items ≥ 3.0):        {metrics.get('coverage', 0):.1%}")
+        print(f"   - Catalog coverage (top-10):     {metrics.get('coverage', 0):.1%}")
 
         print(f"\n📉 Test Statistics:")
         print(f"   - Total predictions:             {metrics.get('n_predictions', 0)}")
@@ -239,8 +224,9 @@ def test_model_evaluation():
 
         # Get first user with test ratings
         sample_user_idx = None
+        test_counts = test_matrix.user_counts()
         for i in range(min(5, n_users)):
-            if test_matrix.iloc[i].sum() > 0:
+            if test_counts[i] > 0:
                 sample_user_idx = i
                 break
 
@@ -249,23 +235,22 @@ def test_model_evaluation():
             print(f"{'Food Index':<12} {'Actual':<10} {'Predicted':<12} {'Error':<10}")
             print(f"{'-' * 50}")
 
-            for food_idx in range(min(10, n_items)):
-                actual = test_matrix.iloc[sample_user_idx, food_idx]
-                if actual > 0:
-                    predicted = svd_model.predict_user_item(sample_user_idx, food_idx)
-                    error = abs(actual - predicted)
-                    print(
-                        f"{food_idx:<12} {actual:<10.2f} {predicted:<12.3f} {error:<10.3f}"
-                    )
+            sample_ratings = test_csr[sample_user_idx]
+            for food_idx, actual in zip(
+                sample_ratings.indices[:10], sample_ratings.data[:10]
+            ):
+                predicted = svd_model.predict_user_item(sample_user_idx, food_idx)
+                error = abs(actual - predicted)
+                print(
+                    f"{food_idx:<12} {actual:<10.2f} {predicted:<12.3f} {error:<10.3f}"
+                )
 
         # 8. Recommendations Test
         print_section("🎁 Step 8: Generate Sample Recommendations")
 
         if sample_user_idx is not None:
             # Get items user has rated (to exclude)
-            rated_items = list(
-                np.where(pivot_matrix.iloc[sample_user_idx].values > 0)[0]
-            )
+            rated_items = list(pivot_matrix.matrix[sample_user_idx].indices)
 
             # Get top recommendations
             recommendations = svd_model.get_top_recommendations(
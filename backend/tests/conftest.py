@@ -0,0 +1,41 @@
+"""
+Shared pytest fixtures: the Flask app on a throwaway SQLite database
+"""
+
+import os
+
+# Read at import time by RecommendationConfig; tests never train in the background
+os.environ["RECOMMENDER_TRAINING_MODE"] = "off"
+
+import sqlite3
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app import create_app
+from app.extensions import db as _db
+
+
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """Enforce ON DELETE CASCADE like MySQL does"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Application with an app context pushed and all tables created"""
+    monkeypatch.setenv("DATABASE_URI", f"sqlite:///{tmp_path / 'test.db'}")
+    app = create_app()
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+
+
+@pytest.fixture
+def db(app):
+    """Database extension bound to the test app"""
+    return _db
@@ -0,0 +1,46 @@
+"""
+Helpers adding model rows to the test database session (not committed)
+"""
+
+from app.modules.food.models import Food
+from app.modules.rating.models import FoodRating, RestaurantRating
+from app.modules.restaurant.models import Restaurant
+from app.modules.user.models import User
+
+RATING_CRITERIA = ("flavor", "serving", "price", "place")
+
+
+def make_user(db, name):
+    user = User(name=name, username=name, email=f"{name}@example.com", password="x")
+    db.session.add(user)
+    return user
+
+
+def make_restaurant(db, name):
+    restaurant = Restaurant(
+        name=name, address="Jl. Test", latitude=-3.97, longitude=122.5
+    )
+    db.session.add(restaurant)
+    return restaurant
+
+
+def make_food(db, name, restaurant=None):
+    food = Food(name=name, restaurant_id=restaurant.id if restaurant else None)
+    db.session.add(food)
+    return food
+
+
+def make_food_rating(db, user, food, rating):
+    # The model averages rating_details into rating; equal criteria give rating
+    details = {criteria: rating for criteria in RATING_CRITERIA}
+    food_rating = FoodRating(user_id=user.id, food_id=food.id, rating_details=details)
+    db.session.add(food_rating)
+    return food_rating
+
+
+def make_restaurant_rating(db, user, restaurant, rating):
+    restaurant_rating = RestaurantRating(
+        user_id=user.id, restaurant_id=restaurant.id, rating=rating
+    )
+    db.session.add(restaurant_rating)
+    return restaurant_rating
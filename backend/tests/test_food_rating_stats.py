@@ -0,0 +1,125 @@
+"""
+food_rating_stats must equal the aggregates of food_ratings after every kind of
+write, and the recompute command must agree with the incremental updates
+"""
+
+import pytest
+from sqlalchemy import func
+from app.modules.rating.models import FoodRating, FoodRatingStats
+from app.modules.rating.repository import FoodRatingStatsRepository
+from .factories import make_food, make_food_rating, make_user
+
+
+def stats_snapshot(db):
+    """food_id -> (sum, count, count_1..count_5) as stored in food_rating_stats"""
+    return {
+        row.food_id: (
+            round(row.rating_sum, 6),
+            row.rating_count,
+            row.count_1,
+            row.count_2,
+            row.count_3,
+            row.count_4,
+            row.count_5,
+        )
+        for row in db.session.query(FoodRatingStats).populate_existing()
+        if row.rating_count > 0
+    }
+
+
+def raw_snapshot(db):
+    """The same aggregates computed from food_ratings"""
+    stats = {}
+    for food_id, rating in db.session.query(FoodRating.food_id, FoodRating.rating):
+        entry = stats.setdefault(food_id, [0.0, 0, 0, 0, 0, 0, 0])
+        entry[0] += rating
+        entry[1] += 1
+        entry[1 + FoodRatingStats.bucket(rating)] += 1
+    return {
+        food_id: (round(entry[0], 6), *entry[1:]) for food_id, entry in stats.items()
+    }
+
+
+def assert_stats_match(db):
+    db.session.expire_all()
+    assert stats_snapshot(db) == raw_snapshot(db)
+
+
+@pytest.fixture
+def foods(db):
+    foods = [make_food(db, "Nasi Goreng"), make_food(db, "Sate Ayam")]
+    db.session.commit()
+    return foods
+
+
+def test_create_update_delete(db, foods):
+    alice, bob = make_user(db, "alice"), make_user(db, "bob")
+    db.session.flush()
+    a = make_food_rating(db, alice, foods[0], 4.0)
+    b = make_food_rating(db, bob, foods[0], 2.5)
+    make_food_rating(db, alice, foods[1], 5.0)
+    db.session.commit()
+    assert_stats_match(db)
+    assert db.session.get(FoodRatingStats, foods[0].id).rating_count == 2
+
+    # The commit expired a: its old value is not in the identity map
+    a.rating = 5.0
+    db.session.commit()
+    assert_stats_match(db)
+    stats = db.session.get(FoodRatingStats, foods[0].id)
+    assert (stats.rating_count, stats.rating_sum) == (2, 7.5)
+
+    # Moving an expired rating to another food
+    b.food_id = foods[1].id
+    db.session.commit()
+    assert_stats_match(db)
+
+    db.session.delete(a)
+    db.session.commit()
+    assert_stats_match(db)
+
+
+def test_cascaded_deletes(db, foods):
+    users = [make_user(db, name) for name in ("alice", "bob", "carol")]
+    db.session.flush()
+    for i, user in enumerate(users):
+        make_food_rating(db, user, foods[0], 1.0 + i)
+        make_food_rating(db, user, foods[1], 5.0 - i * 0.75)
+    db.session.commit()
+    assert_stats_match(db)
+
+    # User delete cascades its (expired, unloaded) ratings through the ORM
+    db.session.delete(users[0])
+    db.session.commit()
+    assert_stats_match(db)
+
+    # Food delete cascades its ratings and its stats row
+    db.session.delete(foods[1])
+    db.session.commit()
+    assert_stats_match(db)
+    assert db.session.get(FoodRatingStats, foods[1].id) is None
+
+
+def test_recompute_agrees_with_incremental(db, foods):
+    users = [make_user(db, f"user{i}") for i in range(6)]
+    db.session.flush()
+    ratings = [
+        make_food_rating(db, user, food, 1.0 + (i * 7 + j * 3) % 9 * 0.5)
+        for i, user in enumerate(users)
+        for j, food in enumerate(foods)
+    ]
+    db.session.commit()
+    ratings[0].rating = 3.5
+    db.session.delete(ratings[3])
+    db.session.commit()
+
+    incremental = stats_snapshot(db)
+    assert FoodRatingStatsRepository.recompute_all() == len(foods)
+    db.session.expire_all()
+    assert stats_snapshot(db) == incremental == raw_snapshot(db)
+
+    totals = db.session.query(
+        func.count(FoodRating.id), func.sum(FoodRating.rating)
+    ).one()
+    count, rating_sum = FoodRatingStatsRepository.get_totals()
+    assert (count, round(rating_sum, 6)) == (totals[0], round(totals[1], 6))
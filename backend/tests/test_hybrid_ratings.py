@@ -0,0 +1,112 @@
+"""
+The columnar merge of _query_hybrid_ratings must give exactly the frame of the
+per-row dict lookup loop it replaced
+"""
+
+import pandas as pd
+import pytest
+from app.extensions import db as _db
+from app.modules.food.models import Food
+from app.modules.rating.models import FoodRating, RestaurantRating
+from app.recommendation.local_data import LocalDataProcessor
+from .factories import (
+    make_food,
+    make_food_rating,
+    make_restaurant,
+    make_restaurant_rating,
+    make_user,
+)
+
+
+def reference_hybrid_ratings(processor, user_ids=None):
+    """The per-row loop _query_hybrid_ratings replaced, on the same queries"""
+    food_query = _db.session.query(
+        FoodRating.user_id, FoodRating.food_id, FoodRating.rating, Food.restaurant_id
+    ).join(Food, FoodRating.food_id == Food.id)
+    restaurant_query = _db.session.query(
+        RestaurantRating.user_id,
+        RestaurantRating.restaurant_id,
+        RestaurantRating.rating,
+    )
+    if user_ids is not None:
+        food_query = food_query.filter(FoodRating.user_id.in_(user_ids))
+        restaurant_query = restaurant_query.filter(
+            RestaurantRating.user_id.in_(user_ids)
+        )
+
+    restaurant_ratings = {
+        (rating.user_id, rating.restaurant_id): rating.rating
+        for rating in restaurant_query.all()
+    }
+    rows = []
+    for food_rating in food_query.all():
+        restaurant_rating = restaurant_ratings.get(
+            (food_rating.user_id, food_rating.restaurant_id)
+        )
+        if restaurant_rating is not None and processor.use_hybrid_scoring:
+            score = (processor.alpha * food_rating.rating) + (
+                (1 - processor.alpha) * restaurant_rating
+            )
+            has_restaurant_rating = True
+        else:
+            score = food_rating.rating
+            has_restaurant_rating = False
+        rows.append(
+            {
+                "user_id": food_rating.user_id,
+                "food_id": food_rating.food_id,
+                "rating": score,
+                "has_restaurant_rating": has_restaurant_rating,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def users(db):
+    restaurants = [make_restaurant(db, f"Warung {i}") for i in range(3)]
+    users = [make_user(db, f"user{i}") for i in range(5)]
+    db.session.flush()
+    foods = [make_food(db, f"Food {i}", restaurants[i % 3]) for i in range(6)]
+    foods.append(make_food(db, "No restaurant"))
+    db.session.flush()
+
+    for i, user in enumerate(users):
+        for j, food in enumerate(foods):
+            if (i + j) % 3 != 0:
+                make_food_rating(db, user, food, 1.0 + (i * 5 + j * 3) % 9 * 0.5)
+        # Some users rate some restaurants, user0 none at all
+        for k, restaurant in enumerate(restaurants):
+            if i > 0 and (i + k) % 2 == 0:
+                make_restaurant_rating(db, user, restaurant, 1.0 + (i + 2 * k) % 5)
+    db.session.commit()
+    return users
+
+
+@pytest.mark.parametrize("alpha", [0.0, 0.3, 0.7, 1.0])
+def test_matches_loop(db, users, alpha):
+    processor = LocalDataProcessor(alpha=alpha)
+    expected = reference_hybrid_ratings(processor)
+
+    actual = processor._query_hybrid_ratings()
+    assert actual["has_restaurant_rating"].any()
+    assert not actual["has_restaurant_rating"].all()
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_matches_loop_without_hybrid_scoring(db, users):
+    processor = LocalDataProcessor(alpha=0.7)
+    processor.use_hybrid_scoring = False
+    pd.testing.assert_frame_equal(
+        processor._query_hybrid_ratings(), reference_hybrid_ratings(processor)
+    )
+
+
+def test_matches_loop_for_some_users(db, users):
+    processor = LocalDataProcessor(alpha=0.7)
+    user_ids = [users[1].id, users[4].id]
+    actual = processor._query_hybrid_ratings(user_ids)
+    assert set(actual["user_id"]) == set(user_ids)
+    pd.testing.assert_frame_equal(
+        actual, reference_hybrid_ratings(processor, user_ids)
+    )
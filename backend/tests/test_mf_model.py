@@ -0,0 +1,66 @@
+"""
+BiasedMFModel with the shipped defaults must predict held-out ratings better
+than the global mean, with either algorithm
+"""
+
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+from app.recommendation.mf_model import BiasedMFModel
+from app.recommendation.ratings_store import RatingMatrix
+
+
+@pytest.fixture
+def ratings():
+    """Low-rank ratings with biases and noise, split into train and test"""
+    rng = np.random.default_rng(3)
+    n_users, n_items, n_ratings = 400, 150, 12000
+    user_factors = rng.normal(0.0, 0.7, (n_users, 4))
+    item_factors = rng.normal(0.0, 0.7, (n_items, 4))
+    user_bias = rng.normal(0.0, 0.5, n_users)
+    item_bias = rng.normal(0.0, 0.5, n_items)
+
+    pairs = np.unique(
+        np.column_stack(
+            [rng.integers(0, n_users, n_ratings), rng.integers(0, n_items, n_ratings)]
+        ),
+        axis=0,
+    )
+    rows, cols = pairs[:, 0], pairs[:, 1]
+    values = np.clip(
+        np.round(
+            3.5
+            + user_bias[rows]
+            + item_bias[cols]
+            + np.sum(user_factors[rows] * item_factors[cols], axis=1)
+            + rng.normal(0.0, 0.3, len(rows))
+        ),
+        1.0,
+        5.0,
+    )
+
+    test = rng.random(len(values)) < 0.1
+    train_matrix = RatingMatrix(
+        csr_matrix(
+            (values[~test], (rows[~test], cols[~test])), shape=(n_users, n_items)
+        ),
+        [f"u{i}" for i in range(n_users)],
+        [f"f{i}" for i in range(n_items)],
+    )
+    return train_matrix, rows[test], cols[test], values[test]
+
+
+@pytest.mark.parametrize("algorithm", ["als", "sgd"])
+def test_mf_beats_global_mean(ratings, algorithm):
+    train_matrix, rows, cols, values = ratings
+    model = BiasedMFModel(algorithm=algorithm, random_state=42)
+    assert model.fit(train_matrix)
+
+    predictions = np.array(
+        [model.predict_user_item(user, item) for user, item in zip(rows, cols)]
+    )
+    model_rmse = np.sqrt(np.mean((predictions - values) ** 2))
+    baseline_rmse = np.sqrt(np.mean((train_matrix.matrix.data.mean() - values) ** 2))
+
+    assert model.epochs_trained > 1
+    assert model_rmse < 0.6 * baseline_rmse
@@ -0,0 +1,69 @@
+"""
+UserNeighborIndex.update_user must leave the index answering like a fresh build
+on the updated ratings (neighbor scores compared, so ties may order either way)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from app.recommendation.neighbor_index import UserNeighborIndex
+
+
+def random_ratings(rng, n_users, n_foods, density=0.3):
+    rows = [
+        (f"u{user:03d}", f"f{food:03d}", float(rng.integers(1, 6)))
+        for user in range(n_users)
+        for food in range(n_foods)
+        if rng.random() < density
+    ]
+    return pd.DataFrame(rows, columns=["user_id", "food_id", "rating"])
+
+
+def user_ratings(ratings_df, user_id):
+    user_df = ratings_df[ratings_df["user_id"] == user_id]
+    return dict(zip(user_df["food_id"], user_df["rating"]))
+
+
+def assert_same_neighbors(index, ratings_df):
+    expected = UserNeighborIndex(top_k=index.top_k)
+    assert expected.build(ratings_df)
+    for user_id in ratings_df["user_id"].unique():
+        actual_scores = [
+            score for _, score in index.get_neighbors(user_id, top_k=index.top_k)
+        ]
+        expected_scores = [
+            score for _, score in expected.get_neighbors(user_id, top_k=index.top_k)
+        ]
+        np.testing.assert_allclose(actual_scores, expected_scores, atol=1e-12)
+
+
+@pytest.mark.parametrize("top_k", [3, 10])
+def test_update_user_matches_fresh_build(top_k):
+    rng = np.random.default_rng(11)
+    ratings_df = random_ratings(rng, n_users=30, n_foods=15)
+    index = UserNeighborIndex(top_k=top_k)
+    assert index.build(ratings_df)
+
+    changes = [
+        # Re-rate an existing user, including a food nobody rated yet
+        ("u004", {"f000": 5.0, "f001": 1.0, "f002": 4.0, "f099": 3.0}),
+        # Copy another user's ratings: cosine 1 with them
+        ("u010", user_ratings(ratings_df, "u020")),
+        # New user
+        ("u100", {"f003": 2.0, "f004": 5.0, "f005": 4.0, "f006": 1.0}),
+        # Re-rate a user down to a single food: no neighbors left
+        ("u015", {"f007": 3.0}),
+    ]
+    for user_id, ratings in changes:
+        assert index.update_user(user_id, ratings)
+        ratings_df = pd.concat(
+            [
+                ratings_df[ratings_df["user_id"] != user_id],
+                pd.DataFrame(
+                    [(user_id, food_id, r) for food_id, r in ratings.items()],
+                    columns=["user_id", "food_id", "rating"],
+                ),
+            ],
+            ignore_index=True,
+        )
+        assert_same_neighbors(index, ratings_df)
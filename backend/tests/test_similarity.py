@@ -0,0 +1,92 @@
+"""
+common_item_cosine must match the per-pair cosine_similarity_sparse loop it
+replaced, for one target user, a block of users and all pairs
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import csr_matrix
+from app.recommendation.similarity import (
+    build_user_item_matrix,
+    common_item_cosine,
+    cosine_similarity_sparse,
+)
+
+
+def reference_scores(user_matrix, target_idx, min_common_items):
+    """The per-pair loop common_item_cosine replaced"""
+    n_users = user_matrix.shape[0]
+    scores = np.zeros(n_users, dtype=np.float64)
+    target_rated = user_matrix[target_idx].toarray().flatten() > 0
+    for idx in range(n_users):
+        if idx == target_idx:
+            continue
+        common_mask = target_rated & (user_matrix[idx].toarray().flatten() > 0)
+        if np.sum(common_mask) < min_common_items:
+            continue
+        scores[idx] = cosine_similarity_sparse(
+            user_matrix, target_idx, idx, common_mask
+        )
+    return scores
+
+
+@pytest.fixture
+def user_matrix():
+    rng = np.random.default_rng(7)
+    n_users, n_items = 40, 25
+    dense = np.where(
+        rng.random((n_users, n_items)) < 0.3,
+        rng.choice([1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0], (n_users, n_items)),
+        0.0,
+    )
+    dense[3] = 0.0  # User without ratings
+    dense[5] = dense[6]  # Identical users: cosine 1
+    dense[7, :] = 0.0
+    dense[7, :2] = 4.0  # Exactly two items
+    return csr_matrix(dense)
+
+
+@pytest.mark.parametrize("min_common_items", [1, 2, 4])
+def test_single_target_matches_loop(user_matrix, min_common_items):
+    for target_idx in range(user_matrix.shape[0]):
+        np.testing.assert_allclose(
+            common_item_cosine(user_matrix, target_idx, min_common_items),
+            reference_scores(user_matrix, target_idx, min_common_items),
+            rtol=0,
+            atol=1e-12,
+        )
+
+
+def test_block_and_all_pairs_match_single_rows(user_matrix):
+    targets = np.array([0, 5, 7, 3, 39])
+    block = common_item_cosine(user_matrix, targets, min_common_items=2)
+    all_pairs = common_item_cosine(user_matrix, None, min_common_items=2)
+
+    assert block.shape == (len(targets), user_matrix.shape[0])
+    assert all_pairs.shape == (user_matrix.shape[0],) * 2
+    for row, target_idx in enumerate(targets):
+        single = common_item_cosine(user_matrix, int(target_idx), min_common_items=2)
+        np.testing.assert_array_equal(block[row], single)
+        np.testing.assert_array_equal(all_pairs[target_idx], single)
+
+    assert np.all(np.diag(all_pairs) == 0.0)
+    assert np.all(all_pairs[3] == 0.0)
+    assert all_pairs[5, 6] == pytest.approx(1.0)
+
+
+def test_user_item_matrix_matches_pivot():
+    ratings_df = pd.DataFrame(
+        {
+            "user_id": ["u3", "u1", "u2", "u1", "u3", "u2"],
+            "food_id": ["f2", "f1", "f3", "f3", "f1", "f2"],
+            "rating": [4.0, 3.5, 5.0, 2.0, 1.0, 4.5],
+        }
+    )
+    pivot = ratings_df.pivot(index="user_id", columns="food_id", values="rating")
+    pivot = pivot.fillna(0)
+
+    matrix, user_ids, food_ids = build_user_item_matrix(ratings_df)
+    assert user_ids == list(pivot.index)
+    assert food_ids == list(pivot.columns)
+    np.testing.assert_array_equal(matrix.toarray(), pivot.to_numpy())